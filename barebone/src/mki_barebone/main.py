@@ -2,9 +2,19 @@
 
 Typical usage example:
 python main.py -i <input_dir> -o <output_dir>
+python main.py create-many -i <input_dir> <input_dir> ... -o <output_root> -j <jobs>
+python main.py merge -i <input_dir> <input_dir> ... -o <output_dir> --name <name>
 """
 
 import argparse
+import copy
+import functools
+import hashlib
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
 import fsspec
 import jsonref
@@ -13,10 +23,22 @@ import logging
 import os
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from mki_barebone.toolspec_validation import validate
-from mki_barebone.utils import normalize_uri, normalize_path, CwdContextManager
+from mki_barebone.utils import (
+    normalize_uri,
+    normalize_path,
+    file_digest,
+    sync_directory,
+    sync_file,
+    CwdContextManager,
+)
 
 from python_on_whales import docker
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -27,8 +49,13 @@ PYTHONVERSION_FILENAME = ".python-version"
 TEMPLATES_DIRECTORY = "src/mki_barebone/templates"
 GRPC_TEMPLATES = [
     "src/enpkg/grpc_backend/server.py",
+    "src/enpkg/grpc_backend/artifacts.py",
     "src/enpkg/grpc_backend/utils.py",
-    "src/enpkg/grpc_backend/module.proto",
+    "src/enpkg/grpc_backend/health.py",
+    "src/enpkg/grpc_backend/metrics.py",
+    "src/enpkg/grpc_backend/tracing.py",
+    "src/enpkg/profiling.py",
+    "src/enpkg/healthcheck.py",
     "src/enpkg/main.py.jinja",
     "src/enpkg/tool.py.jinja",
     "Dockerfile.jinja",
@@ -38,6 +65,7 @@ GRPC_TEMPLATES = [
 
 ARGS_TEMPLATES = [
     "src/enpkg/args_backend/argexec.py",
+    "src/enpkg/profiling.py",
     "src/enpkg/main.py.jinja",
     "src/enpkg/tool.py.jinja",
     "Dockerfile.jinja",
@@ -46,12 +74,49 @@ ARGS_TEMPLATES = [
     "tool.cwl.jinja"
 ]
 
+# Prebuilt gRPC protocol, shipped in the extra folder of grpc contexts and installed into the tool environment
+PROTO_PACKAGE_DIRECTORY = "extra/mki-barebone-proto"
+PROTO_PACKAGE_EXCLUDES = ["__pycache__", ".venv"]
+
+BASE_DOCKERFILE_TEMPLATE = "base/Dockerfile.jinja"
+BASE_TEMPLATES = [
+    BASE_DOCKERFILE_TEMPLATE,
+    "base/Makefile.jinja",
+]
+BASE_REQUIREMENTS_FILENAME = "requirements.txt"
+
+MERGED_PYPROJECT_TEMPLATE = "merged/pyproject.toml.jinja"
+MERGED_EXCLUDES = ["__pycache__", ".venv"]
+
+FINGERPRINT_LABEL = "mki.barebone.fingerprint"
+FINGERPRINT_EXCLUDES = ["__pycache__", ".venv"]  # Not part of the docker context (see .dockerignore)
+
+# Concurrent builds must not create the buildx builder twice
+_builder_lock = threading.Lock()
 
-def _parse_spec(src, interface="args"):
-    """Reads and validates the tool spec
+# Parsed specs (with the files they require) by (src, interface, spec sha256), specs that passed validation by
+# sha256 and rendered templates by (template path, template sha256, template dict), so building many tools in one
+# process does the work once
+_spec_cache = dict()
+_validated_specs = set()
+_render_cache = dict()
+
+
+def _check_spec_files(fs, required):
+    """Raises FileNotFoundError with the given message for the first of (uri, message) in required that is missing"""
+    for uri, message in required:
+        if not fs.exists(uri):
+            raise FileNotFoundError(message)
+
+
+def _parse_spec(src, interface="args", validate_spec=True):
+    """Reads and validates the tool spec, the result is cached per spec content. The packages and scripts the spec
+    refers to are checked on every call, as they may be removed while the spec stays unchanged
 
     Args:
         src (str): uri pointing to the source folder
+        interface (str, optional): Either grpc or args. Defaults to args.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
 
     Raises:
         FileNotFoundError: If spec or files specified in the spec are not found
@@ -68,11 +133,23 @@ def _parse_spec(src, interface="args"):
 
     # Read spec
     specuri = urljoin(src, SPEC_FILENAME)
-    with fs.open(specuri, "r", encoding="utf8") as f:
-        spec = jsonref.loads(f.read())
-
-    # Validate json
-    # TODO: Create json schema, validate here
+    with fs.open(specuri, "rb") as f:
+        spec_content = f.read()
+    spec_digest = hashlib.sha256(spec_content).hexdigest()
+    cache_key = (src, interface, spec_digest)
+    if cache_key in _spec_cache and (not validate_spec or spec_digest in _validated_specs):
+        parsed, required = _spec_cache[cache_key]
+        _check_spec_files(fs, required)
+        return copy.deepcopy(parsed)
+    spec = jsonref.loads(spec_content.decode("utf8"))
+
+    # Validate json once per spec
+    if validate_spec and spec_digest not in _validated_specs:
+        try:
+            validate(spec)
+        except Exception as err:
+            raise ValueError(f"Invalid spec {specuri}: {err}")
+        _validated_specs.add(spec_digest)
 
     name = spec["id"]["name"]
     if interface == "grpc":
@@ -81,14 +158,15 @@ def _parse_spec(src, interface="args"):
 
     functions = []
     packages = dict()
+    required = []
     for function in spec["functions"].values():
 
         pkg = function["package"]
         pkgname = pkg["name"]
         pkgpath = pkg["path"]
         pkguri = urljoin(src, normalize_path(pkgpath))
-        if not fs.exists(pkguri):
-            raise FileNotFoundError(f"Python package {pkgname} does not exist at {pkguri}.")
+        required.append((pkguri, f"Python package {pkgname} does not exist at {pkguri}."))
+        _check_spec_files(fs, required[-1:])
         if pkgname not in packages:
             packages[pkgname] = dict(path=pkgpath, uri=pkguri)
 
@@ -99,8 +177,8 @@ def _parse_spec(src, interface="args"):
                 "Specified script must be a python file (.py extension)," + f"but has extension {scriptext}"
             )
         scripturi = urljoin(pkguri, scriptfile)
-        if not fs.exists(scripturi):
-            raise FileNotFoundError(f"Python script {scripturi} does not exist.")
+        required.append((scripturi, f"Python script {scripturi} does not exist."))
+        _check_spec_files(fs, required[-1:])
 
         funcname = function["function"]
 
@@ -113,9 +191,27 @@ def _parse_spec(src, interface="args"):
         # if not hasattr(module, funcname):
         #     raise ValueError(f"Python script {scriptname} does not have a function called {funcname}"
 
-        functions.append(dict(pkgname=pkgname, scriptname=scriptname, name=funcname))
+        functions.append(
+            dict(pkgname=pkgname, scriptname=scriptname, name=funcname, namespace=function.get("namespace"))
+        )
 
-    return dict(name=name, servicename=servicename, functions=functions, interface=interface), dict(packages=packages)
+    # Names of the functions in the dispatch table of the tool (see tool.py.jinja). Functions of merged tools (see
+    # merge_tools) are namespaced by their tool and imported under an alias, as different tools may use the same name
+    counts = dict()
+    for function in functions:
+        counts[function["name"]] = counts.get(function["name"], 0) + 1
+    for function in functions:
+        if function["namespace"] is None:
+            function.update(alias=function["name"], dispatch_names=[function["name"]])
+            continue
+        function["alias"] = re.sub(r"\W", "_", function["namespace"]) + "__" + function["name"]
+        function["dispatch_names"] = [f"{function['namespace']}/{function['name']}"]
+        if counts[function["name"]] == 1:
+            function["dispatch_names"].append(function["name"])
+
+    parsed = dict(name=name, servicename=servicename, functions=functions, interface=interface), dict(packages=packages)
+    _spec_cache[cache_key] = parsed, required
+    return copy.deepcopy(parsed)
 
 
 def _check_src(src):
@@ -178,8 +274,59 @@ def _check_dest(dest, default=None):
         return default
 
 
+def _rendered_path(template_path):
+    """Returns the path of a rendered template in the docker context, ".jinja" templates lose their extension
+
+    Args:
+        template_path (str): Path of the template relative to the templates directory
+
+    Returns:
+        str: Path relative to the docker context
+    """
+    template_name, template_ext = os.path.splitext(template_path)
+    return template_name if template_ext == ".jinja" else template_path
+
+
+def _proto_package_files():
+    """Returns the files of the mki-barebone-proto package
+
+    Returns:
+        list: Paths relative to the extra folder of a docker context, sorted
+    """
+    extra = os.path.dirname(PROTO_PACKAGE_DIRECTORY)
+    files = []
+    for root, dirs, filenames in os.walk(PROTO_PACKAGE_DIRECTORY):
+        dirs[:] = [d for d in dirs if d not in PROTO_PACKAGE_EXCLUDES]
+        files += [os.path.relpath(os.path.join(root, filename), extra) for filename in filenames]
+    return sorted(files)
+
+
+@functools.lru_cache(maxsize=None)
+def _template_environment():
+    """Returns the jinja environment of the templates, shared by all renderings"""
+    return Environment(loader=FileSystemLoader(TEMPLATES_DIRECTORY), autoescape=select_autoescape())
+
+
+def _render_template(template_path, template_dict):
+    """Renders a jinja template, cached by the template content and the template dictionary
+
+    Args:
+        template_path (str): Path of the template relative to the templates directory
+        template_dict (dict): A (flat) dictionary of the values being used for template rendering
+
+    Returns:
+        str: The rendered template
+    """
+    with open(os.path.join(TEMPLATES_DIRECTORY, template_path), "rb") as f:
+        template_digest = hashlib.sha256(f.read()).hexdigest()
+    cache_key = (template_path, template_digest, json.dumps(template_dict, sort_keys=True))
+    if cache_key not in _render_cache:
+        _render_cache[cache_key] = _template_environment().get_template(template_path).render(**template_dict)
+    return _render_cache[cache_key]
+
+
 def _render_templates(templates, dest, template_dict):
-    """Renders jinja templates and writes them to dest
+    """Renders jinja templates and writes them to dest, files whose content is unchanged are not rewritten
 
     Args:
         templates (list): A list of paths pointing to the templates to render
@@ -190,7 +337,6 @@ def _render_templates(templates, dest, template_dict):
     fs = fsspec.filesystem(urlparse(dest).scheme)
 
     # Generating required files from jinja templates
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIRECTORY), autoescape=select_autoescape())
     for template_path in templates:
 
         # Create parent at dest if needed
@@ -199,27 +345,37 @@ def _render_templates(templates, dest, template_dict):
         fs.makedirs(parent_rendered_template_url, exist_ok=True)
 
         # Write template
-        rendered_template = env.get_template(template_path).render(**template_dict)
-        template_name, template_ext = os.path.splitext(template_file)
-        rendered_template_url = urljoin(
-            dest, os.path.join(parent_template_path, template_name) if template_ext == ".jinja" else template_path
-        )
+        rendered_template = _render_template(template_path, template_dict)
+        template_name, _ = os.path.splitext(template_file)
+        rendered_template_url = urljoin(dest, _rendered_path(template_path))
 
         print(dest, rendered_template_url, template_path, parent_template_path, template_name)
+        if os.path.exists(rendered_template_url):
+            with open(rendered_template_url) as f:
+                if f.read() == rendered_template:
+                    logging.debug(f"Unchanged {rendered_template_url}")
+                    continue
         with open(rendered_template_url, "w") as f:
             logging.debug(f"Writing {rendered_template_url}")
             f.write(rendered_template)
 
 
-def _build_docker(dest, name):
+def _build_docker(dest, name, labels=None):
     """Builds the docker image from dest
 
     Args:
         dest (str): Path to the docker context
         name (str): Name of the tool that will be used as tag for the container
+        labels (dict, optional): Labels to add to the image. Defaults to None.
     """
+    make_args = []
+    if labels:
+        build_args = [os.environ.get("ADDBUILDARGS", "")] + [f"--label {key}={value}" for key, value in labels.items()]
+        make_args.append(f"ADDBUILDARGS={' '.join(build_args).strip()}")
     with CwdContextManager(logger=logger):
-        subprocess.run(["make", "docker"], cwd=dest, check=True)
+        with _builder_lock:
+            subprocess.run(["make", "check-builder"], cwd=dest, check=True)
+        subprocess.run(["make", "docker"] + make_args, cwd=dest, check=True)
     # image = docker.build(dockerfile_path, tags=name)
 
     imgid = docker.image.inspect(name).id
@@ -238,12 +394,16 @@ def _lock_environment(src):
         subprocess.run(["uv", "sync"], cwd=src, check=True)
 
 
-def _create_docker_context(src, dest=None, interface="args"):
+def _create_docker_context(src, dest=None, interface="args", validate_spec=True, lock_environment=True):
     """Helper function to create a docker context for various interfaces
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        interface (str, optional): Either grpc or args. Defaults to args.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
+        lock_environment (bool, optional): Pin the uv lockfile first, False if the caller already did.
+            Defaults to True.
 
     Returns:
         str: src normalized
@@ -256,119 +416,131 @@ def _create_docker_context(src, dest=None, interface="args"):
     src = _check_src(src)
 
     # Parse spec and check that wrapper scripts exist
-    template_dict, uri_dict = _parse_spec(src, interface=interface)
+    template_dict, uri_dict = _parse_spec(src, interface=interface, validate_spec=validate_spec)
 
     # Check that destination folder exists
     dest = _check_dest(dest, default=src)
 
     # Pin the uv lockfile
-    _lock_environment(src)
+    if lock_environment:
+        _lock_environment(src)
 
-    # Copy project src
+    # Sync project src, extra barebone packages and data folder (if exist) like rsync, so unchanged files (e.g. large
+    # models in data) are not rewritten. Rendered templates in src are kept, they are rewritten afterwards
     fs = fsspec.filesystem(urlparse(dest).scheme)
-    project_src = urljoin(src, "src")
-    fs.cp(project_src, dest, recursive=True)
-
-    # Copy extra barebone packages (if exist)
-    project_extra = urljoin(src, "extra")
-    if fs.exists(project_extra):
-        fs.cp(project_extra, dest, recursive=True)
-
-    # Copy data folder (if exist)
-    project_data = urljoin(src, "data")
-    if fs.exists(project_data):
-        fs.cp(project_data, dest, recursive=True)
-
-    # Copy pyproject.toml
-    pyproject_toml = urljoin(src, PYPROJECT_FILENAME)
-    fs.cp(pyproject_toml, dest)
-
-    # Copy .python_version
-    python_version = urljoin(src, PYTHONVERSION_FILENAME)
-    fs.cp(python_version, dest)
-
-    # Copy spec.json
-    spec_json = urljoin(src, SPEC_FILENAME)
-    fs.cp(spec_json, dest)
-
-    # Copy uv.lock to dest
-    uv_lock = urljoin(src, UVLOCK_FILENAME)
-    fs.cp(uv_lock, dest)
+    rendered = [_rendered_path(path) for path in (GRPC_TEMPLATES if interface == "grpc" else ARGS_TEMPLATES)]
+    proto_files = _proto_package_files() if interface == "grpc" else []
+    for folder in ["src", "extra", "data"]:
+        project_folder = urljoin(src, folder)
+        if fs.exists(project_folder):
+            keep = [os.path.relpath(path, folder) for path in rendered if path.startswith(folder + "/")]
+            keep += proto_files if folder == "extra" else []
+            copied, removed = sync_directory(fs, project_folder, urljoin(dest, folder), keep=keep)
+            logger.debug(f"Synced {project_folder}: {copied} files copied, {removed} stale files removed")
+        else:
+            # The Dockerfile copies extra and data as layers of their own, so they exist even if empty
+            fs.makedirs(urljoin(dest, folder), exist_ok=True)
+
+    # The grpc backend imports the protocol from the prebuilt mki-barebone-proto package instead of compiling protos
+    extra = os.path.dirname(PROTO_PACKAGE_DIRECTORY)
+    for path in proto_files:
+        sync_file(fs, os.path.abspath(os.path.join(extra, path)), urljoin(dest, f"extra/{path}"))
+
+    # Sync pyproject.toml, .python_version, spec.json and uv.lock
+    for filename in [PYPROJECT_FILENAME, PYTHONVERSION_FILENAME, SPEC_FILENAME, UVLOCK_FILENAME]:
+        sync_file(fs, urljoin(src, filename), urljoin(dest, filename))
 
     return src, dest, template_dict, uri_dict
 
 
-def create_args_docker_context(src, dest=None):
+def create_args_docker_context(src, dest=None, validate_spec=True, base_image=None, lock_environment=True):
     """Creates a docker context for a tool container with a args message passing interface
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
+        base_image (str, optional): Shared base image to build on (see create_base_docker_context). Defaults to None.
+        lock_environment (bool, optional): Pin the uv lockfile first. Defaults to True.
 
     Returns:
         dict: Flat dictionary for template rendering
         dict: Flat dictionary of fully qualified uris
     """
-    src, dest, template_dict, uri_dict = _create_docker_context(src, dest, interface="args")
+    src, dest, template_dict, uri_dict = _create_docker_context(
+        src, dest, interface="args", validate_spec=validate_spec, lock_environment=lock_environment
+    )
+    if base_image is not None:
+        template_dict.update(base_image=base_image, base_builder_image=_base_builder_image(base_image))
     _render_templates(ARGS_TEMPLATES, dest, template_dict)
 
     return template_dict, uri_dict
 
 
-def create_grpc_docker_context(src, dest=None):
+def create_grpc_docker_context(src, dest=None, validate_spec=True, base_image=None, lock_environment=True):
     """Creates a docker context for a tool container with a grpc message passing interface
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
+        base_image (str, optional): Shared base image to build on (see create_base_docker_context). Defaults to None.
+        lock_environment (bool, optional): Pin the uv lockfile first. Defaults to True.
 
     Returns:
         dict: Flat dictionary for template rendering
         dict: Flat dictionary of fully qualified uris
     """
 
-    src, dest, template_dict, uri_dict = _create_docker_context(src, dest, interface="grpc")
+    src, dest, template_dict, uri_dict = _create_docker_context(
+        src, dest, interface="grpc", validate_spec=validate_spec, lock_environment=lock_environment
+    )
+    if base_image is not None:
+        template_dict.update(base_image=base_image, base_builder_image=_base_builder_image(base_image))
     _render_templates(GRPC_TEMPLATES, dest, template_dict)
 
     return template_dict, uri_dict
 
 
-def create_grpc(src, dest=None):
+def create_grpc(src, dest=None, validate_spec=True):
     """Creates a tool container with a grpc message passing interface
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
     """
-    template_dict, uri_dict = create_grpc_docker_context(src, dest)
+    template_dict, uri_dict = create_grpc_docker_context(src, dest, validate_spec=validate_spec)
 
     imgid = _build_docker(dest, template_dict["name"])
 
     return imgid, template_dict, uri_dict
 
 
-def create_args(src, dest=None):
+def create_args(src, dest=None, validate_spec=True):
     """Creates a tool container with a cwl message passing interface
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
     """
 
-    template_dict, uri_dict = create_args_docker_context(src, dest)
+    template_dict, uri_dict = create_args_docker_context(src, dest, validate_spec=validate_spec)
 
     imgid = _build_docker(dest, template_dict["name"])
 
     return imgid, template_dict, uri_dict
 
 
-def create(src, dest=None, interface="args"):
+def create(src, dest=None, interface="args", validate_spec=True):
     """Creates a platform-compatible container of the tool located at src
 
     Args:
         src (str): URI pointing to the tool artifact directory
         dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
         interface (str, optional): The orchestration engine to be used. Either grpc or args. Defaults to args.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
 
     Raises:
         FileNotFoundError: If the required files are not found
@@ -379,14 +551,466 @@ def create(src, dest=None, interface="args"):
     """
 
     if interface == "grpc":
-        return create_grpc(src, dest)
+        return create_grpc(src, dest, validate_spec=validate_spec)
 
     if interface == "args":
-        return create_args(src, dest)
+        return create_args(src, dest, validate_spec=validate_spec)
 
     raise NotImplementedError(f"Generation with interface {interface} is currently not supported.")
 
 
+def _base_builder_image(image):
+    """Returns the builder stage image of a shared base image, e.g. repo/base-builder:tag for repo/base:tag
+
+    Args:
+        image (str): The shared base image
+
+    Returns:
+        str: The builder image
+    """
+    repository, _, tag = image.rpartition(":")
+    if not repository or "/" in tag:
+        repository, tag = image, "latest"
+    return f"{repository}-builder:{tag}"
+
+
+def parse_requirements(text):
+    """Parses an exported requirements file (uv export) into its pinned requirements
+    Continuation lines are joined, so a requirement includes its markers and hashes. Comments, options and
+    requirements that are not pinned by version (e.g. local or editable packages) are skipped.
+
+    Args:
+        text (str): Content of the requirements file
+
+    Returns:
+        set: The normalized requirement strings
+    """
+    requirements = set()
+    for line in text.replace("\\\n", " ").splitlines():
+        requirement = " ".join(line.split("#", 1)[0].split())
+        if re.match(r"^[A-Za-z0-9][A-Za-z0-9._-]*(\[[^\]]*\])?==[^ ;]+", requirement):
+            requirements.add(requirement)
+    return requirements
+
+
+def _export_requirements(src):
+    """Exports the locked dependencies of a tool (without the tool itself and dev dependencies) with hashes
+
+    Args:
+        src (str): URI pointing to the tool artifact directory
+
+    Returns:
+        str: The requirements file
+    """
+    with CwdContextManager(logger=logger):
+        result = subprocess.run(
+            ["uv", "export", "--frozen", "--no-dev", "--no-emit-project", "--no-header", "--no-annotate"],
+            cwd=src,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    return result.stdout
+
+
+def shared_requirements(srcs):
+    """Returns the locked dependencies all tools have in common, with the same version, markers and hashes
+
+    Args:
+        srcs (list): URIs pointing to the tool artifact directories
+
+    Returns:
+        list: The sorted requirement strings
+    """
+    requirements = None
+    for src in srcs:
+        src = _check_src(src)
+        _lock_environment(src)
+        tool_requirements = parse_requirements(_export_requirements(src))
+        requirements = tool_requirements if requirements is None else requirements & tool_requirements
+    return sorted(requirements or [])
+
+
+def create_base_docker_context(srcs, dest, name="mki-base", build_args=None):
+    """Creates the docker context of a shared base image with the locked dependencies the tools have in common.
+    Tool images built on the base (base_image of create_grpc_docker_context / create_args_docker_context) only
+    add the files of their environment that differ from the base. The tag is derived from the requirements, the
+    rendered Dockerfile, the Makefile template and the build arguments, so the same inputs always result in the same
+    image and a change of any of them in a new one. The build arguments are fixed in the Makefile of the context.
+
+    Args:
+        srcs (list): URIs pointing to the tool artifact directories
+        dest (str): Where to create the docker context
+        name (str, optional): Name (repository) of the base image. Defaults to "mki-base".
+        build_args (dict, optional): Build arguments of the base image, overriding the defaults UID (of the current
+            user, as for the tool images) and COMPILE_BYTECODE=1. Defaults to None.
+
+    Raises:
+        ValueError: If the tools have no dependencies in common
+
+    Returns:
+        str: The base image
+    """
+
+    requirements = shared_requirements(srcs)
+    if not requirements:
+        raise ValueError("The tools have no locked dependencies in common")
+    content = "\n".join(requirements) + "\n"
+    build_args = dict(dict(UID=os.getuid(), COMPILE_BYTECODE=1), **(build_args or {}))
+    build_args = " ".join(f"--build-arg {key}={value}" for key, value in sorted(build_args.items()))
+
+    dockerfile = _render_template(BASE_DOCKERFILE_TEMPLATE, dict(name=name))
+    digest = hashlib.sha256(content.encode("utf8"))
+    digest.update(b"\0" + dockerfile.encode("utf8"))
+    digest.update(b"\0" + build_args.encode("utf8"))
+    # The Makefile contains the tag itself, its template covers the build commands and SOURCE_DATE_EPOCH
+    for template_path in BASE_TEMPLATES:
+        if template_path != BASE_DOCKERFILE_TEMPLATE:
+            with open(os.path.join(TEMPLATES_DIRECTORY, template_path), "rb") as f:
+                digest.update(b"\0" + f.read())
+    tag = digest.hexdigest()[:12]
+    logger.debug(f"Shared base {name}:{tag} with {len(requirements)} dependencies, {build_args}")
+
+    dest = _check_dest(dest)
+    fs = fsspec.filesystem(urlparse(dest).scheme)
+    with fs.open(urljoin(dest, BASE_REQUIREMENTS_FILENAME), "w") as f:
+        f.write(content)
+
+    # The base templates are rendered to the root of the context
+    for template_path in BASE_TEMPLATES:
+        if template_path == BASE_DOCKERFILE_TEMPLATE:
+            rendered_template = dockerfile
+        else:
+            rendered_template = _render_template(template_path, dict(name=name, tag=tag, build_args=build_args))
+        with fs.open(urljoin(dest, os.path.basename(_rendered_path(template_path))), "w") as f:
+            f.write(rendered_template)
+
+    return f"{name}:{tag}"
+
+
+def _build_base(dest):
+    """Builds the shared base image from dest and pushes it, so the builder of the tool images can pull it
+
+    Args:
+        dest (str): Path to the docker context of the base image
+    """
+    with CwdContextManager(logger=logger):
+        with _builder_lock:
+            subprocess.run(["make", "check-builder"], cwd=dest, check=True)
+        subprocess.run(["make", "push"], cwd=dest, check=True)
+
+
+def fingerprint(src, interface="args", base_image=None):
+    """Hashes everything the docker context of a tool is generated from: the spec, pyproject.toml, .python-version,
+    the lockfile, the src, extra and data trees, the templates of the interface (with the mki-barebone-proto package
+    for grpc) and the shared base image
+
+    Args:
+        src (str): URI pointing to the tool artifact directory
+        interface (str, optional): Either grpc or args. Defaults to args.
+        base_image (str, optional): Shared base image the tool is built on. Defaults to None.
+
+    Returns:
+        str: The sha256 hex digest
+    """
+
+    src = normalize_uri(src)
+    fs = fsspec.filesystem(urlparse(src).scheme)
+    root = fsspec.core.strip_protocol(src)
+    digest = hashlib.sha256(interface.encode("utf8"))
+    if base_image is not None:
+        digest.update(b"\0" + base_image.encode("utf8"))
+
+    def update(name, content):
+        digest.update(name.encode("utf8") + b"\0" + hashlib.sha256(content).digest())
+
+    for filename in [SPEC_FILENAME, PYPROJECT_FILENAME, PYTHONVERSION_FILENAME, UVLOCK_FILENAME]:
+        update(filename, fs.cat_file(urljoin(src, filename)))
+
+    for folder in ["src", "extra", "data"]:
+        folder_uri = urljoin(src, folder)
+        if not fs.exists(folder_uri):
+            continue
+        for path in sorted(fs.find(folder_uri)):
+            relpath = os.path.relpath(path, root)
+            if not any(part in FINGERPRINT_EXCLUDES for part in relpath.split(os.sep)):
+                update(relpath, fs.cat_file(path))
+
+    for template_path in GRPC_TEMPLATES if interface == "grpc" else ARGS_TEMPLATES:
+        with open(os.path.join(TEMPLATES_DIRECTORY, template_path), "rb") as f:
+            update(template_path, f.read())
+
+    for path in _proto_package_files() if interface == "grpc" else []:
+        with open(os.path.join(os.path.dirname(PROTO_PACKAGE_DIRECTORY), path), "rb") as f:
+            update(path, f.read())
+
+    return digest.hexdigest()
+
+
+def _image_fingerprint(name):
+    """Returns the fingerprint label of a docker image
+
+    Args:
+        name (str): Name of the image
+
+    Returns:
+        str: The fingerprint, None if the image does not exist or has no fingerprint
+    """
+    if not docker.image.exists(name):
+        return None
+    return (docker.image.inspect(name).config.labels or dict()).get(FINGERPRINT_LABEL)
+
+
+def create_incremental(src, dest=None, interface="args", force=False, validate_spec=True, base_image=None):
+    """Creates a platform-compatible container of the tool located at src, unless the image of the tool was already
+    built from the same sources. The image is labeled with the fingerprint of its sources (see fingerprint)
+
+    Args:
+        src (str): URI pointing to the tool artifact directory
+        dest (str, optional): Where to create the container. If None, src will be used. Defaults to None.
+        interface (str, optional): The orchestration engine to be used. Either grpc or args. Defaults to args.
+        force (bool, optional): Build even if the fingerprint matches. Defaults to False.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
+        base_image (str, optional): Shared base image to build on (see create_base_docker_context). Defaults to None.
+
+    Returns:
+        str: The image id
+    """
+
+    if interface not in ("grpc", "args"):
+        raise NotImplementedError(f"Generation with interface {interface} is currently not supported.")
+
+    src = _check_src(src)
+    name = _parse_spec(src, interface=interface, validate_spec=validate_spec)[0]["name"]
+    # uv sync may rewrite uv.lock, the fingerprint is taken of the locked sources the image is built from
+    _lock_environment(src)
+    digest = fingerprint(src, interface=interface, base_image=base_image)
+    if not force and _image_fingerprint(name) == digest:
+        logger.info(f"Image {name} is up to date (fingerprint {digest[:12]}), skipping")
+        return docker.image.inspect(name).id
+
+    dest = _check_dest(dest, default=src)
+    if interface == "grpc":
+        create_grpc_docker_context(
+            src, dest, validate_spec=validate_spec, base_image=base_image, lock_environment=False
+        )
+    else:
+        create_args_docker_context(
+            src, dest, validate_spec=validate_spec, base_image=base_image, lock_environment=False
+        )
+    return _build_docker(dest, name, labels={FINGERPRINT_LABEL: digest})
+
+
+def create_many(srcs, dest=None, interface="args", max_workers=None, force=False, validate_spec=True, base=None):
+    """Creates the containers of several tools concurrently, tools whose image is up to date are skipped
+    (see create_incremental). Optionally the dependencies the tools have in common are installed once into a shared
+    base image the tool images build on (see create_base_docker_context)
+
+    Args:
+        srcs (list): URIs pointing to the tool artifact directories
+        dest (str, optional): Directory in which a docker context is created per tool, named after the tool. If None,
+            the contexts are created in the tool artifact directories. Defaults to None.
+        interface (str, optional): The orchestration engine to be used. Either grpc or args. Defaults to args.
+        max_workers (int, optional): Number of tools built at the same time. Defaults to the executor default.
+        force (bool, optional): Build even if the fingerprints match. Defaults to False.
+        validate_spec (bool, optional): Validate the spec against the toolspec schema. Defaults to True.
+        base (str, optional): Repository of the shared base image, e.g. registry.example.com/mki-base. The base is
+            pushed, so it must be reachable by the docker builder. Its context is created in dest/base. Defaults to
+            None (no shared base).
+
+    Raises:
+        ValueError: If a shared base is requested without dest
+
+    Returns:
+        list: The image ids in the order of srcs
+    """
+
+    base_image = None
+    if base is not None:
+        if dest is None:
+            raise ValueError("A shared base image requires a destination for the docker contexts")
+        base_dest = urljoin(normalize_uri(dest), "base")
+        base_image = create_base_docker_context(srcs, base_dest, name=base)
+        # The build of an unchanged base is cached by the builder and pushes no new layers
+        _build_base(base_dest)
+
+    def create_tool(src):
+        tool_dest = None
+        if dest is not None:
+            name = _parse_spec(normalize_uri(src), interface=interface, validate_spec=validate_spec)[0]["name"]
+            tool_dest = urljoin(normalize_uri(dest), normalize_path(name))
+        return create_incremental(
+            src, tool_dest, interface=interface, force=force, validate_spec=validate_spec, base_image=base_image
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(create_tool, src) for src in srcs]
+        return [future.result() for future in futures]
+
+
+def _read_toml(fs, uri):
+    """Reads a toml file
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of the file
+        uri (str): URI of the file
+
+    Returns:
+        dict: The parsed file
+    """
+    with fs.open(uri, "rb") as f:
+        return tomllib.load(f)
+
+
+def _merge_folder(fs, src, dest, folder, merged, exclude=()):
+    """Copies the files of a folder of a tool into the merged tool, a file that another tool provides with a
+    different content is a conflict
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of src and dest
+        src (str): URI pointing to the tool artifact directory
+        dest (str): URI of the merged tool directory
+        folder (str): The folder, e.g. src
+        merged (dict): (tool, digest) of the files merged so far by their path relative to dest, is updated
+        exclude (Iterable[str], optional): Paths relative to dest that are not merged. Defaults to ().
+
+    Raises:
+        ValueError: If two tools provide the same file with a different content
+    """
+    tool = fsspec.core.strip_protocol(src).rstrip("/")
+    folder_uri = urljoin(src, folder)
+    if not fs.exists(folder_uri):
+        return
+    for path in sorted(fs.find(folder_uri)):
+        relpath = os.path.relpath(path, tool)
+        if relpath in exclude or any(part in MERGED_EXCLUDES for part in relpath.split(os.sep)):
+            continue
+        digest = file_digest(fs, path)
+        if relpath in merged and merged[relpath][1] != digest:
+            raise ValueError(f"{relpath} of {tool} conflicts with {relpath} of {merged[relpath][0]}")
+        merged[relpath] = (tool, digest)
+        sync_file(fs, path, urljoin(dest, relpath))
+
+
+def merge_tools(srcs, dest, name, validate_spec=True):
+    """Merges several tools into the artifact directory of one tool, so they can be served by one container.
+    The functions of the merged spec are namespaced by their tool (see _parse_spec), the src, extra and data
+    folders are combined and the dependencies of the tools are locked together in one environment.
+
+    Args:
+        srcs (list): URIs pointing to the tool artifact directories
+        dest (str): URI of the directory of the merged tool
+        name (str): Name of the merged tool
+        validate_spec (bool, optional): Validate the specs against the toolspec schema. Defaults to True.
+
+    Raises:
+        ValueError: If the tools cannot be combined, e.g. different python versions or conflicting files
+
+    Returns:
+        str: dest normalized
+    """
+
+    srcs = [_check_src(src) for src in srcs]
+    dest = _check_dest(dest)
+    fs = fsspec.filesystem(urlparse(dest).scheme)
+
+    python_versions = {fs.cat_file(urljoin(src, PYTHONVERSION_FILENAME)).strip() for src in srcs}
+    if len(python_versions) > 1:
+        raise ValueError(f"The tools use different python versions: {sorted(v.decode() for v in python_versions)}")
+
+    spec = dict(id=None, description=None, functions=dict(), build=dict(requirements=""))
+    tools, packages, dependencies, sources, requires_python = [], [], [], dict(), []
+    merged = dict()
+    rendered = {_rendered_path(path) for path in GRPC_TEMPLATES + ARGS_TEMPLATES}
+    rendered.update(f"extra/{path}" for path in _proto_package_files())
+    for src in srcs:
+        # Specs
+        with fs.open(urljoin(src, SPEC_FILENAME), "r") as f:
+            tool_spec = json.load(f)
+        if validate_spec:
+            try:
+                validate(tool_spec)
+            except Exception as err:
+                raise ValueError(f"Invalid spec {urljoin(src, SPEC_FILENAME)}: {err}")
+        tool = tool_spec["id"]["name"]
+        if tool in tools:
+            raise ValueError(f"Tool {tool} is merged twice")
+        tools.append(tool)
+        spec["id"] = spec["id"] or dict(domain=tool_spec["id"]["domain"], name=name)
+        for key, function in tool_spec["functions"].items():
+            spec["functions"][re.sub(r"\W", "_", tool) + "__" + key] = dict(function, namespace=tool)
+
+        # Project files
+        pyproject = _read_toml(fs, urljoin(src, PYPROJECT_FILENAME))
+        project = pyproject.get("project", dict())
+        if project.get("requires-python") and project["requires-python"] not in requires_python:
+            requires_python.append(project["requires-python"])
+        dependencies += [dependency for dependency in project.get("dependencies", []) if dependency not in dependencies]
+        wheel = pyproject.get("tool", dict()).get("hatch", dict()).get("build", dict()).get("targets", dict())
+        packages += [package for package in wheel.get("wheel", dict()).get("packages", []) if package not in packages]
+        for package, source in pyproject.get("tool", dict()).get("uv", dict()).get("sources", dict()).items():
+            if sources.setdefault(package, source) != source:
+                raise ValueError(f"The tools have different sources for {package}: {sources[package]}, {source}")
+
+        # Folders, rendered templates and the proto package of tools whose context was created in place are skipped
+        for folder in ["src", "extra", "data"]:
+            _merge_folder(fs, src, dest, folder, merged, exclude=rendered)
+
+    spec["description"] = f"Merged tools {', '.join(tools)}"
+    with fs.open(urljoin(dest, SPEC_FILENAME), "w") as f:
+        json.dump(spec, f, indent=4)
+    fs.pipe_file(urljoin(dest, PYTHONVERSION_FILENAME), python_versions.pop() + b"\n")
+
+    pyproject = _render_template(
+        MERGED_PYPROJECT_TEMPLATE,
+        dict(
+            name=name,
+            tools=tools,
+            packages=packages,
+            dependencies=dependencies,
+            sources=sources,
+            requires_python=",".join(requires_python),
+        ),
+    )
+    with fs.open(urljoin(dest, PYPROJECT_FILENAME), "w") as f:
+        f.write(pyproject + "\n")
+
+    # Files of previous merges that no tool provides anymore
+    for folder in ["src", "extra", "data"]:
+        folder_uri = urljoin(dest, folder)
+        if not fs.exists(folder_uri):
+            continue
+        root = fsspec.core.strip_protocol(dest)
+        for path in fs.find(folder_uri):
+            relpath = os.path.relpath(path, root)
+            if relpath not in merged and relpath not in rendered:
+                fs.rm_file(path)
+
+    # Lock the dependencies of all tools together
+    _lock_environment(dest)
+
+    return dest
+
+
+def create_merged(srcs, dest, name, validate_spec=True):
+    """Creates one container with a grpc message passing interface that serves the functions of several tools, so
+    the tools share one python process (and e.g. one copy of numpy) instead of one container each (see merge_tools)
+
+    Args:
+        srcs (list): URIs pointing to the tool artifact directories
+        dest (str): Where to create the merged tool and its container
+        name (str): Name of the merged tool
+        validate_spec (bool, optional): Validate the specs against the toolspec schema. Defaults to True.
+
+    Returns:
+        str: The image id
+        dict: Flat dictionary for template rendering
+        dict: Flat dictionary of fully qualified uris
+    """
+    dest = merge_tools(srcs, dest, name, validate_spec=validate_spec)
+    return create_grpc(dest, dest, validate_spec=validate_spec)
+
+
 def validate_toolspec(toolspec):
     """
     Validates the given toolspec against the jsonschema definition for tool specs.
@@ -405,9 +1029,38 @@ def validate_toolspec(toolspec):
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("-i", type=str, required=True)
-    parser.add_argument("-o", type=str)
-    parser.add_argument("--interface", type=str, default="args")
-    args = parser.parse_args()
-    create(args.i, args.o, interface=args.interface)
+    if sys.argv[1:2] == ["merge"]:
+        parser = argparse.ArgumentParser(prog="main.py merge")
+        parser.add_argument("-i", type=str, nargs="+", required=True)
+        parser.add_argument("-o", type=str, required=True, help="Directory for the merged tool and its docker context")
+        parser.add_argument("--name", type=str, required=True, help="Name of the merged tool")
+        parser.add_argument("--no-validate", action="store_true", help="Do not validate the specs")
+        args = parser.parse_args(sys.argv[2:])
+        create_merged(args.i, args.o, args.name, validate_spec=not args.no_validate)
+    elif sys.argv[1:2] == ["create-many"]:
+        parser = argparse.ArgumentParser(prog="main.py create-many")
+        parser.add_argument("-i", type=str, nargs="+", required=True)
+        parser.add_argument("-o", type=str, help="Directory for the docker contexts, one subdirectory per tool")
+        parser.add_argument("--interface", type=str, default="args")
+        parser.add_argument("-j", "--jobs", type=int, help="Number of tools built at the same time")
+        parser.add_argument("--force", action="store_true", help="Build even if the image is up to date")
+        parser.add_argument("--no-validate", action="store_true", help="Do not validate the specs")
+        parser.add_argument("--base", type=str, help="Repository of a shared base image with the common dependencies")
+        args = parser.parse_args(sys.argv[2:])
+        create_many(
+            args.i,
+            args.o,
+            interface=args.interface,
+            max_workers=args.jobs,
+            force=args.force,
+            validate_spec=not args.no_validate,
+            base=args.base,
+        )
+    else:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("-i", type=str, required=True)
+        parser.add_argument("-o", type=str)
+        parser.add_argument("--interface", type=str, default="args")
+        parser.add_argument("--no-validate", action="store_true", help="Do not validate the spec")
+        args = parser.parse_args()
+        create(args.i, args.o, interface=args.interface, validate_spec=not args.no_validate)
@@ -0,0 +1,173 @@
+"""gRPC Servicer for chunked artifact transfer, for nodes that do not share a volume with the orchestrator"""
+
+import hashlib
+import os
+import tempfile
+from urllib.parse import urlparse
+
+import grpc
+
+import mki_barebone_proto.module_pb2 as module_pb2
+import mki_barebone_proto.module_pb2_grpc as module_pb2_grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+CHUNK_SIZE = 1 << 20  # 1 MiB, well below the default gRPC message size limit of 4 MiB
+MAX_CHUNK_SIZE = 3 << 20  # Larger requested chunks are capped, leaving room for the other fields of a chunk
+ARTIFACT_ROOTS_ENV = "MKI_ARTIFACT_ROOTS"
+DEFAULT_ARTIFACT_ROOTS = "/inputs:/results"
+
+COMPRESSION = {
+    "": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def artifact_roots():
+    """Returns the directories the artifact service may read from and write to
+
+    Returns:
+        list: Real paths of the directories listed in MKI_ARTIFACT_ROOTS (colon separated, defaults to
+        /inputs:/results)
+    """
+    roots = os.environ.get(ARTIFACT_ROOTS_ENV, DEFAULT_ARTIFACT_ROOTS)
+    return [os.path.realpath(root) for root in roots.split(":") if root]
+
+
+class ArtifactsServicer(module_pb2_grpc.ArtifactsServicer):
+    """A gRPC Servicer that streams artifacts between nodes in chunks
+
+    Chunks are produced lazily, so gRPC/HTTP2 flow control bounds the amount of data held in memory
+    to a few chunks regardless of the artifact size.
+    """
+
+    def __init__(self, roots=None):
+        self.roots = roots if roots is not None else artifact_roots()
+
+    def _resolve(self, uri, context):
+        """Maps a uri to a local path and rejects paths outside of the artifact roots"""
+
+        path = os.path.realpath(urlparse(uri).path)
+        if not any(path == root or path.startswith(root + os.sep) for root in self.roots):
+            context.abort(grpc.StatusCode.PERMISSION_DENIED, f"{uri} is outside of the artifact roots")
+        return path
+
+    def upload(self, request_iterator, context):
+        """Receives an artifact in chunks and writes it atomically to the uri of the first chunk
+
+        Args:
+            request_iterator (iterator): An iterator of "ArtifactChunk"s (see module.proto)
+            context (): context information provided by grpc
+
+        Returns:
+            gRPC Python Message: of type "ArtifactInfo" (see module.proto)
+        """
+
+        first = next(request_iterator, None)
+        if first is None:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Upload did not contain any chunk")
+
+        path = self._resolve(first.uri, context)
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                chunk = first
+                while chunk is not None:
+                    f.write(chunk.data)
+                    digest.update(chunk.data)
+                    size += len(chunk.data)
+                    chunk = next(request_iterator, None)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        logger.debug(f"Received {size} bytes for {first.uri}")
+        return module_pb2.ArtifactInfo(uri=first.uri, size=size, payload_id=f"sha256:{digest.hexdigest()}")
+
+    def download(self, request, context):
+        """Streams an artifact in chunks
+
+        Args:
+            request (Python gRPC-Message): An "ArtifactRequest" (see module.proto), offset and length can be used
+              to request a byte range, chunk_size is capped at MAX_CHUNK_SIZE
+            context (): context information provided by grpc
+
+        Yields:
+            gRPC Python Message: of type "ArtifactChunk" (see module.proto)
+        """
+
+        path = self._resolve(request.uri, context)
+        if not os.path.isfile(path):
+            context.abort(grpc.StatusCode.NOT_FOUND, f"{request.uri} does not exist")
+        if request.compression not in COMPRESSION:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown compression {request.compression}")
+        context.set_compression(COMPRESSION[request.compression])
+
+        chunk_size = min(request.chunk_size or CHUNK_SIZE, MAX_CHUNK_SIZE)
+        remaining = request.length or -1  # A length of 0 reads to the end of the file
+        offset = request.offset
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while remaining != 0:
+                data = f.read(chunk_size if remaining < 0 else min(chunk_size, remaining))
+                if not data:
+                    break
+                yield module_pb2.ArtifactChunk(uri=request.uri, data=data, offset=offset)
+                offset += len(data)
+                if remaining > 0:
+                    remaining -= len(data)
+
+    def stat(self, request, context):
+        """Returns the size of an artifact, or that it is a directory
+
+        Args:
+            request (Python gRPC-Message): An "ArtifactRequest" (see module.proto)
+            context (): context information provided by grpc
+
+        Returns:
+            gRPC Python Message: of type "ArtifactInfo" (see module.proto)
+        """
+
+        path = self._resolve(request.uri, context)
+        if os.path.isdir(path):
+            return module_pb2.ArtifactInfo(uri=request.uri, directory=True)
+        if not os.path.isfile(path):
+            context.abort(grpc.StatusCode.NOT_FOUND, f"{request.uri} does not exist")
+        return module_pb2.ArtifactInfo(uri=request.uri, size=os.path.getsize(path))
+
+    def list(self, request, context):
+        """Lists the files and subdirectories of a directory, a file is listed as itself
+
+        Args:
+            request (Python gRPC-Message): An "ArtifactRequest" (see module.proto)
+            context (): context information provided by grpc
+
+        Returns:
+            gRPC Python Message: of type "ArtifactListing" (see module.proto)
+        """
+
+        path = self._resolve(request.uri, context)
+        if os.path.isfile(path):
+            return module_pb2.ArtifactListing(entries=[self.stat(request, context)])
+        if not os.path.isdir(path):
+            context.abort(grpc.StatusCode.NOT_FOUND, f"{request.uri} does not exist")
+
+        uri = request.uri.rstrip("/")
+        entries = []
+        with os.scandir(path) as it:
+            for entry in sorted(it, key=lambda entry: entry.name):
+                if entry.is_dir():
+                    entries.append(module_pb2.ArtifactInfo(uri=f"{uri}/{entry.name}", directory=True))
+                elif entry.is_file():
+                    entries.append(module_pb2.ArtifactInfo(uri=f"{uri}/{entry.name}", size=entry.stat().st_size))
+        return module_pb2.ArtifactListing(entries=entries)
@@ -0,0 +1,87 @@
+"""gRPC Servicer for the standard health checking protocol (grpc.health.v1)
+
+The server reports NOT_SERVING until the tool module is imported and warmed up, so orchestrators and container
+healthchecks only send work to a tool that answers without cold-call latency.
+"""
+
+import threading
+
+import grpc
+
+import mki_barebone_proto.health_pb2 as health_pb2
+import mki_barebone_proto.health_pb2_grpc as health_pb2_grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+SERVICE_UNKNOWN = health_pb2.HealthCheckResponse.SERVICE_UNKNOWN
+
+# The whole server ("") and the services provided by the tool
+SERVICES = ["", "Module", "Artifacts"]
+
+
+class HealthServicer(health_pb2_grpc.HealthServicer):
+    """A gRPC Servicer that reports the serving status of the server and its services"""
+
+    def __init__(self, services=SERVICES):
+        """
+        Args:
+            services (list, optional): Names of the services to report. Defaults to SERVICES.
+        """
+        self._statuses = {service: NOT_SERVING for service in services}
+        self._condition = threading.Condition()
+
+    def set_status(self, status):
+        """Sets the status of all services
+
+        Args:
+            status (int): A HealthCheckResponse.ServingStatus, e.g. SERVING
+        """
+        logger.debug(f"Serving status: {health_pb2.HealthCheckResponse.ServingStatus.Name(status)}")
+        with self._condition:
+            for service in self._statuses:
+                self._statuses[service] = status
+            self._condition.notify_all()
+
+    def Check(self, request, context):
+        """Returns the current status of a service
+
+        Args:
+            request (Python gRPC-Message): A "HealthCheckRequest" (see health.proto)
+            context (): context information provided by grpc
+
+        Returns:
+            gRPC Python Message: of type "HealthCheckResponse" (see health.proto)
+        """
+
+        with self._condition:
+            status = self._statuses.get(request.service)
+        if status is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown service {request.service}")
+        return health_pb2.HealthCheckResponse(status=status)
+
+    def Watch(self, request, context):
+        """Streams the status of a service, a new response is sent whenever the status changes
+
+        Args:
+            request (Python gRPC-Message): A "HealthCheckRequest" (see health.proto)
+            context (): context information provided by grpc
+
+        Yields:
+            gRPC Python Message: of type "HealthCheckResponse" (see health.proto)
+        """
+
+        last = None
+        while context.is_active():
+            with self._condition:
+                status = self._statuses.get(request.service, SERVICE_UNKNOWN)
+                if status == last:
+                    # Wake up regularly to notice cancelled watches
+                    self._condition.wait(timeout=1)
+                    continue
+            last = status
+            yield health_pb2.HealthCheckResponse(status=status)
@@ -1,21 +1,136 @@
 """gRPC Server for dispatching execution messages to underlying python tool functions"""
 
+import contextlib
+import os
+import resource
+import socket
+import threading
+import time
+
 import grpc
 import concurrent.futures as futures
 
-import grpc_backend.module_pb2_grpc as module_pb2_grpc
+import mki_barebone_proto.health_pb2_grpc as health_pb2_grpc
+import mki_barebone_proto.module_pb2 as module_pb2
+import mki_barebone_proto.module_pb2_grpc as module_pb2_grpc
 
+from grpc_backend.artifacts import ArtifactsServicer
+from grpc_backend.health import HealthServicer, SERVING
+from grpc_backend.metrics import MetricsInterceptor, ServerMetrics, serve_metrics
+from grpc_backend.tracing import server_span, setup_tracing, span
 from grpc_backend.utils import execution_message_from_dict, execution_message_to_dict
-from tool import funcwrapper
+from profiling import attach_profile, profiled
 
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+try:
+    from mki_barebone_io.instrumentation import record
+except ImportError:  # Tools without mki_barebone_io: loading and storing is part of the compute time
+
+    class _Recording:
+        load_seconds = store_seconds = 0.0
+        bytes_read = bytes_written = cache_hits = 0
+
+    def record():
+        return contextlib.nullcontext(_Recording())
+
+
+NODE_NAME = os.environ.get("MKI_NODE_NAME") or socket.gethostname()
+
+# Accept the keepalive pings of clients with persistent channels instead of closing the connection (too_many_pings)
+SERVER_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_ping_interval_without_data_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
 
 class ModuleServicer(module_pb2_grpc.ModuleServicer):
-    """A gRPC Servicer that provides a service for dispatching execution messages to tool function wrappers"""
+    """A gRPC Servicer that provides a service for dispatching execution messages to tool function wrappers
+    Calls arriving before the tool module is loaded wait until load has finished.
+    """
+
+    def __init__(self):
+        self._funcwrapper = None
+        self._loaded = threading.Event()
+
+    def load(self):
+        """Imports the tool module (with the heavy imports of the tool functions) and runs its warmup function"""
+
+        import tool
+
+        warmup = getattr(tool, "warmup", None)
+        if warmup is not None:
+            logger.debug("Warming up tool")
+            warmup()
+        self._funcwrapper = tool.funcwrapper
+        self._loaded.set()
+
+    def _dispatch(self, request):
+        """Converts a single execution message, calls the tool function and converts the response
+        The meta of the response is completed with the node, the start timestamp and the metrics of the phases.
+        The execution and the call of the tool function are traced as spans (see tracing.py). If meta.profile is
+        set, the tool function is profiled and the profile added to the outputs (see profiling.py).
+
+        Args:
+            request (Python gRPC-Message): An "ExecutionMessage" (see module.proto)
+
+        Returns:
+            gRPC Python Message: of type "ExecutionMessage" (see module.proto)
+        """
+
+        self._loaded.wait()
+        logger.debug(f"Executing function {request.func}")
+        timestamp = time.time_ns() // 1000000
+        with span(f"execute {request.func}", execution_name=request.meta.execution_name or None, node=NODE_NAME):
+            start = time.perf_counter()
+            exec_message = execution_message_to_dict(request)
+            decoded = time.perf_counter()
+            with record() as recording, span(f"tool {request.func}"), profiled(exec_message) as profiler:
+                exec_response = self._funcwrapper(exec_message)
+            computed = time.perf_counter()
+            if profiler is not None:
+                attach_profile(profiler, exec_message, exec_response)
+            logger.debug(exec_response)
+            response = execution_message_from_dict(exec_response)
+            encoded = time.perf_counter()
+
+        response.meta.node = NODE_NAME
+        response.meta.timestamp = timestamp
+        metrics = response.meta.metrics
+        metrics.decode_seconds = decoded - start
+        metrics.load_seconds = recording.load_seconds
+        metrics.store_seconds = recording.store_seconds
+        metrics.compute_seconds = max(computed - decoded - recording.load_seconds - recording.store_seconds, 0.0)
+        metrics.encode_seconds = encoded - computed
+        metrics.process_peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+        metrics.bytes_read = recording.bytes_read
+        metrics.bytes_written = recording.bytes_written
+        metrics.cache_hits = recording.cache_hits
+        return response
+
+    def _dispatch_isolated(self, request):
+        """Like _dispatch, but a failing message does not abort the call
+        The request is returned with the error set in its meta, so the results of the other messages are kept.
+
+        Args:
+            request (Python gRPC-Message): An "ExecutionMessage" (see module.proto)
+
+        Returns:
+            gRPC Python Message: of type "ExecutionMessage" (see module.proto)
+        """
+
+        try:
+            return self._dispatch(request)
+        except Exception as err:
+            logger.exception(f"Executing function {request.func} failed")
+            response = module_pb2.ExecutionMessage()
+            response.CopyFrom(request)
+            response.meta.error = f"{type(err).__name__}: {err}"
+            return response
 
     def exec(self, request, context):
         """Dispatches the message to the exec function
@@ -29,28 +144,86 @@ class ModuleServicer(module_pb2_grpc.ModuleServicer):
             gRPC Python Message: of type "ExecutionMessage" (see tool.proto)
         """
 
-        logger.debug(f"Executing function {request.func}")
-        exec_message = execution_message_to_dict(request)
-        exec_response = funcwrapper(exec_message)
-        logger.debug(exec_response)
-        return execution_message_from_dict(exec_response)
+        with server_span("Module/exec", context):
+            return self._dispatch(request)
+
+    def execStream(self, request_iterator, context):
+        """Dispatches a stream of messages to the exec function
+        Responses are streamed back in request order as soon as each call has finished,
+        so the client can keep sending while the tool is computing.
+        A failing message is returned with meta.error set, the stream continues with the next message.
+
+        Args:
+            request_iterator (iterator): An iterator of "ExecutionMessage"s (see module.proto)
+            context (): context information provided by grpc
+
+        Yields:
+            gRPC Python Message: of type "ExecutionMessage" (see module.proto)
+        """
+
+        for request in request_iterator:
+            with server_span("Module/execStream", context):
+                response = self._dispatch_isolated(request)
+            yield response
 
+    def execBatch(self, request, context):
+        """Dispatches a batch of messages to the exec function within a single call
+        A failing message is returned with meta.error set, the other messages are still executed.
 
-def serve(port=8061):
+        Args:
+            request (Python gRPC-Message): An "ExecutionBatch" (see module.proto)
+            context (): context information provided by grpc
+
+        Returns:
+            gRPC Python Message: of type "ExecutionBatch" (see module.proto), one response per request in order
+        """
+
+        logger.debug(f"Executing batch of {len(request.messages)} messages")
+        with server_span("Module/execBatch", context, messages=len(request.messages)):
+            return module_pb2.ExecutionBatch(messages=[self._dispatch_isolated(msg) for msg in request.messages])
+
+
+def serve(port=8061, metrics_port=None, service_name="mki-tool"):
     """Factory to create a grpc server that provides the module service
+    The health service reports NOT_SERVING while the tool module is loaded and SERVING once it is warmed up.
+    Calls are traced if configured in the environment (see tracing.py).
 
     Args:
         port (int, optional): Port to listen to. Defaults to 8061.
+        metrics_port (int, optional): HTTP port to serve Prometheus metrics on (/metrics). Defaults to None
+            (disabled).
+        service_name (str, optional): Name of the tool in the traces. Defaults to "mki-tool".
 
     Returns:
         grpc.server: The gRPC server object
     """
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    module_pb2_grpc.add_ModuleServicer_to_server(ModuleServicer(), server)
+    setup_tracing(service_name)
+
+    interceptors = []
+    if metrics_port:
+        metrics = ServerMetrics()
+        interceptors.append(MetricsInterceptor(metrics))
+        serve_metrics(metrics, metrics_port)
+
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=10), options=SERVER_OPTIONS, interceptors=interceptors
+    )
+    health = HealthServicer()
+    module = ModuleServicer()
+    health_pb2_grpc.add_HealthServicer_to_server(health, server)
+    module_pb2_grpc.add_ModuleServicer_to_server(module, server)
+    module_pb2_grpc.add_ArtifactsServicer_to_server(ArtifactsServicer(), server)
 
     server.add_insecure_port("[::]:{}".format(port))
     logger.debug(f"Start server to port {port}")
     server.start()
 
+    try:
+        module.load()
+    except Exception:
+        server.stop(grace=None)
+        raise
+    health.set_status(SERVING)
+
     return server
@@ -1,6 +1,85 @@
-"""Utility functions for converting execution messages from grpc messages to dict and vice versa"""
-
-import grpc_backend.module_pb2 as module_pb2
+"""Utility functions for converting execution messages from grpc messages to dict and vice versa
+
+The conversion is driven by the message descriptors of module.proto, so every field (including
+ArtifactNodeLocation.parameters and ExecutionMeta.node/timestamp) survives a round trip. The field maps are
+compiled once at import time, messages are filled in place instead of being built from intermediate messages.
+String fields also accept a dict, which is stored as json string (e.g. ArtifactNodeLocation.parameters).
+"""
+
+import json
+
+from google.protobuf.descriptor import FieldDescriptor
+
+import mki_barebone_proto.module_pb2 as module_pb2
+
+
+def _is_repeated(field):
+    """Checks whether a field is repeated, FieldDescriptor.label was replaced by is_repeated in newer protobuf"""
+    if hasattr(field, "is_repeated"):
+        return field.is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+class _MessageConverter:
+    """Precompiled converter between a protobuf message type and a python dict"""
+
+    _cache = dict()
+
+    def __init__(self, descriptor):
+        self.fields = []
+        for field in descriptor.fields:
+            sub = _MessageConverter.get(field.message_type) if field.type == FieldDescriptor.TYPE_MESSAGE else None
+            repeated = _is_repeated(field)
+            # Scalars with presence (proto3 optional) and messages declared optional or in a oneof
+            optional = field.has_presence and not repeated and (sub is None or field.containing_oneof is not None)
+            string = field.type == FieldDescriptor.TYPE_STRING
+            self.fields.append((field.name, repeated, sub, optional, string))
+
+    @classmethod
+    def get(cls, descriptor):
+        """Returns the converter of a message descriptor, compiling it on first use"""
+        if descriptor.full_name not in cls._cache:
+            cls._cache[descriptor.full_name] = cls(descriptor)
+        return cls._cache[descriptor.full_name]
+
+    def to_dict(self, msg):
+        """Converts a message to a dict, optional fields are only included if set"""
+        d = dict()
+        for name, repeated, sub, optional, _ in self.fields:
+            if optional and not msg.HasField(name):
+                continue
+            value = getattr(msg, name)
+            if sub is not None:
+                value = [sub.to_dict(item) for item in value] if repeated else sub.to_dict(value)
+            elif repeated:
+                value = list(value)
+            d[name] = value
+        return d
+
+    def fill(self, msg, d):
+        """Fills a message in place from a dict, missing keys and None values are left unset"""
+        for name, repeated, sub, _, string in self.fields:
+            value = d.get(name)
+            if value is None:
+                continue
+            if sub is None:
+                if repeated:
+                    getattr(msg, name).extend(value)
+                elif string and isinstance(value, dict):
+                    setattr(msg, name, json.dumps(value))
+                else:
+                    setattr(msg, name, value)
+            elif repeated:
+                container = getattr(msg, name)
+                for item in value:
+                    sub.fill(container.add(), item)
+            else:
+                sub.fill(getattr(msg, name), value)
+        return msg
+
+
+_ARTIFACT_NODE_MESSAGE = _MessageConverter.get(module_pb2.ArtifactNodeMessage.DESCRIPTOR)
+_EXECUTION_MESSAGE = _MessageConverter.get(module_pb2.ExecutionMessage.DESCRIPTOR)
 
 
 def artifact_node_message_from_dict(d):
@@ -12,11 +91,7 @@ def artifact_node_message_from_dict(d):
     Returns:
         ResponseType: gRPC message wrapper for a ArtifactNodeMessage
     """
-    return module_pb2.ArtifactNodeMessage(
-        name=d.get("name"),
-        location=module_pb2.ArtifactNodeLocation(uri=d.get("location", {}).get("uri")),
-        payload_id=d.get("payload_id"),
-    )
+    return _ARTIFACT_NODE_MESSAGE.fill(module_pb2.ArtifactNodeMessage(), d)
 
 
 def artifact_node_message_to_dict(msg):
@@ -26,15 +101,9 @@ def artifact_node_message_to_dict(msg):
         msg (RequestType): gRPC message wrapper of an ArtifactNodeMessage
 
     Returns:
-        dict: The ArtifactNodeMessage as a python dict
+        dict: The ArtifactNodeMessage as a python dict, the inline payload is only included if set
     """
-    return dict(
-        name=msg.name,
-        location=dict(
-            uri=msg.location.uri,
-        ),
-        payload_id=msg.payload_id,
-    )
+    return _ARTIFACT_NODE_MESSAGE.to_dict(msg)
 
 
 def execution_message_from_dict(d):
@@ -47,12 +116,7 @@ def execution_message_from_dict(d):
         ResponseType: gRPC message wrapper for a ExecutionMessage
     """
 
-    return module_pb2.ExecutionMessage(
-        func=d.get("func"),
-        input=[artifact_node_message_from_dict(inp) for inp in d.get("input", [])],
-        output=[artifact_node_message_from_dict(inp) for inp in d.get("output", [])],
-        meta=module_pb2.ExecutionMeta(execution_name=d.get("meta", {}).get("execution_name")),
-    )
+    return _EXECUTION_MESSAGE.fill(module_pb2.ExecutionMessage(), d)
 
 
 def execution_message_to_dict(msg):
@@ -65,9 +129,4 @@ def execution_message_to_dict(msg):
         dict: The ExecutionMessage as a python dict
     """
 
-    return dict(
-        func=msg.func,
-        input=[artifact_node_message_to_dict(node_msg) for node_msg in msg.input],
-        output=[artifact_node_message_to_dict(node_msg) for node_msg in msg.output],
-        meta=dict(execution_name=msg.meta.execution_name),
-    )
+    return _EXECUTION_MESSAGE.to_dict(msg)
@@ -0,0 +1,43 @@
+"""Container healthcheck of the gRPC server, exits with 0 if the server on localhost reports SERVING
+
+    python src/enpkg/healthcheck.py [port]
+
+Docker runs the healthcheck every interval, so it only imports grpc and the health messages, not the tool,
+the backend or the package metadata of the proto package.
+"""
+
+import sys
+
+import grpc
+
+from mki_barebone_proto import health_pb2
+
+DEFAULT_PORT = 8061
+CHECK_METHOD = "/grpc.health.v1.Health/Check"
+
+
+def check(port: int = DEFAULT_PORT, timeout: float = 2.0) -> bool:
+    """Checks whether the local gRPC server reports SERVING
+
+    Args:
+        port (int, optional): Port of the gRPC server. Defaults to 8061.
+        timeout (float, optional): Deadline of the check in seconds. Defaults to 2.0.
+
+    Returns:
+        bool: True if the server is serving
+    """
+    with grpc.insecure_channel(f"localhost:{port}") as channel:
+        call = channel.unary_unary(
+            CHECK_METHOD,
+            request_serializer=health_pb2.HealthCheckRequest.SerializeToString,
+            response_deserializer=health_pb2.HealthCheckResponse.FromString,
+        )
+        try:
+            response = call(health_pb2.HealthCheckRequest(), timeout=timeout)
+        except grpc.RpcError:
+            return False
+    return response.status == health_pb2.HealthCheckResponse.SERVING
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT) else 1)
@@ -1,7 +1,14 @@
-"""Utility functions used by the main script for uri and path normalization"""
+"""Utility functions used by the main script for uri and path normalization and syncing docker contexts"""
 
 from urllib.parse import urlparse, urlunparse
+import hashlib
 import os
+import posixpath
+
+import fsspec
+from fsspec.implementations.local import LocalFileSystem
+
+HASH_CHUNK_SIZE = 1 << 20
 
 
 class CwdContextManager:
@@ -58,3 +65,115 @@ def normalize_path(path: str) -> str:
         return path
     else:
         return path + "/"
+
+
+def file_digest(fs, path: str) -> str:
+    """Hashes the content of a file in chunks
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of the file
+        path (str): Path of the file
+
+    Returns:
+        str: The sha256 hex digest
+    """
+    digest = hashlib.sha256()
+    with fs.open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _copy_mtime(fs, src: str, dest: str):
+    """Gives dest the modification time of src (local filesystem only), so later syncs skip it without hashing"""
+    if isinstance(fs, LocalFileSystem):
+        stat = os.stat(src)
+        os.utime(dest, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _unchanged(fs, src_info: dict, dest_info: dict) -> bool:
+    """Checks whether dest has the content of src, like the quick check of rsync: the same size and mtime, otherwise
+    (e.g. a different mtime) the same content. An unchanged dest is not rewritten, it gets the mtime of src
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of src and dest
+        src_info (dict): fsspec info of the source file
+        dest_info (dict): fsspec info of the destination file
+
+    Returns:
+        bool: True if dest has the content of src
+    """
+    if src_info["size"] != dest_info["size"]:
+        return False
+    if src_info.get("mtime") is not None and src_info.get("mtime") == dest_info.get("mtime"):
+        return True
+    if file_digest(fs, src_info["name"]) != file_digest(fs, dest_info["name"]):
+        return False
+    _copy_mtime(fs, src_info["name"], dest_info["name"])
+    return True
+
+
+def _copy(fs, src: str, dest: str):
+    """Copies src to dest and keeps the mtime of src"""
+    fs.makedirs(posixpath.dirname(dest), exist_ok=True)
+    fs.cp_file(src, dest)
+    _copy_mtime(fs, src, dest)
+
+
+def sync_file(fs, src: str, dest: str) -> bool:
+    """Copies the file src to dest unless dest has the same size and content, see _unchanged
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of src and dest
+        src (str): URI of the source file
+        dest (str): URI of the destination file
+
+    Returns:
+        bool: True if the file was copied
+    """
+    src = fsspec.core.strip_protocol(src)
+    dest = fsspec.core.strip_protocol(dest)
+    if fs.exists(dest) and _unchanged(fs, fs.info(src), fs.info(dest)):
+        return False
+    _copy(fs, src, dest)
+    return True
+
+
+def sync_directory(fs, src: str, dest: str, keep=()) -> tuple:
+    """Synchronizes the directory dest with src like rsync: files that are missing in dest or differ in size or
+    content are copied, files in dest that are not in src are removed. Unchanged files are not rewritten, files with
+    the same size and mtime are not even read (see _unchanged)
+
+    Args:
+        fs (fsspec.AbstractFileSystem): The filesystem of src and dest
+        src (str): URI of the source directory
+        dest (str): URI of the destination directory
+        keep (Iterable[str], optional): Paths relative to dest that are never removed. Defaults to ().
+
+    Returns:
+        int: Number of copied files
+        int: Number of removed files
+    """
+    src = fsspec.core.strip_protocol(src).rstrip("/")
+    dest = fsspec.core.strip_protocol(dest).rstrip("/")
+    if src == dest:
+        return 0, 0
+
+    src_files = {posixpath.relpath(path, src): info for path, info in fs.find(src, detail=True).items()}
+    dest_files = dict()
+    if fs.exists(dest):
+        dest_files = {posixpath.relpath(path, dest): info for path, info in fs.find(dest, detail=True).items()}
+
+    copied = 0
+    for relpath, info in sorted(src_files.items()):
+        target = dest_files.get(relpath)
+        if target is not None and _unchanged(fs, info, target):
+            continue
+        _copy(fs, info["name"], posixpath.join(dest, relpath))
+        copied += 1
+
+    stale = [info["name"] for relpath, info in dest_files.items() if relpath not in src_files and relpath not in keep]
+    for path in stale:
+        fs.rm_file(path)
+
+    return copied, len(stale)
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+BENCHMARK_ENV = "MKI_BENCHMARK"
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skips the benchmarks unless they are selected with -m (e.g. -m "benchmark and io") or MKI_BENCHMARK=1"""
+    if "benchmark" in config.getoption("markexpr", "") or os.environ.get(BENCHMARK_ENV) == "1":
+        return
+    skip = pytest.mark.skip(reason=f'benchmarks only run with -m "benchmark" or {BENCHMARK_ENV}=1')
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
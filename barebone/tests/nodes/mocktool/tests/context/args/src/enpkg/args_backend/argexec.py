@@ -1,14 +1,39 @@
 import argparse
+import contextlib
+import json
+import logging
+import os
+import resource
+import socket
+import time
 
+from profiling import PROFILERS, attach_profile, profiled
 from tool import funcwrapper
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+try:
+    from mki_barebone_io.instrumentation import record
+except ImportError:  # Tools without mki_barebone_io: loading and storing is part of the compute time
+
+    class _Recording:
+        load_seconds = store_seconds = 0.0
+        bytes_read = bytes_written = cache_hits = 0
+
+    def record():
+        return contextlib.nullcontext(_Recording())
+
 
 def exec():
 
+    start = time.perf_counter()
     parser = argparse.ArgumentParser()
     parser.add_argument("--func", type=str, help="<Required> Function name")
     parser.add_argument("--input_uri", nargs="+", help="<Required> URI to input resources", required=True)
     parser.add_argument("--output_uri", nargs="+", help="<Required> URI to output resources", required=True)
+    parser.add_argument("--metrics", type=str, help="Path to write the execution metrics to as json")
+    parser.add_argument("--profile", choices=PROFILERS, help="Profile the function, written next to the first output")
 
     args = parser.parse_args()
 
@@ -16,7 +41,34 @@ def exec():
         func=args.func,
         input=[dict(location=dict(uri=uri)) for uri in args.input_uri],
         output=[dict(location=dict(uri=uri)) for uri in args.output_uri],
-        meta=dict()
+        meta=dict(profile=args.profile) if args.profile else dict()
     )
 
-    funcwrapper(exec_message)
\ No newline at end of file
+    timestamp = time.time_ns() // 1000000
+    decoded = time.perf_counter()
+    with record() as recording, profiled(exec_message) as profiler:
+        funcwrapper(exec_message)
+    computed = time.perf_counter()
+    if profiler is not None:
+        attach_profile(profiler, exec_message)
+
+    # Same fields as ExecutionMeta and ExecutionMetrics of the gRPC backend
+    meta = dict(
+        node=os.environ.get("MKI_NODE_NAME") or socket.gethostname(),
+        timestamp=timestamp,
+        metrics=dict(
+            decode_seconds=decoded - start,
+            load_seconds=recording.load_seconds,
+            compute_seconds=max(computed - decoded - recording.load_seconds - recording.store_seconds, 0.0),
+            store_seconds=recording.store_seconds,
+            encode_seconds=0.0,
+            process_peak_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,  # KiB on Linux
+            bytes_read=recording.bytes_read,
+            bytes_written=recording.bytes_written,
+            cache_hits=recording.cache_hits,
+        ),
+    )
+    logger.info(f"Executed {args.func}: {json.dumps(meta)}")
+    if args.metrics:
+        with open(args.metrics, "w") as f:
+            json.dump(meta, f)
\ No newline at end of file
@@ -0,0 +1,385 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from mki_barebone_proto import module_pb2 as mki__barebone__proto_dot_module__pb2
+
+GRPC_GENERATED_VERSION = '1.70.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in mki_barebone_proto/module_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class ModuleStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.exec = channel.unary_unary(
+                '/Module/exec',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+                _registered_method=True)
+        self.execStream = channel.stream_stream(
+                '/Module/execStream',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+                _registered_method=True)
+        self.execBatch = channel.unary_unary(
+                '/Module/execBatch',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ExecutionBatch.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionBatch.FromString,
+                _registered_method=True)
+
+
+class ModuleServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def exec(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def execStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def execBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ModuleServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'exec': grpc.unary_unary_rpc_method_handler(
+                    servicer.exec,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+            ),
+            'execStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.execStream,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+            ),
+            'execBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.execBatch,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ExecutionBatch.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ExecutionBatch.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Module', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('Module', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Module(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def exec(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Module/exec',
+            mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def execStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/Module/execStream',
+            mki__barebone__proto_dot_module__pb2.ExecutionMessage.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ExecutionMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def execBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Module/execBatch',
+            mki__barebone__proto_dot_module__pb2.ExecutionBatch.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ExecutionBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+
+class ArtifactsStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.upload = channel.stream_unary(
+                '/Artifacts/upload',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ArtifactChunk.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactInfo.FromString,
+                _registered_method=True)
+        self.download = channel.unary_stream(
+                '/Artifacts/download',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactChunk.FromString,
+                _registered_method=True)
+        self.stat = channel.unary_unary(
+                '/Artifacts/stat',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactInfo.FromString,
+                _registered_method=True)
+        self.list = channel.unary_unary(
+                '/Artifacts/list',
+                request_serializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+                response_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactListing.FromString,
+                _registered_method=True)
+
+
+class ArtifactsServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def upload(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def download(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def stat(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def list(self, request, context):
+        """The entries of a directory, or the file itself
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ArtifactsServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'upload': grpc.stream_unary_rpc_method_handler(
+                    servicer.upload,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactChunk.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ArtifactInfo.SerializeToString,
+            ),
+            'download': grpc.unary_stream_rpc_method_handler(
+                    servicer.download,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ArtifactChunk.SerializeToString,
+            ),
+            'stat': grpc.unary_unary_rpc_method_handler(
+                    servicer.stat,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ArtifactInfo.SerializeToString,
+            ),
+            'list': grpc.unary_unary_rpc_method_handler(
+                    servicer.list,
+                    request_deserializer=mki__barebone__proto_dot_module__pb2.ArtifactRequest.FromString,
+                    response_serializer=mki__barebone__proto_dot_module__pb2.ArtifactListing.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Artifacts', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('Artifacts', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Artifacts(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def upload(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/Artifacts/upload',
+            mki__barebone__proto_dot_module__pb2.ArtifactChunk.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ArtifactInfo.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def download(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/Artifacts/download',
+            mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ArtifactChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def stat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Artifacts/stat',
+            mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ArtifactInfo.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def list(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Artifacts/list',
+            mki__barebone__proto_dot_module__pb2.ArtifactRequest.SerializeToString,
+            mki__barebone__proto_dot_module__pb2.ArtifactListing.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,154 @@
+"""Distributed tracing of tool calls with OpenTelemetry, propagated in the gRPC metadata (W3C traceparent)
+
+The orchestrator opens a client span per call and sends its context in the metadata, the tool server continues the
+trace with a server span, a span per executed message and the spans of the loaders and storers of mki_barebone_io.
+Spans are exported by setup_tracing if opentelemetry-sdk is installed and one of the environment variables is set:
+
+    MKI_TRACE_FILE: Append the finished spans as json lines to this file
+    OTEL_EXPORTER_OTLP_ENDPOINT: Send the spans to an OTLP collector (needs opentelemetry-exporter-otlp)
+
+Without opentelemetry-api all functions are no-ops, so tracing costs nothing unless it is installed.
+"""
+
+import contextlib
+import os
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:
+    trace = None
+
+TRACER_NAME = "mki_barebone"
+TRACE_FILE_ENV = "MKI_TRACE_FILE"
+OTLP_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+
+# File of MKI_TRACE_FILE opened by setup_tracing, closed by shutdown_tracing
+_trace_file = None
+
+
+def setup_tracing(service_name):
+    """Installs a tracer provider exporting to the destinations configured in the environment (see module docstring)
+
+    Args:
+        service_name (str): Name of the traced service, overridden by OTEL_SERVICE_NAME
+
+    Returns:
+        bool: True if spans are exported
+    """
+    global _trace_file
+
+    trace_file = os.environ.get(TRACE_FILE_ENV)
+    otlp_endpoint = os.environ.get(OTLP_ENDPOINT_ENV)
+    if trace is None or not (trace_file or otlp_endpoint):
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("Tracing is configured, but opentelemetry-sdk is not installed")
+        return False
+
+    service_name = os.environ.get("OTEL_SERVICE_NAME", service_name)
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if trace_file:
+        _trace_file = open(trace_file, "a")
+        provider.add_span_processor(
+            BatchSpanProcessor(
+                ConsoleSpanExporter(out=_trace_file, formatter=lambda span: span.to_json(indent=None) + "\n")
+            )
+        )
+    if otlp_endpoint:
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning(f"{OTLP_ENDPOINT_ENV} is set, but opentelemetry-exporter-otlp is not installed")
+        else:
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    logger.debug(f"Tracing {service_name}")
+    return True
+
+
+def shutdown_tracing():
+    """Exports the pending spans, shuts down the exporters and closes the trace file, call before the process exits"""
+    global _trace_file
+
+    if trace is not None:
+        shutdown = getattr(trace.get_tracer_provider(), "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+def _attributes(attributes):
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Context manager recording an internal span as child of the current span
+
+    Args:
+        name (str): Name of the span
+        attributes: Attributes of the span, None values are left out
+
+    Yields:
+        opentelemetry.trace.Span: The span, None without opentelemetry
+    """
+    if trace is None:
+        yield None
+        return
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+@contextlib.contextmanager
+def client_span(name, **attributes):
+    """Context manager recording the span of an outgoing call
+
+    Args:
+        name (str): Name of the span, e.g. the called method
+        attributes: Attributes of the span, None values are left out
+
+    Yields:
+        list: The metadata carrying the trace context to pass to the call, None without opentelemetry
+    """
+    if trace is None:
+        yield None
+        return
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name, kind=trace.SpanKind.CLIENT, attributes=_attributes(attributes)):
+        carrier = dict()
+        propagate.inject(carrier)
+        yield list(carrier.items()) or None
+
+
+@contextlib.contextmanager
+def server_span(name, grpc_context, **attributes):
+    """Context manager recording the span of an incoming call, continuing the trace of the caller
+
+    Args:
+        name (str): Name of the span, e.g. the called method
+        grpc_context (grpc.ServicerContext): The context of the call, carrying the metadata of the caller
+        attributes: Attributes of the span, None values are left out
+
+    Yields:
+        opentelemetry.trace.Span: The span, None without opentelemetry
+    """
+    if trace is None:
+        yield None
+        return
+    carrier = dict(grpc_context.invocation_metadata() or ()) if grpc_context is not None else dict()
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(
+        name, context=propagate.extract(carrier), kind=trace.SpanKind.SERVER, attributes=_attributes(attributes)
+    ) as current:
+        yield current
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Per-request profiling of tool functions, to profile live workloads without rebuilding the container
+
+A message whose meta.profile names a profiler ("cprofile") executes the tool function under the profiler. The
+profile (pstats format, e.g. python -m pstats <file> or snakeviz) is returned as additional output artifact
+"profile": written next to the first local output, otherwise inline. The file is named after the execution name
+(or the function), with path separators replaced, the start time and a counter, so profiles never overwrite
+each other.
+
+Only one cProfile profiler can be active per process (Python >= 3.12), so profiled calls of all functions run one
+after another. Calls without profile run concurrently as usual.
+"""
+
+import contextlib
+import cProfile
+import itertools
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+PROFILERS = ["cprofile"]
+PROFILE_OUTPUT = "profile"
+
+# Only one cProfile profiler can be active per process (Python >= 3.12), profiled calls run one after another
+_lock = threading.Lock()
+_counter = itertools.count()
+
+
+def profile_filename(name: str) -> str:
+    """Returns a unique file name for the profile of an execution
+
+    Args:
+        name (str): Execution name or function, may contain path separators (e.g. sweep names tool/func/input)
+
+    Returns:
+        str: <name>-<start time>-<counter>.prof with the path separators of name replaced by "_"
+    """
+    for sep in {"/", os.sep, os.altsep} - {None}:
+        name = name.replace(sep, "_")
+    return f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{next(_counter)}.prof"
+
+
+@contextlib.contextmanager
+def profiled(exec_message: dict):
+    """Context manager profiling the enclosed call of the tool function if requested in the execution message
+    Profiled calls are serialized by a process wide lock, see module docstring.
+
+    Args:
+        exec_message (dict): The execution message, meta.profile selects the profiler
+
+    Raises:
+        ValueError: If the profiler is not supported
+
+    Yields:
+        cProfile.Profile: The profiler, None if no profile was requested
+    """
+    profiler_name = (exec_message.get("meta") or {}).get("profile")
+    if not profiler_name:
+        yield None
+        return
+    if profiler_name not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler_name}, supported are {', '.join(PROFILERS)}")
+
+    with _lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+
+
+def attach_profile(profiler: cProfile.Profile, exec_message: dict, exec_response: dict = None) -> dict:
+    """Stores the profile and adds it as output artifact "profile" to the response
+
+    Args:
+        profiler (cProfile.Profile): The profiler of the call
+        exec_message (dict): The execution message
+        exec_response (dict, optional): The response execution message, extended in place. Defaults to None.
+
+    Returns:
+        dict: The artifact node message of the profile
+    """
+    meta = exec_message.get("meta") or {}
+    filename = profile_filename(meta.get("execution_name") or exec_message["func"])
+    local_paths = []
+    for output in exec_message.get("output", []):
+        parsed_uri = urlparse(output.get("location", {}).get("uri", ""))
+        if parsed_uri.path and parsed_uri.scheme in ("", "file"):
+            local_paths.append(parsed_uri.path)
+
+    if local_paths:
+        path = os.path.join(os.path.dirname(local_paths[0]), filename)
+        profiler.dump_stats(path)
+        artifact = dict(name=PROFILE_OUTPUT, location=dict(uri=path))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, filename)
+            profiler.dump_stats(path)
+            with open(path, "rb") as f:
+                artifact = dict(name=PROFILE_OUTPUT, location=dict(uri=""), inline_payload=f.read())
+
+    logger.info(f"Profile of {exec_message['func']}: {artifact['location']['uri'] or 'inline'}")
+    if exec_response is not None:
+        exec_response.setdefault("output", []).append(artifact)
+    return artifact
\ No newline at end of file
@@ -1,8 +1,30 @@
 """A generated script for importing and calling tool functions"""
 
+import importlib
+
 from toolpkg.metric import fourtyone_wrapper
 from toolpkg.metric import fourtytwo_wrapper
 
+# Modules of the tool functions. A module can define a function warmup (e.g. to load a model), which is called once
+# before the gRPC server reports SERVING
+TOOL_MODULES = [
+    "toolpkg.metric",
+]
+
+# Tool functions by the name in the execution message. In an image of merged tools the names are namespaced by the
+# tool ("<tool>/<function>"), a function name that is unique among the tools is also found without the namespace
+FUNCTIONS = {
+    "fourtyone_wrapper": fourtyone_wrapper,
+    "fourtytwo_wrapper": fourtytwo_wrapper,
+}
+
+
+def warmup():
+    """Calls the warmup functions of the tool modules"""
+    for name in TOOL_MODULES:
+        module_warmup = getattr(importlib.import_module(name), "warmup", None)
+        if module_warmup is not None:
+            module_warmup()
 
 
 def funcwrapper(exec_message: dict):
@@ -15,10 +37,7 @@ def funcwrapper(exec_message: dict):
         Exception: If trying to call a function that the tool does not provide.
     """
     funcname = exec_message["func"]
-
-    if funcname == "fourtyone_wrapper":
-        return fourtyone_wrapper(exec_message)
-    if funcname == "fourtytwo_wrapper":
-        return fourtytwo_wrapper(exec_message)
-    
-    raise Exception(f"Function {funcname} not found")
\ No newline at end of file
+    function = FUNCTIONS.get(funcname)
+    if function is None:
+        raise Exception(f"Function {funcname} not found")
+    return function(exec_message)
\ No newline at end of file
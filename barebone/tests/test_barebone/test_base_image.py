@@ -0,0 +1,86 @@
+import os
+import re
+import shutil
+
+import pytest
+
+from mki_barebone import main
+
+MOCKTOOL = os.path.join("tests", "nodes", "mocktool")
+
+EXPORTS = dict(
+    first="""numpy==2.2.3 \\
+    --hash=sha256:aaa \\
+    --hash=sha256:bbb
+pandas==2.2.3 ; python_full_version >= '3.10' \\
+    --hash=sha256:ccc
+-e ./extra/mki_barebone_io
+scipy==1.15.2 \\
+    --hash=sha256:ddd
+""",
+    second="""numpy==2.2.3 \\
+    --hash=sha256:aaa \\
+    --hash=sha256:bbb
+pandas==2.2.3 ; python_full_version >= '3.10' \\
+    --hash=sha256:ccc
+scipy==1.14.1 \\
+    --hash=sha256:eee
+""",
+)
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    srcs = []
+    for name in EXPORTS:
+        src = tmp_path / name
+        shutil.copytree(MOCKTOOL, src, ignore=shutil.ignore_patterns("tests"))
+        srcs.append(str(src))
+    monkeypatch.setattr(main, "_lock_environment", lambda src: None)
+    monkeypatch.setattr(main, "_export_requirements", lambda src: EXPORTS[os.path.basename(src.rstrip("/"))])
+    return srcs
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_shared_requirements(tools):
+    assert main.shared_requirements(tools) == [
+        "numpy==2.2.3 --hash=sha256:aaa --hash=sha256:bbb",
+        "pandas==2.2.3 ; python_full_version >= '3.10' --hash=sha256:ccc",
+    ]
+    assert main._base_builder_image("registry:5000/mki-base:0123") == "registry:5000/mki-base-builder:0123"
+    assert main._base_builder_image("registry:5000/mki-base") == "registry:5000/mki-base-builder:latest"
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_create_base_docker_context(tools, tmp_path, monkeypatch):
+    image = main.create_base_docker_context(tools, str(tmp_path / "base"), name="registry/mki-base")
+    assert image == main.create_base_docker_context(tools[::-1], str(tmp_path / "base"), name="registry/mki-base")
+    assert re.fullmatch(r"registry/mki-base:[0-9a-f]{12}", image)
+    assert (tmp_path / "base" / "requirements.txt").read_text().startswith("numpy==2.2.3")
+    assert f"tag = {image.split(':')[1]}" in (tmp_path / "base" / "Makefile").read_text()
+    assert f"--build-arg UID={os.getuid()}" in (tmp_path / "base" / "Makefile").read_text()
+
+    # The build arguments and the Dockerfile are part of the tag
+    uid = os.getuid() + 1
+    assert main.create_base_docker_context(tools, str(tmp_path / "uid"), "registry/mki-base", dict(UID=uid)) != image
+    assert f"--build-arg COMPILE_BYTECODE=1 --build-arg UID={uid}" in (tmp_path / "uid" / "Makefile").read_text()
+    render = main._render_template
+    monkeypatch.setattr(main, "_render_template", lambda path, template_dict: render(path, template_dict) + "#\n")
+    assert main.create_base_docker_context(tools, str(tmp_path / "changed"), name="registry/mki-base") != image
+    monkeypatch.setattr(main, "_render_template", render)
+
+    # The base is built from the same uv and python images as the tool images
+    def header_args(path):
+        with open(os.path.join(main.TEMPLATES_DIRECTORY, path)) as f:
+            return re.findall(r"^ARG \w+_(?:DIGEST|VERSION)=.*$", f.read(), re.MULTILINE)
+
+    assert header_args("base/Dockerfile.jinja") == header_args("Dockerfile.jinja")
+
+    # The base ships the bytecode of the shared environment, a tool on the base only compiles what it adds
+    dockerfile = (tmp_path / "base" / "Dockerfile").read_text()
+    assert dockerfile.index("compileall") < dockerfile.index("> .venv.sha256")
+    tool_dockerfile = main._render_template("Dockerfile.jinja", dict(name="t", interface="grpc", base_image=image))
+    assert "comm -13 .venv.sha256 - | cut -c 67- | \\\n        .venv/bin/python -m compileall" in tool_dockerfile
+    assert "checked-hash .venv src" not in tool_dockerfile
@@ -0,0 +1,65 @@
+import os
+import shutil
+import threading
+import types
+
+import pytest
+
+from mki_barebone import main
+
+MOCKTOOL = os.path.join("tests", "nodes", "mocktool")
+
+
+@pytest.fixture
+def mocktool(tmp_path):
+    src = tmp_path / "mocktool"
+    shutil.copytree(MOCKTOOL, src, ignore=shutil.ignore_patterns("tests"))
+    return src
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_fingerprint(mocktool):
+    digest = main.fingerprint(str(mocktool))
+    assert digest == main.fingerprint(f"file://{mocktool}/")
+    assert digest != main.fingerprint(str(mocktool), interface="grpc")
+
+    # Files outside of the docker context do not count
+    (mocktool / "src" / "enpkg" / "__pycache__").mkdir()
+    (mocktool / "src" / "enpkg" / "__pycache__" / "tool.cpython-311.pyc").write_bytes(b"\0")
+    (mocktool / "README.md").write_text("notes")
+    assert main.fingerprint(str(mocktool)) == digest
+
+    with open(mocktool / "src" / "enpkg" / "toolpkg" / "metric.py", "a") as f:
+        f.write("# changed\n")
+    assert main.fingerprint(str(mocktool)) != digest
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_create_many_skips_up_to_date(mocktool, tmp_path, monkeypatch):
+
+    def lock(src):
+        """uv sync rewrites an outdated uv.lock"""
+        path = os.path.join(main.fsspec.core.strip_protocol(src), "uv.lock")
+        with open(path) as f:
+            content = f.read()
+        if not content.endswith("# locked\n"):
+            with open(f"{path}.{threading.get_ident()}", "w") as f:
+                f.write(content + "# locked\n")
+            os.replace(f"{path}.{threading.get_ident()}", path)
+
+    # The image was built from the locked sources
+    locked = tmp_path / "locked"
+    shutil.copytree(mocktool, locked)
+    lock(str(locked))
+    label = main.fingerprint(str(locked))
+
+    image = types.SimpleNamespace(id="sha256:mocktool")
+    monkeypatch.setattr(main, "docker", types.SimpleNamespace(image=types.SimpleNamespace(inspect=lambda name: image)))
+    monkeypatch.setattr(main, "_image_fingerprint", lambda name: label)
+    monkeypatch.setattr(main, "_lock_environment", lock)
+    monkeypatch.setattr(main, "_build_docker", lambda *args, **kwargs: pytest.fail("Up to date tool was rebuilt"))
+
+    assert main.create_many([str(mocktool)] * 2, str(tmp_path / "contexts")) == ["sha256:mocktool"] * 2
+    assert not (tmp_path / "contexts").exists()
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from mki_barebone import main
+
+MOCKTOOL = os.path.join("tests", "nodes", "mocktool")
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    srcs = []
+    for name in ["mocktool", "othertool"]:
+        src = tmp_path / name
+        shutil.copytree(MOCKTOOL, src, ignore=shutil.ignore_patterns("tests"))
+        (src / ".python-version").write_text("3.11\n")
+        spec = json.loads((src / "spec.json").read_text())
+        spec["id"]["name"] = name
+        (src / "spec.json").write_text(json.dumps(spec))
+        srcs.append(str(src))
+    monkeypatch.setattr(main, "_lock_environment", lambda src: None)
+    return srcs
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_merge_tools(tools, tmp_path):
+    with open(os.path.join(tools[1], "src", "enpkg", "toolpkg", "extra.py"), "w") as f:
+        f.write("def extra_wrapper(exec_message):\n    return exec_message\n")
+    spec = json.loads((tmp_path / "othertool" / "spec.json").read_text())
+    spec["functions"]["extra"] = dict(spec["functions"]["fourtytwo"], script="extra.py", function="extra_wrapper")
+    (tmp_path / "othertool" / "spec.json").write_text(json.dumps(spec))
+
+    dest = main.merge_tools(tools, str(tmp_path / "merged"), "combined")
+    merged_spec = json.loads((tmp_path / "merged" / "spec.json").read_text())
+    assert merged_spec["id"]["name"] == "combined"
+    assert merged_spec["functions"]["othertool__extra"]["namespace"] == "othertool"
+    assert (tmp_path / "merged" / "src" / "enpkg" / "toolpkg" / "extra.py").exists()
+    pyproject = main._read_toml(main.fsspec.filesystem("file"), str(tmp_path / "merged" / "pyproject.toml"))
+    assert pyproject["project"]["dependencies"] == ["fsspec>=2025.3.0", "grpcio-tools>=1.71.0", "mki-barebone-io"]
+    assert pyproject["tool"]["uv"]["sources"] == {"mki-barebone-io": {"path": "extra/mki-barebone-io"}}
+
+    # Functions are namespaced by their tool, unique names are found without the namespace as well
+    template_dict, _ = main._parse_spec(dest, interface="grpc")
+    assert template_dict["name"] == "combined-grpc"
+    tool_py = main._render_template("src/enpkg/tool.py.jinja", template_dict)
+    compile(tool_py, "tool.py", "exec")
+    assert "from toolpkg.metric import fourtytwo_wrapper as mocktool__fourtytwo_wrapper" in tool_py
+    assert '"othertool/fourtytwo_wrapper": othertool__fourtytwo_wrapper,' in tool_py
+    assert '"fourtytwo_wrapper":' not in tool_py
+    assert '"extra_wrapper": othertool__extra_wrapper,' in tool_py
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_merge_tools_conflict(tools, tmp_path):
+    with open(os.path.join(tools[1], "src", "enpkg", "toolpkg", "metric.py"), "a") as f:
+        f.write("# changed\n")
+    with pytest.raises(ValueError, match="toolpkg/metric.py"):
+        main.merge_tools(tools, str(tmp_path / "merged"), "combined")
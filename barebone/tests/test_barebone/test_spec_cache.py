@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from mki_barebone import main
+
+MOCKTOOL = os.path.join("tests", "nodes", "mocktool")
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_parse_spec_validates(tmp_path):
+    src = tmp_path / "mocktool"
+    shutil.copytree(MOCKTOOL, src, ignore=shutil.ignore_patterns("tests"))
+
+    template_dict, _ = main._parse_spec(f"{src}/", interface="grpc")
+    assert template_dict["name"] == "mocktool-grpc"
+    template_dict["name"] = "changed"
+    assert main._parse_spec(f"{src}/", interface="grpc")[0]["name"] == "mocktool-grpc"
+
+    # Scripts are checked on cache hits as well
+    script = src / "src" / "enpkg" / "toolpkg" / "metric.py"
+    os.rename(script, f"{script}.bak")
+    with pytest.raises(FileNotFoundError, match="metric.py"):
+        main._parse_spec(f"{src}/", interface="grpc")
+    os.rename(f"{script}.bak", script)
+
+    spec = json.loads((src / "spec.json").read_text())
+    del spec["functions"]["fourtytwo"]["outputs"][0]["schema"]
+    (src / "spec.json").write_text(json.dumps(spec))
+    with pytest.raises(ValueError):
+        main._parse_spec(f"{src}/")
+    assert main._parse_spec(f"{src}/", validate_spec=False)[0]["name"] == "mocktool"
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_render_templates_unchanged(tmp_path):
+    template_dict, _ = main._parse_spec(f"{MOCKTOOL}/", interface="grpc")
+    main._render_templates(main.GRPC_TEMPLATES, f"{tmp_path}/", template_dict)
+    rendered = tmp_path / "src" / "enpkg" / "main.py"
+    os.utime(rendered, (1000000000, 1000000000))
+
+    main._render_templates(main.GRPC_TEMPLATES, f"{tmp_path}/", template_dict)
+    assert os.stat(rendered).st_mtime == 1000000000
+
+    main._render_templates(main.GRPC_TEMPLATES, f"{tmp_path}/", dict(template_dict, name="other-grpc"))
+    assert os.stat(rendered).st_mtime != 1000000000
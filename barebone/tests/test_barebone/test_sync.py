@@ -0,0 +1,40 @@
+import os
+
+import fsspec
+import pytest
+
+from mki_barebone import utils
+from mki_barebone.utils import sync_directory
+
+
+@pytest.mark.barebone
+@pytest.mark.unit
+def test_sync_directory(tmp_path, monkeypatch):
+    fs = fsspec.filesystem("file")
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    (src / "pkg").mkdir(parents=True)
+    (src / "pkg" / "a.py").write_text("a = 1\n")
+    (src / "model.pkl").write_bytes(b"\0" * 4096)
+
+    assert sync_directory(fs, str(src), str(dest)) == (2, 0)
+    assert (dest / "pkg" / "a.py").read_text() == "a = 1\n"
+
+    # Copies keep the mtime, unchanged files are not rewritten but get the mtime of the source
+    assert os.stat(dest / "model.pkl").st_mtime_ns == os.stat(src / "model.pkl").st_mtime_ns
+    os.utime(dest / "model.pkl", (1000000000, 1000000000))
+    assert sync_directory(fs, f"file://{src}/", str(dest)) == (0, 0)
+    assert os.stat(dest / "model.pkl").st_mtime_ns == os.stat(src / "model.pkl").st_mtime_ns
+
+    # Files with the same size and mtime are not read
+    with monkeypatch.context() as m:
+        m.setattr(utils, "file_digest", None)
+        assert sync_directory(fs, str(src), str(dest)) == (0, 0)
+
+    # Same size, different content is copied, stale files are removed unless kept
+    (src / "pkg" / "a.py").write_text("a = 2\n")
+    os.utime(src / "pkg" / "a.py", (1000000000, 1000000000))
+    (dest / "stale.py").write_text("")
+    (dest / "rendered.py").write_text("")
+    assert sync_directory(fs, str(src), str(dest), keep=["rendered.py"]) == (1, 1)
+    assert (dest / "pkg" / "a.py").read_text() == "a = 2\n"
+    assert sorted(os.listdir(dest)) == ["model.pkl", "pkg", "rendered.py"]
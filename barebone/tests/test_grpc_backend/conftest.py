@@ -0,0 +1,96 @@
+import importlib
+import os
+import shutil
+import socket
+import sys
+import time
+import types
+
+import pytest
+
+ENPKG_TEMPLATES = os.path.join("src", "mki_barebone", "templates", "src", "enpkg")
+GRPC_BACKEND_TEMPLATES = os.path.join(ENPKG_TEMPLATES, "grpc_backend")
+ORCHESTRATOR = os.path.join("..", "orchestrator", "grpc_orch", "src", "orchestrator")
+ORCHESTRATOR_GRPC_BACKEND = os.path.join(ORCHESTRATOR, "grpc_backend")
+ORCHESTRATOR_MODULES = ["workflow.py", "cwl.py", "sweep.py", "pool.py", "dispatch.py", "ledger.py", "benchmark.py"]
+GRPC_BACKEND_MODULES = [
+    "utils.py",
+    "server.py",
+    "artifacts.py",
+    "health.py",
+    "metrics.py",
+    "tracing.py",
+]
+
+
+def funcwrapper(exec_message: dict):
+    """Stub of the generated tool.funcwrapper: echo returns its input names as payload ids, sleep does the same
+    after 0.2 seconds, fail raises. Outputs below the artifact roots are written with the payload id as content
+    """
+    if exec_message["func"] == "fail":
+        raise RuntimeError("boom")
+    if exec_message["func"] == "sleep":
+        time.sleep(0.2)
+    for output in exec_message["output"]:
+        output["payload_id"] = ",".join(artifact["name"] for artifact in exec_message["input"])
+        uri = output.get("location", {}).get("uri", "")
+        if "MKI_ARTIFACT_ROOTS" in os.environ and uri.startswith(os.environ["MKI_ARTIFACT_ROOTS"]):
+            os.makedirs(os.path.dirname(uri), exist_ok=True)
+            with open(uri, "w") as f:
+                f.write(output["payload_id"])
+    return exec_message
+
+
+@pytest.fixture(scope="session")
+def grpc_backend(tmp_path_factory):
+    """Imports the template grpc_backend together with the orchestrator client as package grpc_backend, the top-level
+    orchestrator modules and the template profiling and healthcheck modules are importable as well. The protocol is
+    imported from the prebuilt mki_barebone_proto package. The generated tool module is replaced by a stub funcwrapper
+    """
+    pytest.importorskip("mki_barebone_proto")
+
+    root = tmp_path_factory.mktemp("enpkg")
+    package = root / "grpc_backend"
+    package.mkdir()
+    (package / "__init__.py").touch()
+    for name in GRPC_BACKEND_MODULES:
+        shutil.copy(os.path.join(GRPC_BACKEND_TEMPLATES, name), package / name)
+    for name in ["client.py", "channels.py"]:
+        shutil.copy(os.path.join(ORCHESTRATOR_GRPC_BACKEND, name), package / name)
+    for name in ORCHESTRATOR_MODULES:
+        shutil.copy(os.path.join(ORCHESTRATOR, name), root / name)
+    for name in ["profiling.py", "healthcheck.py"]:
+        shutil.copy(os.path.join(ENPKG_TEMPLATES, name), root / name)
+
+    tool = types.ModuleType("tool")
+    tool.funcwrapper = funcwrapper
+    sys.modules["tool"] = tool
+    sys.path.insert(0, str(root))
+    yield importlib.import_module("grpc_backend")
+    sys.path.remove(str(root))
+    local_modules = ["tool", "profiling", "healthcheck"] + [os.path.splitext(name)[0] for name in ORCHESTRATOR_MODULES]
+    for name in [name for name in sys.modules if name in local_modules or name.startswith("grpc_backend")]:
+        del sys.modules[name]
+
+
+@pytest.fixture(scope="session")
+def artifact_root(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("artifacts"))
+
+
+@pytest.fixture(scope="session")
+def server(grpc_backend, artifact_root):
+    """Runs the template gRPC server in-process, returns the pipeline spec fields addressing it"""
+    server_module = importlib.import_module("grpc_backend.server")
+    importlib.import_module("grpc_backend.client")
+
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+
+    os.environ["MKI_ARTIFACT_ROOTS"] = artifact_root
+    server = server_module.serve(port=port)
+    yield dict(tool_hostname="localhost", tool_port=port)
+    server.stop(grace=None)
+    importlib.import_module("grpc_backend.channels").close_channels()
+    del os.environ["MKI_ARTIFACT_ROOTS"]
@@ -0,0 +1,151 @@
+import importlib
+import os
+import threading
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def fs(server):
+    grpcfs = pytest.importorskip("mki_barebone_io.grpcfs")
+    return grpcfs.GrpcFileSystem(chunk_size=1024, skip_instance_cache=True)
+
+
+@pytest.fixture(scope="module")
+def base(server, artifact_root):
+    return f"grpc://{server['tool_hostname']}:{server['tool_port']}{artifact_root}"
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_upload_download_roundtrip(server, artifact_root, tmp_path):
+    client = importlib.import_module("grpc_backend.client")
+
+    data = os.urandom(10_000)
+    src = tmp_path / "src.bin"
+    src.write_bytes(data)
+    uri = os.path.join(artifact_root, "sub", "roundtrip.bin")
+
+    info = client.upload_artifact(server, str(src), uri, compression="gzip", chunk_size=1000)
+    assert info["size"] == len(data)
+    assert info["payload_id"].startswith("sha256:")
+
+    dst = tmp_path / "dst.bin"
+    assert client.download_artifact(server, uri, str(dst), chunk_size=999) == len(data)
+    assert dst.read_bytes() == data
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_grpcfs_byte_range(fs, base, artifact_root):
+
+    data = bytes(range(256)) * 40
+    with open(os.path.join(artifact_root, "range.bin"), "wb") as f:
+        f.write(data)
+
+    assert fs.cat_file(f"{base}/range.bin") == data
+    assert fs.cat_file(f"{base}/range.bin", start=1000, end=3000) == data[1000:3000]
+    with fs.open(f"{base}/range.bin", "rb") as f:
+        f.seek(5000)
+        assert f.read(10) == data[5000:5010]
+        assert f.read(0) == b""
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_grpcfs_empty_file(fs, base, artifact_root):
+
+    with fs.open(f"{base}/empty.bin", "wb"):
+        pass
+
+    assert os.path.getsize(os.path.join(artifact_root, "empty.bin")) == 0
+    assert fs.info(f"{base}/empty.bin")["size"] == 0
+    assert fs.cat_file(f"{base}/empty.bin") == b""
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_grpcfs_write(fs, base, artifact_root):
+
+    data = os.urandom(40 * 1024)
+    with fs.open(f"{base}/written.bin", "wb", block_size=1024) as f:
+        f.write(data)
+
+    with open(os.path.join(artifact_root, "written.bin"), "rb") as f:
+        assert f.read() == data
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_outside_of_roots(fs, base, artifact_root):
+
+    with pytest.raises(PermissionError):
+        fs.cat_file(f"{base}/../outside.bin")
+    with pytest.raises(PermissionError):
+        fs.info(f"{base}/../../etc/passwd")
+    assert not os.path.exists(os.path.join(os.path.dirname(artifact_root), "outside.bin"))
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_rejected_upload_does_not_hang(fs, base, artifact_root):
+
+    result = dict()
+
+    def write():
+        try:
+            with fs.open(f"{base}/../evil.bin", "wb", block_size=1024) as f:
+                f.write(os.urandom(40 * 1024))
+        except Exception as err:
+            result["error"] = err
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert isinstance(result.get("error"), PermissionError)
+    assert not os.path.exists(os.path.join(os.path.dirname(artifact_root), "evil.bin"))
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_not_found(fs, base):
+
+    with pytest.raises(FileNotFoundError):
+        fs.cat_file(f"{base}/missing.bin")
+    with pytest.raises(FileNotFoundError):
+        fs.info(f"{base}/missing.bin")
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_grpcfs_ls(fs, base, artifact_root):
+
+    os.makedirs(os.path.join(artifact_root, "listed", "sub"), exist_ok=True)
+    with open(os.path.join(artifact_root, "listed", "a.bin"), "wb") as f:
+        f.write(b"abc")
+
+    entries = fs.ls(f"{base}/listed")
+    assert [(os.path.basename(e["name"]), e["type"], e["size"]) for e in entries] == [
+        ("a.bin", "file", 3),
+        ("sub", "directory", 0),
+    ]
+    assert fs.info(f"{base}/listed")["type"] == "directory"
+    assert fs.ls(f"{base}/listed/a.bin", detail=False) == [f"{base[len('grpc://'):]}/listed/a.bin"]
+    assert fs.isdir(f"{base}/listed/sub") and fs.isfile(f"{base}/listed/a.bin")
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_chunk_size_capped(server, artifact_root, tmp_path):
+    client = importlib.import_module("grpc_backend.client")
+
+    data = os.urandom((5 << 20) + 1000)
+    with open(os.path.join(artifact_root, "large.bin"), "wb") as f:
+        f.write(data)
+
+    # Chunks of the requested size would exceed the default 4 MiB message limit of the client
+    dst = tmp_path / "large.bin"
+    assert client.download_artifact(server, os.path.join(artifact_root, "large.bin"), str(dst), chunk_size=8 << 20)
+    assert dst.read_bytes() == data
@@ -0,0 +1,84 @@
+import importlib
+import json
+import os
+import socket
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def benchmark(grpc_backend):
+    return importlib.import_module("benchmark")
+
+
+class _ServerBackend:
+    """Starts the template gRPC server in-process instead of a tool process"""
+
+    def start(self, image):
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            port = s.getsockname()[1]
+        self.server = importlib.import_module("grpc_backend.server").serve(port=port)
+        return dict(tool_hostname="localhost", tool_port=port)
+
+    def stop(self, handle):
+        self.server.stop(grace=None)
+
+    def alive(self, handle):
+        return True
+
+
+@pytest.mark.unit
+def test_percentile(benchmark):
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([3.0], 99) == 3.0
+    assert benchmark.percentile([], 50) is None
+
+
+@pytest.mark.unit
+def test_prepare_case_scales_inputs(benchmark, tmp_path):
+    with open(tmp_path / "labels.json", "w") as f:
+        json.dump([0, 1, 1], f)
+    with open(tmp_path / "data.csv", "w") as f:
+        f.write("a,b\n1,2\n3,4\n")
+    with open(tmp_path / "config.json", "w") as f:
+        json.dump(dict(threshold=0.5), f)
+    case = dict(
+        func="echo",
+        input=[
+            dict(name="labels", uri="labels.json", scale=True),
+            dict(name="data", uri="data.csv", scale=True),
+            dict(name="config", uri="config.json"),
+        ],
+        output=[dict(name="result", uri="result.json")],
+    )
+
+    spec, input_bytes = benchmark.prepare_case(case, 4, str(tmp_path), str(tmp_path / "work"))
+
+    labels, data, config = [item["location"]["uri"] for item in spec["input"]]
+    with open(labels) as f:
+        assert json.load(f) == [0, 1, 1] * 4
+    with open(data) as f:
+        assert f.read().splitlines() == ["a,b"] + ["1,2", "3,4"] * 4
+    assert input_bytes == sum(os.path.getsize(path) for path in [labels, data, config])
+    assert spec["output"][0]["location"]["uri"].endswith(os.path.join("echo-4", "results", "result.json"))
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_grpc_target_measures(benchmark, tmp_path):
+    target = benchmark.GrpcTarget(_ServerBackend(), "mocktool")
+    target.start()
+    try:
+        output = dict(name="r", location=dict(uri=str(tmp_path / "r.json")))
+        spec = dict(func="echo", input=[dict(name="x", location=dict(uri=""))], output=[output])
+        latencies, errors, throughput = benchmark._measure(target, spec, calls=5, concurrency=2)
+    finally:
+        target.stop()
+
+    assert target.cold_start > 0
+    assert len(latencies) == 5 and errors == 0
+    assert throughput > 0
+    assert benchmark.latency_summary(latencies)["p99"] == max(latencies)
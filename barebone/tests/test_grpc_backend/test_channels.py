@@ -0,0 +1,68 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+CHANNELS = os.path.join("..", "orchestrator", "grpc_orch", "src", "orchestrator", "grpc_backend", "channels.py")
+
+
+@pytest.fixture(scope="module")
+def channels():
+    """Imports the channel pool of the grpc orchestrator from its source file"""
+    pytest.importorskip("grpc")
+    spec = importlib.util.spec_from_file_location("orchestrator_channels", CHANNELS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_channel_pool_reuse(channels):
+
+    pool = channels.ChannelPool()
+    channel = pool.get("localhost:18061")
+
+    assert pool.get("localhost:18061") is channel
+    assert pool.get("localhost:18062") is not channel
+    assert len(pool) == 2
+    pool.close()
+    assert len(pool) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_channel_pool_discard(channels):
+
+    pool = channels.ChannelPool()
+    channel = pool.get("localhost:18061")
+    pool.discard("localhost:18061")
+    pool.discard("localhost:18063")  # Unknown addresses are ignored
+
+    assert len(pool) == 0
+    assert pool.get("localhost:18061") is not channel
+    pool.close()
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_target(channels):
+
+    assert channels.target(dict(tool_hostname="mock-tool", tool_port=8061)) == "mock-tool:8061"
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_unavailable_fails_fast(channels):
+    import grpc
+
+    pool = channels.ChannelPool()
+    call = pool.get("localhost:1").unary_unary("/Module/exec")
+    start = time.perf_counter()
+    with pytest.raises(grpc.RpcError) as err:
+        call(b"", timeout=30)
+
+    assert err.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert time.perf_counter() - start < 20
+    pool.close()
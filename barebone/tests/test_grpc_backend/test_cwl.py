@@ -0,0 +1,47 @@
+import importlib
+import os
+
+import pytest
+
+SCIKIT_WORKFLOW = os.path.join("..", "orchestrator", "tests", "workflows", "scikit-workflow", "cwl")
+
+
+@pytest.fixture(scope="module")
+def cwl(grpc_backend):
+    return importlib.import_module("cwl")
+
+
+@pytest.mark.unit
+def test_cwl_to_workflow(cwl):
+
+    spec = cwl.cwl_to_workflow(os.path.join(SCIKIT_WORKFLOW, "workflow.cwl"), os.path.join(SCIKIT_WORKFLOW, "job.json"))
+
+    model_step, tool_step = spec["steps"]["model_step"], spec["steps"]["tool_step"]
+    assert (model_step["tool_hostname"], model_step["tool_port"]) == ("scikit-logreg-model", 8061)
+    assert model_step["func"] == "predict_wrapper"
+    assert model_step["output"][0]["location"]["uri"] == "/results/model_step/results/predictions.json"
+    assert tool_step["input"][0]["source"] == "model_step/output_files0"
+    true_labels = os.path.join("scikit-metrics-tool", "tests", "data", "true_labels.json")
+    assert tool_step["stage"][0]["path"].endswith(true_labels)
+    assert tool_step["input"][1]["location"]["uri"] == tool_step["stage"][0]["uri"]
+    assert spec["outputs"] == dict(model_outputs="model_step", final_outputs="tool_step")
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_run_cwl(server, artifact_root, cwl, tmp_path):
+
+    address = f"{server['tool_hostname']}:{server['tool_port']}"
+    report = cwl.run_cwl(
+        os.path.join(SCIKIT_WORKFLOW, "workflow.cwl"),
+        os.path.join(SCIKIT_WORKFLOW, "job.json"),
+        outdir=str(tmp_path),
+        endpoints={"scikit-logreg-model": address, "scikit-metrics-tool": address},
+        results_root=os.path.join(artifact_root, "cwl"),
+    )
+
+    tool_input = report["steps"]["tool_step"]["response"]["input"]
+    assert tool_input[0]["location"]["uri"].startswith(f"grpc://{address}/")
+    assert os.path.exists(os.path.join(artifact_root, "cwl", "tool_step", "inputs", "1-true_labels.json"))
+    with open(report["outputs"]["final_outputs"][0]) as f:
+        assert f.read() == "input0,input1"
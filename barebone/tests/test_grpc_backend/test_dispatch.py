@@ -0,0 +1,65 @@
+import importlib
+import threading
+import time
+
+import grpc
+import pytest
+
+
+class _Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "unavailable"
+
+
+@pytest.fixture(scope="module")
+def dispatch(grpc_backend):
+    return importlib.import_module("dispatch")
+
+
+def _job(i, func="echo"):
+    return dict(
+        func=func,
+        input=[dict(name=f"x{i}", location=dict(uri=""))],
+        output=[dict(name="r")],
+        meta=dict(execution_name=f"job-{i}"),
+    )
+
+
+@pytest.mark.unit
+def test_dispatch_ejects_failing_replica(dispatch):
+
+    lock = threading.Lock()
+    calls = dict(a=0, b=0, dead=0)
+
+    def execute(spec):
+        with lock:
+            calls[spec["tool_hostname"]] += 1
+        if spec["tool_hostname"] == "dead":
+            raise _Unavailable()
+        time.sleep(0.01)  # Keeps the replicas busy, so the jobs are spread
+        return dict(spec, output=[dict(name="r", payload_id=spec["input"][0]["name"])])
+
+    replicas = [dict(tool_hostname=name, tool_port=8061) for name in ["a", "b", "dead"]]
+    with dispatch.Dispatcher(replicas, concurrency=2, eject_after=2, eject_time=60, execute=execute) as dispatcher:
+        done = dispatcher.map([_job(i) for i in range(30)])
+        assert dispatcher.submit(_job(0)) is done[0]
+
+    assert [future.result()["output"][0]["payload_id"] for future in done] == [f"x{i}" for i in range(30)]
+    # The dead replica is ejected after two failures, the jobs are spread over the others
+    assert calls["dead"] <= 2 * 2
+    assert calls["a"] > 5 and calls["b"] > 5
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_run_dispatch(dispatch, server):
+
+    spec = dict(replicas=[server, dict(server)], concurrency=2, jobs=[_job(i) for i in range(8)] + [_job(8, "fail")])
+    report = dispatch.run_dispatch(spec)
+
+    assert report["summary"] == dict(total=9, succeeded=8, failed=1)
+    assert report["jobs"][3]["output"][0]["payload_id"] == "x3"
+    assert "boom" in report["jobs"][8]["error"]
@@ -0,0 +1,129 @@
+import importlib
+import socket
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def pool(grpc_backend):
+    return importlib.import_module("pool")
+
+
+class _ServerBackend:
+    """Starts the template gRPC server in-process instead of a container"""
+
+    def __init__(self):
+        self.servers = dict()
+
+    def start(self, image):
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            port = s.getsockname()[1]
+        self.servers[port] = importlib.import_module("grpc_backend.server").serve(port=port)
+        return dict(tool_hostname="localhost", tool_port=port)
+
+    def stop(self, handle):
+        self.servers.pop(handle["tool_port"]).stop(grace=None)
+
+    def alive(self, handle):
+        return handle["tool_port"] in self.servers
+
+
+class _FakeBackend:
+    """Counts the started and stopped containers, every container is healthy"""
+
+    def __init__(self):
+        self.started = 0
+        self.stopped = 0
+        self.lock = threading.Lock()
+
+    def start(self, image):
+        with self.lock:
+            self.started += 1
+            return dict(tool_hostname=image, tool_port=self.started)
+
+    def stop(self, handle):
+        with self.lock:
+            self.stopped += 1
+
+    def alive(self, handle):
+        return True
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_pool_lease_executes(pool, grpc_backend):
+
+    client = importlib.import_module("grpc_backend.client")
+    backend = _ServerBackend()
+    with pool.PoolManager(backend, min_size=1, max_size=2) as manager:
+        with manager.lease("mocktool") as endpoint:
+            assert client.check_health(endpoint) in ["SERVING", "UNIMPLEMENTED"]
+            response = client.orchestrate(
+                dict(endpoint, func="echo", input=[dict(name="a", location=dict(uri="/a"))], output=[dict(name="r")])
+            )
+        assert response["output"][0]["payload_id"] == "a"
+        assert len(manager.pool("mocktool")) == 1
+
+    assert backend.servers == dict()
+
+
+@pytest.mark.unit
+def test_pool_scales_with_queue_depth(pool):
+
+    backend = _FakeBackend()
+    warm_pool = pool.WarmPool(backend, "tool", min_size=1, max_size=3, health=lambda endpoint: "SERVING")
+    warm_pool.start()
+    assert backend.started == 1
+
+    leased = []
+    barrier = threading.Barrier(5)
+
+    def job():
+        with warm_pool.lease(timeout=10) as endpoint:
+            leased.append(endpoint["tool_port"])
+            time.sleep(0.05)
+        barrier.wait()
+
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    # Four waiting jobs grow the pool to max_size, afterwards it shrinks back to min_size
+    assert len(leased) == 4
+    assert 1 < backend.started <= 3
+    assert len(warm_pool) == 1
+    assert backend.started - backend.stopped == 1
+
+    warm_pool.close()
+    assert backend.stopped == backend.started
+    with pytest.raises(RuntimeError):
+        warm_pool.acquire(timeout=1)
+
+
+@pytest.mark.unit
+def test_pool_start_failures(pool):
+
+    backend = _FakeBackend()
+    health = iter(["NOT_SERVING"] * 1000)
+    warm_pool = pool.WarmPool(
+        backend, "tool", startup_timeout=0.1, health=lambda endpoint: next(health), max_start_failures=2
+    )
+
+    # Waiting jobs get the error once the containers failed to start max_start_failures times in a row
+    with pytest.raises(RuntimeError, match="failed to start 2 times"):
+        warm_pool.acquire()
+    assert warm_pool.failed
+    assert backend.started == backend.stopped == 2
+
+    # The manager replaces a failed pool, steps with an image are executed on its containers
+    with pool.PoolManager(backend, health=lambda endpoint: "SERVING") as manager:
+        manager._pools["tool"] = warm_pool
+        execute = pool.pooled(lambda step: step, manager)
+        assert execute(dict(image="tool", tool_port=0))["tool_port"] == 3
+        assert execute(dict(tool_port=0))["tool_port"] == 0
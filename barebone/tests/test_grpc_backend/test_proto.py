@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+PROTO_PACKAGE = os.path.join("extra", "mki-barebone-proto", "src")
+
+
+def _clear_json_names(messages):
+    """protoc adds the json names to descriptor sets, the generated code does not contain them"""
+    for message in messages:
+        for field in message.field:
+            field.ClearField("json_name")
+        _clear_json_names(message.nested_type)
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+@pytest.mark.parametrize("name", ["module", "health"])
+def test_prebuilt_proto_up_to_date(name, tmp_path):
+    """The prebuilt python code of mki-barebone-proto must be regenerated (make proto) when a .proto file changes"""
+    grpc_tools = pytest.importorskip("grpc_tools.protoc")
+    from google.protobuf import descriptor_pb2
+    import mki_barebone_proto.health_pb2 as health_pb2
+    import mki_barebone_proto.module_pb2 as module_pb2
+
+    descriptor_set = tmp_path / f"{name}.pb"
+    returncode = grpc_tools.main(
+        ["protoc", f"-I{PROTO_PACKAGE}", f"--descriptor_set_out={descriptor_set}", f"mki_barebone_proto/{name}.proto"]
+    )
+    assert returncode == 0
+    compiled = descriptor_pb2.FileDescriptorSet.FromString(descriptor_set.read_bytes()).file[0]
+    _clear_json_names(compiled.message_type)
+
+    prebuilt = descriptor_pb2.FileDescriptorProto()
+    dict(module=module_pb2, health=health_pb2)[name].DESCRIPTOR.CopyToProto(prebuilt)
+    assert prebuilt == compiled
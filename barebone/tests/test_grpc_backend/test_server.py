@@ -0,0 +1,206 @@
+import importlib
+import os
+import pstats
+import socket
+import urllib.request
+
+import grpc
+import pytest
+
+
+def _exec_message(func, i):
+    return dict(func=func, input=[dict(name=f"x{i}", location=dict(uri=""))], output=[dict(name="r")])
+
+
+@pytest.fixture(scope="module")
+def servicer(grpc_backend):
+    servicer = importlib.import_module("grpc_backend.server").ModuleServicer()
+    servicer.load()
+    return servicer
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_exec_batch_order(grpc_backend, servicer):
+    module_pb2 = importlib.import_module("mki_barebone_proto.module_pb2")
+    utils = importlib.import_module("grpc_backend.utils")
+
+    funcs = ["echo", "fail", "echo"]
+    batch = module_pb2.ExecutionBatch(
+        messages=[utils.execution_message_from_dict(_exec_message(func, i)) for i, func in enumerate(funcs)]
+    )
+    response = servicer.execBatch(batch, None)
+
+    assert [msg.output[0].payload_id for msg in response.messages] == ["x0", "", "x2"]
+    assert [msg.meta.HasField("error") for msg in response.messages] == [False, True, False]
+    assert response.messages[1].meta.error == "RuntimeError: boom"
+
+    # The tool completes the meta of executed messages
+    meta = response.messages[0].meta
+    assert meta.node and meta.timestamp > 0
+    assert meta.metrics.process_peak_rss_bytes > 0 and meta.metrics.compute_seconds >= 0
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_exec_stream_order(grpc_backend, servicer):
+    utils = importlib.import_module("grpc_backend.utils")
+
+    requests = (utils.execution_message_from_dict(_exec_message("echo", i)) for i in range(20))
+    responses = list(servicer.execStream(requests, None))
+
+    assert [msg.output[0].payload_id for msg in responses] == [f"x{i}" for i in range(20)]
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_exec_profile(grpc_backend, servicer, tmp_path):
+    utils = importlib.import_module("grpc_backend.utils")
+
+    exec_message = dict(_exec_message("echo", 0), meta=dict(profile="cprofile", execution_name="tool/echo/x"))
+    response = servicer._dispatch(utils.execution_message_from_dict(exec_message))
+    assert [output.name for output in response.output] == ["r", "profile"]
+    (tmp_path / "inline.prof").write_bytes(response.output[1].inline_payload)
+    assert pstats.Stats(str(tmp_path / "inline.prof")).total_calls > 0
+
+    exec_message["output"] = [dict(name="r", location=dict(uri=str(tmp_path / "out" / "r.json")))]
+    (tmp_path / "out").mkdir()
+    response = servicer._dispatch(utils.execution_message_from_dict(exec_message))
+    path = response.output[1].location.uri
+    assert os.path.dirname(path) == str(tmp_path / "out")
+    assert os.path.basename(path).startswith("tool_echo_x-") and path.endswith(".prof")
+    assert pstats.Stats(path).total_calls > 0
+
+    # Profiles of repeated execution names do not overwrite each other
+    response = servicer._dispatch(utils.execution_message_from_dict(exec_message))
+    assert response.output[1].location.uri != path
+
+    with pytest.raises(ValueError):
+        servicer._dispatch(utils.execution_message_from_dict(dict(exec_message, meta=dict(profile="perf"))))
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_orchestrate_batch(server):
+    client = importlib.import_module("grpc_backend.client")
+
+    funcs = ["echo"] * 5 + ["fail"] + ["echo"] * 4
+    responses = client.orchestrate_batch(server, [_exec_message(func, i) for i, func in enumerate(funcs)])
+
+    assert [r["output"][0]["payload_id"] for r in responses] == [f"x{i}" if i != 5 else "" for i in range(10)]
+    assert responses[5]["meta"]["error"] == "RuntimeError: boom"
+    assert all("error" not in r["meta"] for i, r in enumerate(responses) if i != 5)
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_orchestrate_stream(server):
+    client = importlib.import_module("grpc_backend.client")
+
+    responses = client.orchestrate_stream(server, (_exec_message("echo", i) for i in range(50)), timeout=30)
+
+    assert [r["output"][0]["payload_id"] for r in responses] == [f"x{i}" for i in range(50)]
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_health(grpc_backend, server):
+    health = importlib.import_module("grpc_backend.health")
+    client = importlib.import_module("grpc_backend.client")
+
+    # serve returns after the tool is loaded, so the server is ready
+    assert client.check_health(server) == "SERVING"
+    assert client.check_health(server, service="Module") == "SERVING"
+
+    servicer = health.HealthServicer()
+    assert servicer.Check(health.health_pb2.HealthCheckRequest(service=""), None).status == health.NOT_SERVING
+    servicer.set_status(health.SERVING)
+    assert servicer.Check(health.health_pb2.HealthCheckRequest(service="Module"), None).status == health.SERVING
+
+    healthcheck = importlib.import_module("healthcheck")
+    assert healthcheck.check(server["tool_port"])
+    assert not healthcheck.check(_free_port(), timeout=0.5)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_metrics_endpoint(grpc_backend):
+    server_module = importlib.import_module("grpc_backend.server")
+    client = importlib.import_module("grpc_backend.client")
+
+    port, metrics_port = _free_port(), _free_port()
+    server = server_module.serve(port=port, metrics_port=metrics_port)
+    try:
+        endpoint = dict(tool_hostname="localhost", tool_port=port)
+        client.orchestrate(dict(endpoint, **_exec_message("echo", 0)))
+        client.orchestrate_batch(endpoint, [_exec_message(func, i) for i, func in enumerate(["echo", "fail"])])
+        with pytest.raises(grpc.RpcError):
+            client.orchestrate(dict(endpoint, **_exec_message("fail", 0)))
+
+        with urllib.request.urlopen(f"http://localhost:{metrics_port}/metrics") as response:
+            text = response.read().decode("utf-8")
+    finally:
+        server.stop(grace=None)
+
+    assert 'mki_tool_messages_total{func="echo",status="ok"} 2' in text
+    assert 'mki_tool_messages_total{func="fail",status="error"} 2' in text
+    assert 'mki_tool_message_seconds_count{func="echo"} 2' in text
+    assert 'mki_tool_calls_in_flight{method="exec"} 0' in text
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_trace_propagation(grpc_backend, server):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    importlib.import_module("grpc_backend.client").orchestrate(dict(server, **_exec_message("echo", 0)))
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    client_span, server_span = spans["Module/exec echo"], spans["Module/exec"]
+    assert server_span.context.trace_id == client_span.context.trace_id
+    assert server_span.parent.span_id == client_span.context.span_id
+    assert spans["execute echo"].parent.span_id == server_span.context.span_id
+    assert spans["tool echo"].parent.span_id == spans["execute echo"].context.span_id
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_metrics_exposition(grpc_backend):
+    metrics_module = importlib.import_module("grpc_backend.metrics")
+    module_pb2 = importlib.import_module("mki_barebone_proto.module_pb2")
+
+    metrics = metrics_module.ServerMetrics()
+    message = module_pb2.ExecutionMessage(func="cached")
+    message.meta.metrics.cache_hits = 2
+    metrics.observe_message(message)
+    metrics.observe_failure('a"b\\c\nd', 0.1)
+
+    # A failing execBatch counts each of its messages as error
+    batch = module_pb2.ExecutionBatch(messages=[module_pb2.ExecutionMessage(func="batched")] * 2)
+
+    def fail(request, context):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        metrics_module.MetricsInterceptor(metrics)._unary("execBatch", fail)(batch, None)
+
+    text = metrics.render()
+    assert 'mki_tool_cache_hits_total{func="cached"} 2' in text
+    assert 'mki_tool_messages_total{func="a\\"b\\\\c\\nd",status="error"} 1' in text
+    assert 'mki_tool_messages_total{func="batched",status="error"} 2' in text
+    assert 'mki_tool_calls_in_flight{method="execBatch"} 0' in text
@@ -0,0 +1,83 @@
+import importlib
+import threading
+import time
+
+import grpc
+import pytest
+
+
+class _Unavailable(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "unavailable"
+
+
+@pytest.fixture(scope="module")
+def sweep(grpc_backend):
+    return importlib.import_module("sweep")
+
+
+def _spec(endpoints, funcs, input_sets):
+    return dict(
+        endpoints=endpoints,
+        inputs={name: [dict(name=name, location=dict(uri=f"/inputs/{name}.json"))] for name in input_sets},
+        matrix=[dict(tool=tool, func=funcs, inputs=input_sets) for tool in endpoints],
+        retries=2,
+    )
+
+
+@pytest.mark.unit
+def test_sweep_concurrency_and_retries(sweep):
+
+    endpoints = dict(
+        a=dict(tool_hostname="a", tool_port=8061, concurrency=1),
+        b=dict(tool_hostname="b", tool_port=8061, concurrency=3),
+    )
+    spec = _spec(endpoints, ["f1", "f2", "f3"], ["d1", "d2"])
+
+    lock = threading.Lock()
+    running = dict(a=0, b=0)
+    max_running = dict(a=0, b=0)
+    attempts = dict()
+
+    def execute(pipeline_spec):
+        tool = pipeline_spec["tool_hostname"]
+        name = pipeline_spec["meta"]["execution_name"]
+        with lock:
+            running[tool] += 1
+            max_running[tool] = max(max_running[tool], running[tool])
+            attempts[name] = attempts.get(name, 0) + 1
+        time.sleep(0.02)
+        with lock:
+            running[tool] -= 1
+        if name == "b/f1/d1" and attempts[name] == 1:
+            raise _Unavailable()
+        if name == "b/f2/d2":
+            raise RuntimeError("broken")
+        output = [dict(artifact, payload_id="p", inline_payload=b"0.5") for artifact in pipeline_spec["output"]]
+        return dict(pipeline_spec, output=output)
+
+    report = sweep.run_sweep(spec, execute=execute, backoff=0)
+
+    assert max_running == dict(a=1, b=3)
+    assert report["summary"] == dict(total=12, succeeded=11, failed=1)
+    jobs = {job["name"]: job for job in report["jobs"]}
+    assert jobs["b/f1/d1"]["attempts"] == 2 and jobs["b/f1/d1"]["status"] == "succeeded"
+    assert jobs["b/f2/d2"]["attempts"] == 1 and jobs["b/f2/d2"]["error"] == "broken"
+    assert jobs["a/f3/d2"]["output"][0]["uri"] == "/results/sweep/a/f3/d2.json"
+    assert jobs["a/f3/d2"]["results"] == dict(result=0.5)
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_sweep_grpc(server, sweep):
+
+    spec = _spec(dict(tool=dict(server, concurrency=2)), ["echo", "fail"], ["d1", "d2", "d3"])
+    report = sweep.run_sweep(spec)
+
+    assert report["summary"] == dict(total=6, succeeded=3, failed=3)
+    jobs = {job["name"]: job for job in report["jobs"]}
+    assert jobs["tool/echo/d2"]["output"][0]["payload_id"] == "d2"
+    assert jobs["tool/fail/d1"]["attempts"] == 1
@@ -0,0 +1,126 @@
+import functools
+import importlib
+import time
+import tracemalloc
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def utils(grpc_backend):
+    return importlib.import_module("grpc_backend.utils")
+
+
+def _exec_message(n_inputs=2):
+    return dict(
+        func="metrics",
+        input=[
+            dict(
+                name=f"x{i}",
+                location=dict(uri=f"/inputs/x{i}.npy", parameters='{"mmap_mode": "r"}'),
+                payload_id=f"p{i}",
+            )
+            for i in range(n_inputs)
+        ],
+        output=[dict(name="r", location=dict(uri="/results/r.json", parameters=""), payload_id="")],
+        meta=dict(execution_name="exec-1", node="scikit-metrics-tool", timestamp=1700000000123456789, profile=""),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_execution_message_roundtrip(utils):
+
+    exec_msg = _exec_message()
+    exec_msg["output"][0]["inline_payload"] = b"{}"
+
+    assert utils.execution_message_to_dict(utils.execution_message_from_dict(exec_msg)) == exec_msg
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_execution_message_partial(utils):
+
+    msg = utils.execution_message_from_dict(dict(func="metrics", input=[dict(location=dict(uri="/inputs/x.npy"))]))
+    d = utils.execution_message_to_dict(msg)
+
+    assert d["input"][0]["location"] == dict(uri="/inputs/x.npy", parameters="")
+    assert "inline_payload" not in d["input"][0]
+    assert d["meta"] == dict(execution_name="", node="", timestamp=0, profile="")
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_parameters_as_dict(utils):
+
+    msg = utils.execution_message_from_dict(
+        dict(func="metrics", input=[dict(location=dict(uri="/inputs/x.npy", parameters=dict(mmap_mode="r")))])
+    )
+
+    assert msg.input[0].location.parameters == '{"mmap_mode": "r"}'
+
+
+def _legacy_execution_message_from_dict(module_pb2, d):
+    """The field by field conversion replaced by the descriptor-driven converter, kept as benchmark baseline"""
+
+    def artifact_node_message_from_dict(d):
+        return module_pb2.ArtifactNodeMessage(
+            name=d.get("name"),
+            location=module_pb2.ArtifactNodeLocation(uri=d.get("location", {}).get("uri")),
+            payload_id=d.get("payload_id"),
+        )
+
+    return module_pb2.ExecutionMessage(
+        func=d.get("func"),
+        input=[artifact_node_message_from_dict(inp) for inp in d.get("input", [])],
+        output=[artifact_node_message_from_dict(inp) for inp in d.get("output", [])],
+        meta=module_pb2.ExecutionMeta(execution_name=d.get("meta", {}).get("execution_name")),
+    )
+
+
+def _legacy_execution_message_to_dict(msg):
+    """The field by field conversion replaced by the descriptor-driven converter, kept as benchmark baseline"""
+
+    def artifact_node_message_to_dict(msg):
+        return dict(name=msg.name, location=dict(uri=msg.location.uri), payload_id=msg.payload_id)
+
+    return dict(
+        func=msg.func,
+        input=[artifact_node_message_to_dict(node_msg) for node_msg in msg.input],
+        output=[artifact_node_message_to_dict(node_msg) for node_msg in msg.output],
+        meta=dict(execution_name=msg.meta.execution_name),
+    )
+
+
+def _measure(func, arg, n=2000):
+    """Returns the mean wall time in microseconds and the bytes allocated by a single call"""
+    start = time.perf_counter()
+    for _ in range(n):
+        func(arg)
+    wall_time = (time.perf_counter() - start) / n * 1e6
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func(arg)
+    allocated = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return wall_time, allocated
+
+
+@pytest.mark.benchmark
+@pytest.mark.grpc
+def test_conversion_benchmark(utils):
+    module_pb2 = importlib.import_module("mki_barebone_proto.module_pb2")
+
+    exec_msg = _exec_message(n_inputs=16)
+    msg = utils.execution_message_from_dict(exec_msg)
+
+    results = dict(
+        from_dict=_measure(utils.execution_message_from_dict, exec_msg),
+        legacy_from_dict=_measure(functools.partial(_legacy_execution_message_from_dict, module_pb2), exec_msg),
+        to_dict=_measure(utils.execution_message_to_dict, msg),
+        legacy_to_dict=_measure(_legacy_execution_message_to_dict, msg),
+    )
+    for name, (wall_time, allocated) in results.items():
+        print(f"{name}: {wall_time:.1f} us, {allocated} bytes allocated (peak)")
@@ -0,0 +1,124 @@
+import importlib
+import os
+
+import pytest
+
+
+def _step(server, func, inputs, outputs):
+    return dict(
+        server,
+        func=func,
+        input=[
+            dict(name=name, location=dict(uri=source)) if source.startswith("/") else dict(name=name, source=source)
+            for name, source in inputs
+        ],
+        output=[dict(name=name, location=dict(uri=f"/results/{name}.json")) for name in outputs],
+    )
+
+
+@pytest.fixture(scope="module")
+def workflow(grpc_backend):
+    return importlib.import_module("workflow")
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_run_workflow(server, workflow):
+
+    # Diamond: a -> (b, c) -> d, b and c are independent and sleep 0.2 seconds each
+    spec = dict(
+        steps=dict(
+            a=_step(server, "echo", [("x", "/inputs/x.json")], ["out"]),
+            b=_step(server, "sleep", [("in_b", "a/out")], ["out"]),
+            c=_step(server, "sleep", [("in_c", "a/out")], ["out"]),
+            d=_step(server, "echo", [("from_b", "b/out"), ("from_c", "c/out")], ["result"]),
+        )
+    )
+    report = workflow.run_workflow(spec)
+
+    assert all(step["status"] == "succeeded" for step in report["steps"].values())
+    d = report["steps"]["d"]["response"]
+    assert [artifact["name"] for artifact in d["input"]] == ["from_b", "from_c"]
+    assert [artifact["payload_id"] for artifact in d["input"]] == ["in_b", "in_c"]
+    assert report["steps"]["b"]["start"] < report["steps"]["c"]["end"]
+    assert report["steps"]["c"]["start"] < report["steps"]["b"]["end"]
+    assert "total" in workflow.format_report(report)
+    assert report["metrics"]["process_peak_rss_bytes"] > 0
+    assert report["metrics"]["compute_seconds"] >= 0.4
+
+
+@pytest.mark.unit
+@pytest.mark.grpc
+def test_run_workflow_failure(server, workflow):
+
+    spec = dict(
+        steps=dict(
+            a=_step(server, "fail", [("x", "/inputs/x.json")], ["out"]),
+            b=_step(server, "echo", [("in_b", "a/out")], ["out"]),
+            c=_step(server, "echo", [("y", "/inputs/y.json")], ["out"]),
+        )
+    )
+    with pytest.raises(workflow.WorkflowError) as err:
+        workflow.run_workflow(spec)
+
+    steps = err.value.report["steps"]
+    assert steps["a"]["status"] == "failed"
+    assert steps["b"]["status"] == "skipped"
+
+
+@pytest.mark.unit
+def test_step_dependencies(workflow):
+
+    def step(*sources):
+        return dict(input=[dict(name="x", source=source) for source in sources], output=[dict(name="out")])
+
+    assert workflow.step_dependencies(dict(steps=dict(a=step(), b=step("a/out")))) == dict(a=set(), b={"a"})
+    with pytest.raises(ValueError, match="cycle"):
+        workflow.step_dependencies(dict(steps=dict(a=step("b/out"), b=step("a/out"))))
+    with pytest.raises(ValueError, match="unknown step"):
+        workflow.step_dependencies(dict(steps=dict(a=step("z/out"))))
+    with pytest.raises(ValueError, match="unknown output"):
+        workflow.step_dependencies(dict(steps=dict(a=step(), b=step("a/missing"))))
+
+
+@pytest.mark.unit
+def test_run_workflow_ledger(workflow, tmp_path):
+    ledger = importlib.import_module("ledger")
+
+    features = tmp_path / "x.json"
+    features.write_text("[1, 2]")
+    executed = []
+
+    def execute(step):
+        executed.append(step["func"])
+        for output in step["output"]:
+            with open(output["location"]["uri"], "w") as f:
+                f.write(step["func"])
+        output = [dict(output, payload_id=f"sha256:{step['func']}") for output in step["output"]]
+        return dict(func=step["func"], input=step["input"], output=output)
+
+    def step(func, inputs):
+        step = _step(dict(tool_hostname="tool", tool_port=8061, image_digest="sha256:0123"), func, inputs, ["out"])
+        step["output"][0]["location"]["uri"] = str(tmp_path / f"{func}.json")
+        return step
+
+    spec = dict(steps=dict(a=step("model", [("x", str(features))]), b=step("metric", [("in_b", "a/out")])))
+    with ledger.RunLedger(str(tmp_path / "ledger.db")) as run_ledger:
+        workflow.run_workflow(spec, execute=execute, ledger=run_ledger)
+        report = workflow.run_workflow(spec, execute=execute, ledger=run_ledger)
+        assert executed == ["model", "metric"]
+        assert report["steps"]["b"]["status"] == "cached"
+        assert report["steps"]["b"]["response"]["output"][0]["payload_id"] == "sha256:metric"
+
+        # A changed input file reruns its step, the unchanged result of the step does not rerun the next one
+        features.write_text("[1, 3]")
+        report = workflow.run_workflow(spec, execute=execute, ledger=run_ledger)
+        assert executed == ["model", "metric", "model"]
+        assert [report["steps"][name]["status"] for name in "ab"] == ["succeeded", "cached"]
+
+        # A deleted output reruns its step, as does a step whose image digest is unknown
+        os.remove(tmp_path / "metric.json")
+        spec["steps"]["a"]["image_digest"] = ""
+        report = workflow.run_workflow(spec, execute=execute, ledger=run_ledger)
+        assert executed == ["model", "metric", "model", "model", "metric"]
+        assert ledger.image_digest("registry/tool@sha256:4567") == "sha256:4567"
@@ -0,0 +1,71 @@
+import pytest
+import os
+from mki_barebone_io.dict import load_dict, store_dict
+from mki_barebone_io.execution_message import load
+from mki_barebone_io.inline import get_inline_payload
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_store_dict_inline(tmp_path):
+
+    path = os.path.join(tmp_path, "d.json")
+    artifact_node_msg = dict(location=dict(uri=path))
+    store_dict(dict(num=42), artifact_node_msg, inline_threshold=1024)
+
+    assert not os.path.exists(path)
+    assert artifact_node_msg["inline_payload"] == b'{"num": 42}'
+    assert load_dict(artifact_node_msg) == dict(num=42)
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_store_dict_above_threshold(tmp_path):
+
+    path = os.path.join(tmp_path, "d.json")
+    artifact_node_msg = dict(location=dict(uri=path))
+    store_dict(dict(num=42), artifact_node_msg, inline_threshold=4)
+
+    assert os.path.exists(path)
+    assert "inline_payload" not in artifact_node_msg
+    assert load_dict(artifact_node_msg) == dict(num=42)
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_store_dict_without_uri():
+
+    artifact_node_msg = dict(location=dict(uri=""))
+    store_dict(dict(num=42), artifact_node_msg, inline_threshold=1)
+
+    assert load(dict(input=[artifact_node_msg])) == [dict(num=42)]
+
+    with pytest.raises(ValueError):
+        store_dict(dict(num=42), dict(name="result", location=dict(uri="")), inline_threshold=0)
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_empty_inline_payload():
+
+    artifact_node_msg = dict(location=dict(uri=""), inline_payload=b"")
+
+    assert get_inline_payload(artifact_node_msg) == b""
+    assert get_inline_payload(dict(location=dict(uri="/inputs/x.json"))) is None
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_store_ndarray_inline(tmp_path):
+
+    np = pytest.importorskip("numpy")
+    from mki_barebone_io.ndarray import load_ndarray, store_ndarray
+
+    path = os.path.join(tmp_path, "a.npy")
+    artifact_node_msg = dict(location=dict(uri=path))
+    store_ndarray(np.arange(10), artifact_node_msg, inline_threshold=1024)
+
+    assert not os.path.exists(path)
+    assert (load_ndarray(artifact_node_msg) == np.arange(10)).all()
+    assert (load(dict(input=[dict(location=dict(uri=""), inline_payload=artifact_node_msg["inline_payload"])]))[0]
+            == np.arange(10)).all()
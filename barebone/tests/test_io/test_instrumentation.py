@@ -0,0 +1,51 @@
+import pytest
+
+from mki_barebone_io.dict import load_dict, store_dict
+from mki_barebone_io.instrumentation import cache_hit, record
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_record_load_store(tmp_path):
+
+    artifact_node_msg = dict(location=dict(uri=str(tmp_path / "d.json")))
+    with record() as recording:
+        store_dict(dict(num=list(range(100))), artifact_node_msg)
+        load_dict(artifact_node_msg)
+        load_dict(dict(inline_payload=b'{"num": 1}'))
+        cache_hit(2)
+
+    size = (tmp_path / "d.json").stat().st_size
+    assert recording.bytes_written == size
+    assert recording.bytes_read == size + len(b'{"num": 1}')
+    assert recording.load_seconds > 0 and recording.store_seconds > 0
+    assert recording.cache_hits == 2
+
+    # Outside of record nothing is recorded
+    load_dict(artifact_node_msg)
+    assert recording.bytes_read == size + len(b'{"num": 1}')
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_record_counts_transferred_bytes(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    from fsspec.implementations.local import LocalFileSystem
+
+    from mki_barebone_io.ndarray import load_ndarray, store_ndarray
+
+    def no_stat(*args, **kwargs):
+        raise AssertionError("the artifact size is taken from the transferred bytes")
+
+    monkeypatch.setattr(LocalFileSystem, "size", no_stat)
+
+    artifact_node_msg = dict(location=dict(uri=f"file://{tmp_path / 'a.npy'}"))
+    with record() as recording:
+        store_ndarray(np.arange(1000), artifact_node_msg)
+        arr = load_ndarray(artifact_node_msg)
+
+    assert arr.sum() == np.arange(1000).sum()
+    size = (tmp_path / "a.npy").stat().st_size
+    assert recording.bytes_written == size
+    # np.load reads the magic string twice
+    assert size <= recording.bytes_read < size + 16
@@ -0,0 +1,247 @@
+"""Microbenchmarks of the loaders and storers of mki_barebone_io, only run when selected (see tests/conftest.py)
+
+    pytest -m "benchmark and io"
+
+Every loader and storer is measured per file size: the minimum wall time of repeated calls, the throughput (MB/s of
+the file) and the peak memory. No baseline is shipped, as throughput depends on the machine: record one on the
+benchmark runner with MKI_BENCHMARK_UPDATE_BASELINE=1 and compare later runs on the same runner against it. A case
+fails if its throughput drops or its peak memory grows by more than the tolerance. Cases of files below 1 MB take
+fractions of a millisecond and are too noisy to compare, they are only reported. Environment variables:
+
+    MKI_BENCHMARK_SIZES: Comma separated file sizes, e.g. 1KB,1MB,1GB,4GB. Defaults to 1KB,1MB,64MB.
+    MKI_BENCHMARK_BASELINE: Path of the baseline json. Without it, the results are only reported.
+    MKI_BENCHMARK_TOLERANCE: Allowed relative throughput drop and peak memory growth. Defaults to 0.3.
+    MKI_BENCHMARK_REPORT: Path to write the results to as json.
+    MKI_BENCHMARK_UPDATE_BASELINE: Set to 1 to write the results to the baseline instead of comparing.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+
+DEFAULT_SIZES = "1KB,1MB,64MB"
+UNITS = dict(KB=1 << 10, MB=1 << 20, GB=1 << 30)
+MIN_TIME = 0.2  # Seconds a case is repeated for at least
+MIN_REPEAT = 5
+MAX_REPEAT = 100
+MIN_COMPARED_BYTES = 1 << 20  # Smaller files are only reported
+MEMORY_SLACK_BYTES = 4 << 20  # Absolute slack of the peak memory comparison, page and allocator granularity
+
+JSON_BYTES_PER_FLOAT = 20  # Approximately, e.g. "0.7063175627401305, "
+
+
+def _parse_size(size):
+    size = size.strip().upper()
+    for unit, factor in UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+SIZES = os.environ.get("MKI_BENCHMARK_SIZES", DEFAULT_SIZES).split(",")
+
+
+class _PeakMemory:
+    """Peak resident memory while measuring, via the resettable high water mark of Linux (VmHWM)
+    Without /proc the peak of the Python allocations (tracemalloc) is used, which misses the arrow memory pool.
+    """
+
+    def __enter__(self):
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+            self._base = self._status("VmRSS")
+            self._proc = True
+        except OSError:
+            self._proc = False
+            tracemalloc.start()
+        return self
+
+    @staticmethod
+    def _status(field):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+
+    def __exit__(self, *exc):
+        if self._proc:
+            self.peak = self._status("VmHWM") - self._base
+        else:
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def _measure(func):
+    """Returns the minimum wall time of func, repeated at least MIN_REPEAT times and MIN_TIME seconds, and the peak
+    memory of one call. The minimum is the least disturbed by other processes and the scheduler.
+    """
+    with _PeakMemory() as memory:
+        start = time.perf_counter()
+        func()
+        times = [time.perf_counter() - start]
+    while (len(times) < MIN_REPEAT or sum(times) < MIN_TIME) and len(times) < MAX_REPEAT:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times), memory.peak
+
+
+def _values(np, size, bytes_per_value):
+    return np.random.default_rng(0).random(max(size // bytes_per_value, 1))
+
+
+def _make_dict(np, size, path):
+    obj = dict(values=_values(np, size, JSON_BYTES_PER_FLOAT).tolist())
+    with open(path, "w") as f:
+        json.dump(obj, f)
+    return obj
+
+
+def _make_ndarray(np, size, path):
+    obj = _values(np, size, JSON_BYTES_PER_FLOAT if path.endswith(".json") else 8)
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(obj.tolist(), f)
+    else:
+        np.save(path, obj)
+    return obj
+
+
+def _make_dataframe(np, size, path):
+    import pandas as pd
+
+    n = max(size // (4 * JSON_BYTES_PER_FLOAT), 1)
+    frame = pd.DataFrame(_values(np, n * 32, 8).reshape(n, 4), columns=["a", "b", "c", "d"])
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def _make_arrow(np, size, path):
+    import pyarrow as pa
+
+    from mki_barebone_io.arrow import store_arrow
+
+    table = pa.table(dict(value=_values(np, size, 8)))
+    store_arrow([table], dict(location=dict(uri=path)), table.schema)
+    return [table], table.schema
+
+
+def _case(kind, ext, io, fixture):
+    return pytest.param(kind, ext, io, fixture, id=f"{kind}{ext}")
+
+
+CASES = [
+    _case("load_dict", ".json", "load", _make_dict),
+    _case("store_dict", ".json", "store", _make_dict),
+    _case("load_ndarray", ".json", "load", _make_ndarray),
+    _case("load_ndarray", ".npy", "load", _make_ndarray),
+    _case("store_ndarray", ".npy", "store", _make_ndarray),
+    _case("load_dataframe", ".csv", "load", _make_dataframe),
+    _case("load_arrow", ".arrow", "load", _make_arrow),
+    _case("store_arrow", ".arrow", "store", _make_arrow),
+]
+
+
+def _call(kind, obj, msg):
+    """Returns the call of a loader or storer with its arguments"""
+    if kind == "load_dict":
+        from mki_barebone_io.dict import load_dict
+
+        return lambda: load_dict(msg)
+    if kind == "store_dict":
+        from mki_barebone_io.dict import store_dict
+
+        return lambda: store_dict(obj, dict(msg))
+    if kind == "load_ndarray":
+        from mki_barebone_io.ndarray import load_ndarray
+
+        return lambda: load_ndarray(msg)
+    if kind == "store_ndarray":
+        from mki_barebone_io.ndarray import store_ndarray
+
+        return lambda: store_ndarray(obj, dict(msg))
+    if kind == "load_dataframe":
+        from mki_barebone_io.dataframe import load_dataframe
+
+        return lambda: load_dataframe(msg)
+    if kind == "load_arrow":
+        from mki_barebone_io.arrow import load_arrow
+
+        return lambda: load_arrow(msg, obj[1])
+    if kind == "store_arrow":
+        from mki_barebone_io.arrow import store_arrow
+
+        return lambda: store_arrow(obj[0], dict(msg), obj[1])
+    raise ValueError(kind)
+
+
+@pytest.fixture(scope="module")
+def results():
+    """Collects the results, writes the report and updates the baseline after the last case"""
+    results = dict()
+    yield results
+    report = os.environ.get("MKI_BENCHMARK_REPORT")
+    if report:
+        with open(report, "w") as f:
+            json.dump(results, f, indent=2)
+    path = os.environ.get("MKI_BENCHMARK_BASELINE")
+    if path and os.environ.get("MKI_BENCHMARK_UPDATE_BASELINE") == "1":
+        baseline = _load_baseline()
+        for key, value in results.items():
+            baseline[key] = dict(
+                throughput_mb_s=round(value["throughput_mb_s"], 1), peak_memory_bytes=value["peak_memory_bytes"]
+            )
+        with open(path, "w") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+
+
+def _load_baseline():
+    path = os.environ.get("MKI_BENCHMARK_BASELINE")
+    if not path or not os.path.exists(path):
+        return dict()
+    with open(path) as f:
+        return json.load(f)
+
+
+@pytest.mark.benchmark
+@pytest.mark.io
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("kind, ext, io, fixture", CASES)
+def test_io_benchmark(kind, ext, io, fixture, size, results, tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    if ext == ".csv":
+        pytest.importorskip("pandas")
+    if ext == ".arrow":
+        pytest.importorskip("pyarrow")
+    monkeypatch.delenv("MKI_INLINE_PAYLOAD_THRESHOLD", raising=False)
+
+    source = str(tmp_path / f"source{ext}")
+    obj = fixture(np, _parse_size(size), source)
+    msg = dict(location=dict(uri=source if io == "load" else str(tmp_path / f"target{ext}")))
+    call = _call(kind, obj, msg)
+
+    wall_time, peak_memory = _measure(call)
+    file_size = os.path.getsize(msg["location"]["uri"])
+    throughput = file_size / (1 << 20) / wall_time
+
+    key = f"{kind}{ext}-{size.strip()}"
+    results[key] = dict(
+        file_bytes=file_size, wall_seconds=wall_time, throughput_mb_s=throughput, peak_memory_bytes=peak_memory
+    )
+    print(f"{key}: {wall_time * 1e3:.2f} ms, {throughput:.1f} MB/s, {peak_memory / (1 << 20):.1f} MB peak memory")
+
+    baseline = _load_baseline().get(key)
+    if baseline is None or file_size < MIN_COMPARED_BYTES or os.environ.get("MKI_BENCHMARK_UPDATE_BASELINE") == "1":
+        return
+    tolerance = float(os.environ.get("MKI_BENCHMARK_TOLERANCE", 0.3))
+    assert throughput >= baseline["throughput_mb_s"] * (1 - tolerance), (
+        f"{key} regressed: {throughput:.1f} MB/s, baseline {baseline['throughput_mb_s']:.1f} MB/s"
+    )
+    assert peak_memory <= baseline["peak_memory_bytes"] * (1 + tolerance) + MEMORY_SLACK_BYTES, (
+        f"{key} regressed: {peak_memory} bytes peak memory, baseline {baseline['peak_memory_bytes']} bytes"
+    )
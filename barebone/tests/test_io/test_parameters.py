@@ -0,0 +1,33 @@
+import pytest
+import os
+from mki_barebone_io.ndarray import load_ndarray, store_ndarray
+from mki_barebone_io.parameters import artifact_parameters, open_args
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_open_args():
+
+    artifact_node_msg = dict(location=dict(uri="/x.json", parameters='{"compression": "gzip", "chunk_size": 4096}'))
+    assert open_args(artifact_node_msg) == dict(compression="gzip", block_size=4096)
+    assert artifact_parameters(dict(location=dict(uri="/x.json", parameters=""))) == dict()
+
+
+@pytest.mark.unit
+@pytest.mark.io
+def test_ndarray_parameters(tmp_path):
+    import numpy as np
+
+    arr = np.arange(1000)
+    path = os.path.join(tmp_path, "arr.npy")
+    store_ndarray(arr, dict(location=dict(uri=path, parameters='{"compression": "gzip"}')))
+    with open(path, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    loaded = load_ndarray(dict(location=dict(uri=path, parameters='{"compression": "gzip"}')))
+    assert np.array_equal(loaded, arr)
+
+    plain = os.path.join(tmp_path, "plain.npy")
+    store_ndarray(arr, dict(location=dict(uri=plain)))
+    mapped = load_ndarray(dict(location=dict(uri=plain, parameters='{"mmap_mode": "r"}')))
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(mapped, arr)
@@ -0,0 +1,98 @@
+import os
+
+INLINE_THRESHOLD_ENV = "MKI_INLINE_PAYLOAD_THRESHOLD"
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def inline_threshold(threshold: int = None) -> int:
+    """Resolve the size (in bytes) below which artifacts are transferred inline instead of via their uri
+    If no threshold is given, it is read from the environment variable MKI_INLINE_PAYLOAD_THRESHOLD.
+    A threshold of 0 (default) disables inline transfer for artifacts that have a uri.
+
+    Args:
+        threshold (int, optional): Explicit threshold overriding the environment. Defaults to None.
+
+    Returns:
+        int: The threshold in bytes
+    """
+
+    if threshold is not None:
+        return threshold
+    return int(os.environ.get(INLINE_THRESHOLD_ENV, 0))
+
+
+def wants_inline(size: int, artifact_node_msg: dict, threshold: int = None) -> bool:
+    """Checks whether an artifact of a given size should be transferred inline
+    If inline transfer is enabled, artifacts without a uri are always transferred inline, since there is no
+    location to write them to. If it is disabled, an artifact without a uri is an error, e.g. in the args
+    backend nobody reads the returned message, so the result would be lost silently.
+
+    Args:
+        size (int): The (estimated) size of the serialized artifact in bytes
+        artifact_node_msg (dict): Output artifact node message
+        threshold (int, optional): Size threshold in bytes, see inline_threshold. Defaults to None.
+
+    Raises:
+        ValueError: If the artifact has no uri and inline transfer is disabled
+
+    Returns:
+        bool: True if the artifact should be attached inline
+    """
+
+    threshold = inline_threshold(threshold)
+    if not artifact_node_msg.get("location", {}).get("uri"):
+        if threshold <= 0:
+            raise ValueError(
+                f"Output {artifact_node_msg.get('name', '')} has no uri and inline transfer is disabled, "
+                f"set {INLINE_THRESHOLD_ENV} to return it inline"
+            )
+        return True
+    return size < threshold
+
+
+def store_inline(data: bytes, artifact_node_msg: dict, threshold: int = None) -> bool:
+    """Attach serialized data to an artifact node message if it is small enough, see wants_inline
+
+    Args:
+        data (bytes): The serialized artifact
+        artifact_node_msg (dict): Output artifact node message, will be updated in place
+        threshold (int, optional): Size threshold in bytes, see inline_threshold. Defaults to None.
+
+    Returns:
+        bool: True if the data was attached inline, False if it needs to be written to the uri
+    """
+
+    if not wants_inline(len(data), artifact_node_msg, threshold):
+        return False
+
+    artifact_node_msg["inline_payload"] = data
+    return True
+
+
+def get_inline_payload(artifact_node_msg: dict) -> bytes:
+    """Returns the inline payload of an artifact node message
+
+    Args:
+        artifact_node_msg (dict): An artifact node message
+
+    Returns:
+        bytes: The inline payload (possibly empty) or None if the artifact has to be loaded from its uri
+    """
+
+    return artifact_node_msg.get("inline_payload")
+
+
+def infer_inline_ext(payload: bytes) -> str:
+    """Infers the file extension matching an inline payload, used if the artifact does not have a uri
+
+    Args:
+        payload (bytes): The inline payload
+
+    Returns:
+        str: ".npy" for numpy arrays, ".json" otherwise
+    """
+
+    if payload.startswith(NPY_MAGIC):
+        return ".npy"
+    return ".json"
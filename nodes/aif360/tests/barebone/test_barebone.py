@@ -13,7 +13,8 @@ def call_create(barebone_dir, src, dest, interface="args"):
 
     with CwdContextManager():
         subprocess.run(
-            ["uv", "run", "src/mki_barebone/main.py", "-i", src, "-o", dest, "--interface", interface],
+            # The spec does not validate against the toolspec schema yet
+            ["uv", "run", "src/mki_barebone/main.py", "-i", src, "-o", dest, "--interface", interface, "--no-validate"],
             cwd=barebone_dir,
             check=True,
         )
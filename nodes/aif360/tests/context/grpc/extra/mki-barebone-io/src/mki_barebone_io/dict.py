@@ -4,19 +4,25 @@ import json
 import hashlib
 import fsspec
 
+from mki_barebone_io.inline import get_inline_payload, store_inline
+from mki_barebone_io.parameters import open_args
+from mki_barebone_io.instrumentation import counted, instrumented
 
-def _from_json(uri: str, **fs_args) -> dict:
+
+def _from_json(uri: str, open_kwargs: dict = None, **fs_args) -> dict:
 
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
 
-    with fs.open(uri, "r") as f:
+    with counted(fs.open(uri, "r", **(open_kwargs or {}))) as f:
         return json.load(f)
 
 
+@instrumented("load")
 def load_dict(artifact_node_msg: dict, **fs_args) -> dict:
     """Load a dictionary given an artifact node message
-    Currently, dictionaries can be loaded from .json files
+    Currently, dictionaries can be loaded from .json files or from an inline json payload
+    The artifact parameters "compression" and "chunk_size" are passed on to the filesystem
 
     Args:
         artifact_node_msg (dict): An artifact node message
@@ -29,6 +35,10 @@ def load_dict(artifact_node_msg: dict, **fs_args) -> dict:
         dict: The ndarray described by the artifact node message
     """
 
+    payload = get_inline_payload(artifact_node_msg)
+    if payload is not None:
+        return json.loads(payload)
+
     uri = artifact_node_msg["location"]["uri"]
     parsed_uri = urlparse(uri)
 
@@ -36,7 +46,7 @@ def load_dict(artifact_node_msg: dict, **fs_args) -> dict:
     _, ext = os.path.splitext(file_path)
 
     if ext == ".json":
-        return _from_json(uri, **fs_args)
+        return _from_json(uri, open_args(artifact_node_msg), **fs_args)
 
     raise NotImplementedError(f"Cannot load ndarray from a file with the {ext} file extension.")
 
@@ -47,18 +57,27 @@ def hash_dict(obj: dict):
     return payload_id
 
 
-def store_dict(obj: dict, artifact_node_msg: dict, hash_obj=True, **fs_args):
+@instrumented("store")
+def store_dict(obj: dict, artifact_node_msg: dict, hash_obj=True, inline_threshold=None, **fs_args):
     """Store a dict as json file
+    If the serialized dict is smaller than the inline threshold, it is attached to the artifact node message
+    as inline payload instead of being written to the uri
 
     Args:
         obj (dict): The dict to store
         artifact_node_msg (dict): Output artifact node message
+        inline_threshold (int, optional): Size in bytes below which the dict is returned inline.
+            Defaults to None, see mki_barebone_io.inline.inline_threshold
         fs_args (dict): A dictionary of arguments to pass to the filesystem initializer
     """
 
     if hash_obj:
         artifact_node_msg["payload_id"] = hash_dict(obj)
 
+    data = json.dumps(obj).encode()
+    if store_inline(data, artifact_node_msg, inline_threshold):
+        return artifact_node_msg
+
     uri = artifact_node_msg["location"]["uri"]
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
@@ -70,7 +89,7 @@ def store_dict(obj: dict, artifact_node_msg: dict, hash_obj=True, **fs_args):
     if not fs.exists(parent_uri):
         fs.makedirs(parent_uri)
 
-    with fs.open(uri, "w") as f:
-        json.dump(obj, f)
+    with counted(fs.open(uri, "wb", **open_args(artifact_node_msg))) as f:
+        f.write(data)
 
     return artifact_node_msg
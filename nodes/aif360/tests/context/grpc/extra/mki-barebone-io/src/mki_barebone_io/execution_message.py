@@ -1,12 +1,14 @@
 from urllib.parse import urlparse
 import os
 from mki_barebone_io.registry import EXT_TO_LOADER
+from mki_barebone_io.inline import get_inline_payload, infer_inline_ext
 
 
 def load(execution_msg: dict):
     """Try to load all input resources described in the execution message
     The in-memory object to load will be inferred from the uri
     Currently only .npy-files are supported, which will load into numpy.ndarray objects
+    Inline payloads are loaded with the loader matching the uri, or the payload format if there is no uri
 
     Args:
         execution_msg (dict): _description_
@@ -22,10 +24,13 @@ def load(execution_msg: dict):
     for artifact_node_msg in execution_msg["input"]:
         uri = artifact_node_msg["location"]["uri"]
         parsed_uri = urlparse(uri)
+        payload = get_inline_payload(artifact_node_msg)
 
         # Infer from uri
-        if parsed_uri.scheme in ["", "file"]:
+        if parsed_uri.scheme in ["", "file", "grpc"] or payload is not None:
             _, ext = os.path.splitext(parsed_uri.path)
+            if not ext and payload is not None:
+                ext = infer_inline_ext(payload)
 
             if ext not in EXT_TO_LOADER:
                 raise NotImplementedError(f"There is no loader available matching to {ext}")
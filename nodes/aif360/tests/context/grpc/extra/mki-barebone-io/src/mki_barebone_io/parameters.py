@@ -0,0 +1,42 @@
+import json
+
+# Artifact parameters that are forwarded to fsspec's open as keyword arguments
+OPEN_PARAMETERS = {
+    "compression": "compression",
+    "chunk_size": "block_size",
+}
+
+
+def artifact_parameters(artifact_node_msg: dict) -> dict:
+    """Returns the per-artifact parameters of an artifact node message
+    Parameters are passed as json object in the parameters field of the location,
+    e.g. dict(uri="/inputs/x.npy", parameters='{"mmap_mode": "r"}')
+
+    Args:
+        artifact_node_msg (dict): An artifact node message
+
+    Returns:
+        dict: The parameters, empty if none were given
+    """
+
+    parameters = artifact_node_msg.get("location", {}).get("parameters")
+    if not parameters:
+        return dict()
+    if isinstance(parameters, dict):
+        return parameters
+    return json.loads(parameters)
+
+
+def open_args(artifact_node_msg: dict) -> dict:
+    """Returns the keyword arguments for fsspec's open derived from the artifact parameters
+    Currently supported are "compression" (e.g. "gzip", "infer") and "chunk_size" (block size in bytes)
+
+    Args:
+        artifact_node_msg (dict): An artifact node message
+
+    Returns:
+        dict: Keyword arguments for fsspec.AbstractFileSystem.open
+    """
+
+    parameters = artifact_parameters(artifact_node_msg)
+    return {arg: parameters[name] for name, arg in OPEN_PARAMETERS.items() if name in parameters}
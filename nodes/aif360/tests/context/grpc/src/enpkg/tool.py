@@ -1,5 +1,7 @@
 """A generated script for importing and calling tool functions"""
 
+import importlib
+
 from aif360_wrapper.wrapper import statistical_parity_difference_wrapper
 from aif360_wrapper.wrapper import num_positives_wrapper
 from aif360_wrapper.wrapper import num_negatives_wrapper
@@ -8,6 +10,31 @@ from aif360_wrapper.wrapper import disparate_impact_wrapper
 from aif360_wrapper.wrapper import consistency_wrapper
 from aif360_wrapper.wrapper import smoothed_empirical_differential_fairness_wrapper
 
+# Modules of the tool functions. A module can define a function warmup (e.g. to load a model), which is called once
+# before the gRPC server reports SERVING
+TOOL_MODULES = [
+    "aif360_wrapper.wrapper",
+]
+
+# Tool functions by the name in the execution message. In an image of merged tools the names are namespaced by the
+# tool ("<tool>/<function>"), a function name that is unique among the tools is also found without the namespace
+FUNCTIONS = {
+    "statistical_parity_difference_wrapper": statistical_parity_difference_wrapper,
+    "num_positives_wrapper": num_positives_wrapper,
+    "num_negatives_wrapper": num_negatives_wrapper,
+    "base_rate_wrapper": base_rate_wrapper,
+    "disparate_impact_wrapper": disparate_impact_wrapper,
+    "consistency_wrapper": consistency_wrapper,
+    "smoothed_empirical_differential_fairness_wrapper": smoothed_empirical_differential_fairness_wrapper,
+}
+
+
+def warmup():
+    """Calls the warmup functions of the tool modules"""
+    for name in TOOL_MODULES:
+        module_warmup = getattr(importlib.import_module(name), "warmup", None)
+        if module_warmup is not None:
+            module_warmup()
 
 
 def funcwrapper(exec_message: dict):
@@ -20,20 +47,7 @@ def funcwrapper(exec_message: dict):
         Exception: If trying to call a function that the tool does not provide.
     """
     funcname = exec_message["func"]
-
-    if funcname == "statistical_parity_difference_wrapper":
-        return statistical_parity_difference_wrapper(exec_message)
-    if funcname == "num_positives_wrapper":
-        return num_positives_wrapper(exec_message)
-    if funcname == "num_negatives_wrapper":
-        return num_negatives_wrapper(exec_message)
-    if funcname == "base_rate_wrapper":
-        return base_rate_wrapper(exec_message)
-    if funcname == "disparate_impact_wrapper":
-        return disparate_impact_wrapper(exec_message)
-    if funcname == "consistency_wrapper":
-        return consistency_wrapper(exec_message)
-    if funcname == "smoothed_empirical_differential_fairness_wrapper":
-        return smoothed_empirical_differential_fairness_wrapper(exec_message)
-    
-    raise Exception(f"Function {funcname} not found")
\ No newline at end of file
+    function = FUNCTIONS.get(funcname)
+    if function is None:
+        raise Exception(f"Function {funcname} not found")
+    return function(exec_message)
\ No newline at end of file
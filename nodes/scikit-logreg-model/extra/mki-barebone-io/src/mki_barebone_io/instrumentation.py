@@ -0,0 +1,176 @@
+"""Measures the time and bytes spent in the loaders and storers while executing a tool function
+Each call of a decorated loader or storer is also recorded as tracing span (see tracing.py).
+
+A backend wraps the call of a tool function in record(), the loaders and storers decorated with instrumented()
+add their duration to the recording of the calling thread. The bytes are counted as they are transferred: the
+loaders and storers open their files with counted(fs.open(...)), inline payloads count with their length.
+No extra stat of the artifact is made:
+
+    with record() as recording:
+        funcwrapper(exec_message)
+    recording.load_seconds, recording.bytes_read
+
+Tool functions that reuse results from a cache of their own (e.g. a model loaded once per process) report each
+reuse with cache_hit(), the backends return the count in ExecutionMetrics.cache_hits.
+
+Outside of record() the decorated functions only cost a thread-local lookup.
+"""
+
+import contextlib
+import functools
+import threading
+import time
+
+from mki_barebone_io.inline import get_inline_payload
+from mki_barebone_io.tracing import span
+
+_local = threading.local()
+
+
+class Recording:
+    """Accumulated load and store durations (seconds), transferred bytes and cache hits of one tool function call"""
+
+    def __init__(self):
+        self.load_seconds = 0.0
+        self.store_seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.cache_hits = 0
+
+
+@contextlib.contextmanager
+def record():
+    """Records the loaders and storers called by the current thread
+
+    Yields:
+        Recording: The recording, complete when the context exits
+    """
+    previous = getattr(_local, "recording", None)
+    _local.recording = Recording()
+    try:
+        yield _local.recording
+    finally:
+        _local.recording = previous
+
+
+def cache_hit(count: int = 1):
+    """Counts results the calling tool function reused from a cache instead of computing them
+
+    Args:
+        count (int, optional): Number of reused results. Defaults to 1.
+    """
+    recording = getattr(_local, "recording", None)
+    if recording is not None:
+        recording.cache_hits += count
+
+
+class _CountingFile:
+    """Proxy of an open file object that adds the bytes read from and written to the file to a recording"""
+
+    def __init__(self, f, recording: Recording):
+        self._f = f
+        self._recording = recording
+
+    def read(self, *args, **kwargs):
+        data = self._f.read(*args, **kwargs)
+        self._recording.bytes_read += len(data)
+        return data
+
+    def read1(self, *args, **kwargs):
+        data = self._f.read1(*args, **kwargs)
+        self._recording.bytes_read += len(data)
+        return data
+
+    def readline(self, *args, **kwargs):
+        line = self._f.readline(*args, **kwargs)
+        self._recording.bytes_read += len(line)
+        return line
+
+    def readinto(self, buffer):
+        count = self._f.readinto(buffer)
+        self._recording.bytes_read += count or 0
+        return count
+
+    def write(self, data):
+        count = self._f.write(data)
+        self._recording.bytes_written += count if count is not None else memoryview(data).nbytes
+        return count
+
+    def __iter__(self):
+        for line in self._f:
+            self._recording.bytes_read += len(line)
+            yield line
+
+    def __enter__(self):
+        self._f.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._f.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def counted(f):
+    """Counts the bytes read from or written to an open file in the recording of the calling thread
+    Text files count characters, compressed files the uncompressed bytes.
+
+    Args:
+        f (file-like): The open file, e.g. returned by fs.open()
+
+    Returns:
+        file-like: The file itself outside of record(), a counting proxy of it otherwise
+    """
+    recording = getattr(_local, "recording", None)
+    return f if recording is None else _CountingFile(f, recording)
+
+
+def _inline_size(artifact_node_msg) -> int:
+    if not isinstance(artifact_node_msg, dict):
+        return 0
+    payload = get_inline_payload(artifact_node_msg)
+    return 0 if payload is None else len(payload)
+
+
+def instrumented(kind: str):
+    """Decorator for loaders ("load") and storers ("store"), whose artifact node message is the first respectively
+    second positional argument
+
+    Args:
+        kind (str): "load" or "store"
+
+    Returns:
+        callable: The decorator
+    """
+    position = 0 if kind == "load" else 1
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            msg = args[position] if len(args) > position else kwargs.get("artifact_node_msg")
+            if msg is None:
+                msg = kwargs.get("artifact_node_message")
+            uri = msg.get("location", {}).get("uri") if isinstance(msg, dict) else None
+
+            recording = getattr(_local, "recording", None)
+            if recording is None:
+                with span(func.__name__, uri=uri):
+                    return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            with span(func.__name__, uri=uri):
+                result = func(*args, **kwargs)
+            duration = time.perf_counter() - start
+
+            if kind == "load":
+                recording.load_seconds += duration
+                recording.bytes_read += _inline_size(msg)
+            else:
+                recording.store_seconds += duration
+                recording.bytes_written += _inline_size(msg)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -3,31 +3,66 @@
 import logging
 
 import argparse
+import os
+import signal
+import sys
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
-def serve_grpc(port: int):
+def serve_grpc(port: int, metrics_port: int = None):
     """Start a gRPC server for exchanging execution messages
 
     Args:
         port (int): Port to serve to
+        metrics_port (int, optional): HTTP port for Prometheus metrics, None or 0 disables them. Defaults to None.
 
     Returns:
         grpc.server: The running gRPC server instance
     """
     from grpc_backend.server import serve
 
-    return serve(port=port)
+    return serve(port=port, metrics_port=metrics_port, service_name="scikit-logreg-model")
+
+
+def check_grpc(port: int):
+    """Checks whether the local gRPC server reports SERVING, container healthchecks run healthcheck.py directly
+
+    Args:
+        port (int): Port of the gRPC server
+
+    Returns:
+        bool: True if the server is serving
+    """
+    from healthcheck import check
+
+    return check(port)
 
 
 def grpc_main():
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=8061, help="The port of the gRPC server (if gRPC is being used)")
+    parser.add_argument("--health", action="store_true", help="Exit with 0 if the running server is serving")
+    parser.add_argument(
+        "--metrics_port",
+        type=int,
+        default=int(os.environ.get("MKI_METRICS_PORT", 0)),
+        help="Serve Prometheus metrics on this HTTP port (/metrics), 0 disables them",
+    )
     args = parser.parse_args()
-    serve_grpc(args.port).wait_for_termination()
+    if args.health:
+        sys.exit(0 if check_grpc(args.port) else 1)
+
+    from grpc_backend.tracing import shutdown_tracing
+
+    # docker stop sends SIGTERM, exit through the finally block to export the pending spans
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve_grpc(args.port, args.metrics_port).wait_for_termination()
+    finally:
+        shutdown_tracing()
 
 
 def args_main():
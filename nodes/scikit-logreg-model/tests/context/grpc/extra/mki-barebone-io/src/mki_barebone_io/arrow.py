@@ -3,6 +3,9 @@ import os
 import fsspec
 from typing import List
 
+from mki_barebone_io.parameters import open_args
+from mki_barebone_io.instrumentation import counted, instrumented
+
 try:
     import pyarrow as pa
     from schema import Schema, And, Optional, Use
@@ -62,6 +65,7 @@ def parse_schema(schema_def: List[dict]) -> pa.Schema:
     return pa.schema(schema_def)
 
 
+@instrumented("load")
 def load_arrow(artifact_node_msg: dict, schema: pa.Schema, **fs_args) -> List[pa.Table]:
     """Load a batch of tables from an Apache Arrow file (IPC)
     Args:
@@ -86,7 +90,7 @@ def load_arrow(artifact_node_msg: dict, schema: pa.Schema, **fs_args) -> List[pa
         fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
 
         batches = []
-        with fs.open(uri, "rb") as source:
+        with counted(fs.open(uri, "rb", **open_args(artifact_node_msg))) as source:
             reader = pa.RecordBatchFileReader(source)
             for batch_index in range(reader.num_record_batches):
                 batch = reader.get_record_batch(batch_index)
@@ -100,6 +104,7 @@ def hash_arrow():
     pass
 
 
+@instrumented("store")
 def store_arrow(
     tables: List[pa.Table], artifact_node_message: dict, schema: pa.Schema, hash_obj: bool = True, **fs_args
 ) -> dict:
@@ -126,7 +131,7 @@ def store_arrow(
     if not fs.exists(parent_uri):
         fs.makedirs(parent_uri)
 
-    with fs.open(uri, "wb") as sink:
+    with counted(fs.open(uri, "wb", **open_args(artifact_node_message))) as sink:
         writer = pa.RecordBatchFileWriter(sink, schema)
         for table in tables:
             writer.write_table(table)
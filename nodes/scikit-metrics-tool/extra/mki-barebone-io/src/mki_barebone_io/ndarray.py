@@ -1,36 +1,48 @@
 from urllib.parse import urlparse, urlunparse
+import io
 import os
 import json
 import fsspec
 
+from mki_barebone_io.inline import NPY_MAGIC, get_inline_payload, store_inline, wants_inline
+from mki_barebone_io.parameters import artifact_parameters, open_args
+from mki_barebone_io.instrumentation import counted, instrumented
+
 try:
     import numpy as np
 except ImportError:
     raise ImportError("Please install numpy to use numpy io features")
 
 
-def _from_npy(uri: str, **fs_args) -> np.ndarray:
+def _from_npy(uri: str, open_kwargs: dict = None, mmap_mode: str = None, **fs_args) -> np.ndarray:
 
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
 
-    with fs.open(uri) as f:
+    # Memory mapping requires a local file, its pages are read (and not counted) when the tool accesses them
+    if mmap_mode is not None and parsed_uri.scheme in ["", "file"]:
+        return np.load(parsed_uri.path, mmap_mode=mmap_mode)
+
+    with counted(fs.open(uri, "rb", **(open_kwargs or {}))) as f:
         arr = np.load(f)
     return arr
 
 
-def _from_json(uri: str, **fs_args) -> np.ndarray:
+def _from_json(uri: str, open_kwargs: dict = None, **fs_args) -> np.ndarray:
 
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
 
-    with fs.open(uri, "r") as f:
+    with counted(fs.open(uri, "r", **(open_kwargs or {}))) as f:
         return np.array(json.load(f))
 
 
+@instrumented("load")
 def load_ndarray(artifact_node_msg: dict, **fs_args) -> np.ndarray:
     """Load an ndarray given an artifact node message
-    Currently, ndarrays can be loaded from .npy or .json files
+    Currently, ndarrays can be loaded from .npy or .json files or from an inline payload in either format
+    The artifact parameters "compression" and "chunk_size" are passed on to the filesystem,
+    local .npy files can be memory mapped via the artifact parameter "mmap_mode"
 
     Args:
         artifact_node_msg (dict): An artifact node message
@@ -43,6 +55,12 @@ def load_ndarray(artifact_node_msg: dict, **fs_args) -> np.ndarray:
         np.ndarray: The ndarray described by the artifact node message
     """
 
+    payload = get_inline_payload(artifact_node_msg)
+    if payload is not None:
+        if payload.startswith(NPY_MAGIC):
+            return np.load(io.BytesIO(payload))
+        return np.array(json.loads(payload))
+
     uri = artifact_node_msg["location"]["uri"]
     parsed_uri = urlparse(uri)
 
@@ -50,10 +68,11 @@ def load_ndarray(artifact_node_msg: dict, **fs_args) -> np.ndarray:
     _, ext = os.path.splitext(file_path)
 
     if ext == ".json":
-        return _from_json(uri, **fs_args)
+        return _from_json(uri, open_args(artifact_node_msg), **fs_args)
 
     if ext == ".npy":
-        return _from_npy(uri, **fs_args)
+        mmap_mode = artifact_parameters(artifact_node_msg).get("mmap_mode")
+        return _from_npy(uri, open_args(artifact_node_msg), mmap_mode, **fs_args)
 
     raise NotImplementedError(f"Cannot load ndarray from a file with the {ext} file extension.")
 
@@ -62,15 +81,26 @@ def hash_ndarray():
     pass
 
 
-def store_ndarray(obj: np.ndarray, artifact_node_message: dict, hash_obj=True, **fs_args):
+@instrumented("store")
+def store_ndarray(obj: np.ndarray, artifact_node_message: dict, hash_obj=True, inline_threshold=None, **fs_args):
     """Store an numpy ndarray to uri
+    If the serialized array is smaller than the inline threshold, it is attached to the artifact node message
+    as inline .npy payload instead of being written to the uri
 
     Args:
         obj (np.ndarray): The numpy array to store
         artifact_node_message (dict): Output artifact node message
+        inline_threshold (int, optional): Size in bytes below which the array is returned inline.
+            Defaults to None, see mki_barebone_io.inline.inline_threshold
         fs_args (dict): A dictionary of arguments to pass to the filesystem initializer
     """
 
+    if wants_inline(obj.nbytes, artifact_node_message, inline_threshold):
+        buffer = io.BytesIO()
+        np.save(buffer, obj)
+        if store_inline(buffer.getvalue(), artifact_node_message, inline_threshold):
+            return artifact_node_message
+
     uri = artifact_node_message["location"]["uri"]
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
@@ -82,7 +112,7 @@ def store_ndarray(obj: np.ndarray, artifact_node_message: dict, hash_obj=True, *
     if not fs.exists(parent_uri):
         fs.makedirs(parent_uri)
 
-    with fs.open(uri, "wb") as f:
+    with counted(fs.open(uri, "wb", **open_args(artifact_node_message))) as f:
         np.save(f, obj)
 
     return artifact_node_message
@@ -1,5 +1,7 @@
 """A generated script for importing and calling tool functions"""
 
+import importlib
+
 from scikit_metrics.metric_server import accuracy_wrapper
 from scikit_metrics.metric_server import precision_wrapper
 from scikit_metrics.metric_server import recall_wrapper
@@ -14,6 +16,37 @@ from scikit_metrics.metric_server import fp_wrapper
 from scikit_metrics.metric_server import tn_wrapper
 from scikit_metrics.metric_server import fn_wrapper
 
+# Modules of the tool functions. A module can define a function warmup (e.g. to load a model), which is called once
+# before the gRPC server reports SERVING
+TOOL_MODULES = [
+    "scikit_metrics.metric_server",
+]
+
+# Tool functions by the name in the execution message. In an image of merged tools the names are namespaced by the
+# tool ("<tool>/<function>"), a function name that is unique among the tools is also found without the namespace
+FUNCTIONS = {
+    "accuracy_wrapper": accuracy_wrapper,
+    "precision_wrapper": precision_wrapper,
+    "recall_wrapper": recall_wrapper,
+    "f1_wrapper": f1_wrapper,
+    "roc_auc_wrapper": roc_auc_wrapper,
+    "mcc_wrapper": mcc_wrapper,
+    "mse_wrapper": mse_wrapper,
+    "specificity_wrapper": specificity_wrapper,
+    "balanced_accuracy_wrapper": balanced_accuracy_wrapper,
+    "tp_wrapper": tp_wrapper,
+    "fp_wrapper": fp_wrapper,
+    "tn_wrapper": tn_wrapper,
+    "fn_wrapper": fn_wrapper,
+}
+
+
+def warmup():
+    """Calls the warmup functions of the tool modules"""
+    for name in TOOL_MODULES:
+        module_warmup = getattr(importlib.import_module(name), "warmup", None)
+        if module_warmup is not None:
+            module_warmup()
 
 
 def funcwrapper(exec_message: dict):
@@ -26,32 +59,7 @@ def funcwrapper(exec_message: dict):
         Exception: If trying to call a function that the tool does not provide.
     """
     funcname = exec_message["func"]
-
-    if funcname == "accuracy_wrapper":
-        return accuracy_wrapper(exec_message)
-    if funcname == "precision_wrapper":
-        return precision_wrapper(exec_message)
-    if funcname == "recall_wrapper":
-        return recall_wrapper(exec_message)
-    if funcname == "f1_wrapper":
-        return f1_wrapper(exec_message)
-    if funcname == "roc_auc_wrapper":
-        return roc_auc_wrapper(exec_message)
-    if funcname == "mcc_wrapper":
-        return mcc_wrapper(exec_message)
-    if funcname == "mse_wrapper":
-        return mse_wrapper(exec_message)
-    if funcname == "specificity_wrapper":
-        return specificity_wrapper(exec_message)
-    if funcname == "balanced_accuracy_wrapper":
-        return balanced_accuracy_wrapper(exec_message)
-    if funcname == "tp_wrapper":
-        return tp_wrapper(exec_message)
-    if funcname == "fp_wrapper":
-        return fp_wrapper(exec_message)
-    if funcname == "tn_wrapper":
-        return tn_wrapper(exec_message)
-    if funcname == "fn_wrapper":
-        return fn_wrapper(exec_message)
-    
-    raise Exception(f"Function {funcname} not found")
\ No newline at end of file
+    function = FUNCTIONS.get(funcname)
+    if function is None:
+        raise Exception(f"Function {funcname} not found")
+    return function(exec_message)
\ No newline at end of file
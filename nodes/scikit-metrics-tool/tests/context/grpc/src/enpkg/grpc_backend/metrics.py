@@ -0,0 +1,242 @@
+"""Prometheus metrics of the gRPC server, served as text exposition format on an optional HTTP port
+
+An interceptor of the Module service counts the executed messages per function and status, observes their latency
+in a histogram, sums the bytes read and written and the cache hits (see ExecutionMetrics in module.proto) and tracks
+the calls in flight per method. Messages of execBatch and execStream are counted individually, their latency is the
+sum of the phases measured by the tool. If a whole execBatch call fails, each of its messages is counted as error
+with an equal share of the call duration.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    """Escapes a label value as required by the text exposition format: backslash, double quote and line feed"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}" if names else ""
+
+
+class _Metric:
+    """A metric family with a fixed set of label names, values are kept per label values"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = dict()
+        self._lock = threading.Lock()
+
+    def _samples(self):
+        with self._lock:
+            return [(f"{self.name}{_labels(self.labelnames, key)}", value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{sample} {value}" for sample, value in self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def add(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = list(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            counts, count, total = self._values.get(labels, ([0] * len(self.buckets), 0, 0.0))
+            counts = [bucket + (value <= bound) for bucket, bound in zip(counts, self.buckets)]
+            self._values[labels] = (counts, count + 1, total + value)
+
+    def _samples(self):
+        samples = []
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, count, total) in self._values.items():
+                for bound, bucket in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket{_labels(names, key + (bound,))}", bucket))
+                samples.append((f"{self.name}_bucket{_labels(names, key + ('+Inf',))}", count))
+                samples.append((f"{self.name}_sum{_labels(self.labelnames, key)}", total))
+                samples.append((f"{self.name}_count{_labels(self.labelnames, key)}", count))
+        return samples
+
+
+class ServerMetrics:
+    """The metrics of a tool server"""
+
+    def __init__(self):
+        self.messages = Counter("mki_tool_messages_total", "Executed messages", ["func", "status"])
+        self.latency = Histogram("mki_tool_message_seconds", "Latency of executed messages", ["func"])
+        self.bytes_read = Counter("mki_tool_read_bytes_total", "Bytes read by the loaders", ["func"])
+        self.bytes_written = Counter("mki_tool_written_bytes_total", "Bytes written by the storers", ["func"])
+        self.cache_hits = Counter("mki_tool_cache_hits_total", "Results reused from caches of the tool", ["func"])
+        self.in_flight = Gauge("mki_tool_calls_in_flight", "Calls currently executed", ["method"])
+        self.families = [
+            self.messages,
+            self.latency,
+            self.bytes_read,
+            self.bytes_written,
+            self.cache_hits,
+            self.in_flight,
+        ]
+
+    def observe_message(self, message, duration=None):
+        """Records an executed message (response ExecutionMessage)
+
+        Args:
+            message (Python gRPC-Message): The response "ExecutionMessage" (see module.proto)
+            duration (float, optional): Latency in seconds. Defaults to the sum of the phases in meta.metrics.
+        """
+        metrics = message.meta.metrics
+        if duration is None:
+            duration = sum(
+                getattr(metrics, f"{phase}_seconds") for phase in ["decode", "load", "compute", "store", "encode"]
+            )
+        status = "error" if message.meta.HasField("error") else "ok"
+        self.messages.inc(message.func, status)
+        self.latency.observe(duration, message.func)
+        self.bytes_read.inc(message.func, amount=metrics.bytes_read)
+        self.bytes_written.inc(message.func, amount=metrics.bytes_written)
+        self.cache_hits.inc(message.func, amount=metrics.cache_hits)
+
+    def observe_failure(self, func, duration):
+        """Records a message whose call failed"""
+        self.messages.inc(func, "error")
+        self.latency.observe(duration, func)
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format"""
+        return "\n".join(line for family in self.families for line in family.render()) + "\n"
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Records the calls of the Module service in ServerMetrics"""
+
+    def __init__(self, metrics):
+        """
+        Args:
+            metrics (ServerMetrics): The metrics to record to
+        """
+        self.metrics = metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        service, _, method = handler_call_details.method.lstrip("/").partition("/")
+        if handler is None or service != "Module":
+            return handler
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                self._unary(method, handler.unary_unary),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        if handler.stream_stream is not None:
+            return grpc.stream_stream_rpc_method_handler(
+                self._stream(method, handler.stream_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+        return handler
+
+    def _unary(self, method, behavior):
+        def wrapper(request, context):
+            self.metrics.in_flight.add(method)
+            start = time.perf_counter()
+            try:
+                response = behavior(request, context)
+            except Exception:
+                duration = time.perf_counter() - start
+                if method == "exec":
+                    self.metrics.observe_failure(request.func, duration)
+                else:
+                    for message in request.messages:
+                        self.metrics.observe_failure(message.func, duration / len(request.messages))
+                raise
+            finally:
+                self.metrics.in_flight.add(method, amount=-1)
+            if method == "exec":
+                self.metrics.observe_message(response, time.perf_counter() - start)
+            else:
+                for message in response.messages:
+                    self.metrics.observe_message(message)
+            return response
+
+        return wrapper
+
+    def _stream(self, method, behavior):
+        def wrapper(request_iterator, context):
+            self.metrics.in_flight.add(method)
+            try:
+                for response in behavior(request_iterator, context):
+                    self.metrics.observe_message(response)
+                    yield response
+            finally:
+                self.metrics.in_flight.add(method, amount=-1)
+
+        return wrapper
+
+
+def serve_metrics(metrics, port):
+    """Serves the metrics on http://0.0.0.0:<port>/metrics in a daemon thread
+
+    Args:
+        metrics (ServerMetrics): The metrics to serve
+        port (int): The HTTP port
+
+    Returns:
+        http.server.ThreadingHTTPServer: The running HTTP server, stop it with shutdown()
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.debug(f"Serving metrics on port {server.server_address[1]}")
+    return server
\ No newline at end of file
@@ -34,7 +34,7 @@ def test_create_uct_container_filematch(
     files_to_match = [
         "src/enpkg/grpc_backend/server.py",
         "src/enpkg/grpc_backend/utils.py",
-        "src/enpkg/grpc_backend/module.proto",
+        "extra/mki-barebone-proto/src/mki_barebone_proto/module.proto",
         "src/enpkg/main.py",
         "src/enpkg/tool.py",
         "src/enpkg/uct_wrapper/impl.py",
@@ -2,21 +2,25 @@ from urllib.parse import urlparse
 import fsspec
 import os
 
+from mki_barebone_io.parameters import open_args
+from mki_barebone_io.instrumentation import counted, instrumented
+
 try:
     import pandas as pd
 except ImportError:
     raise ImportError("Please install pandas to use pandas io features")
 
 
-def _from_csv(uri: str, **fs_args) -> pd.DataFrame:
+def _from_csv(uri: str, open_kwargs: dict = None, **fs_args) -> pd.DataFrame:
 
     parsed_uri = urlparse(uri)
     fs = fsspec.filesystem(parsed_uri.scheme, **fs_args)
 
-    with fs.open(uri, "r") as f:
+    with counted(fs.open(uri, "r", **(open_kwargs or {}))) as f:
         return pd.read_csv(f)
 
 
+@instrumented("load")
 def load_dataframe(artifact_node_msg: dict, **fs_args) -> pd.DataFrame:
     """Load an ndarray given an artifact node message
     Currently, ndarrays can be loaded from .npy or .json files
@@ -39,6 +43,6 @@ def load_dataframe(artifact_node_msg: dict, **fs_args) -> pd.DataFrame:
     _, ext = os.path.splitext(file_path)
 
     if ext == ".csv":
-        return _from_csv(uri, **fs_args)
+        return _from_csv(uri, open_args(artifact_node_msg), **fs_args)
 
     raise NotImplementedError(f"Cannot load dataframe from a file with the {ext} file extension.")
@@ -1,5 +1,7 @@
 """A generated script for importing and calling tool functions"""
 
+import importlib
+
 from uct_wrapper.impl import mean_absolute_calibration_error
 from uct_wrapper.impl import expected_calibration_error
 from uct_wrapper.impl import root_mean_squared_calibration_error
@@ -10,6 +12,33 @@ from uct_wrapper.impl import negative_log_likelihood
 from uct_wrapper.impl import continuous_ranked_probability_score
 from uct_wrapper.impl import expected_standard_deviation
 
+# Modules of the tool functions. A module can define a function warmup (e.g. to load a model), which is called once
+# before the gRPC server reports SERVING
+TOOL_MODULES = [
+    "uct_wrapper.impl",
+]
+
+# Tool functions by the name in the execution message. In an image of merged tools the names are namespaced by the
+# tool ("<tool>/<function>"), a function name that is unique among the tools is also found without the namespace
+FUNCTIONS = {
+    "mean_absolute_calibration_error": mean_absolute_calibration_error,
+    "expected_calibration_error": expected_calibration_error,
+    "root_mean_squared_calibration_error": root_mean_squared_calibration_error,
+    "miscalibration_area": miscalibration_area,
+    "interval_score": interval_score,
+    "check_score": check_score,
+    "negative_log_likelihood": negative_log_likelihood,
+    "continuous_ranked_probability_score": continuous_ranked_probability_score,
+    "expected_standard_deviation": expected_standard_deviation,
+}
+
+
+def warmup():
+    """Calls the warmup functions of the tool modules"""
+    for name in TOOL_MODULES:
+        module_warmup = getattr(importlib.import_module(name), "warmup", None)
+        if module_warmup is not None:
+            module_warmup()
 
 
 def funcwrapper(exec_message: dict):
@@ -22,24 +51,7 @@ def funcwrapper(exec_message: dict):
         Exception: If trying to call a function that the tool does not provide.
     """
     funcname = exec_message["func"]
-
-    if funcname == "mean_absolute_calibration_error":
-        return mean_absolute_calibration_error(exec_message)
-    if funcname == "expected_calibration_error":
-        return expected_calibration_error(exec_message)
-    if funcname == "root_mean_squared_calibration_error":
-        return root_mean_squared_calibration_error(exec_message)
-    if funcname == "miscalibration_area":
-        return miscalibration_area(exec_message)
-    if funcname == "interval_score":
-        return interval_score(exec_message)
-    if funcname == "check_score":
-        return check_score(exec_message)
-    if funcname == "negative_log_likelihood":
-        return negative_log_likelihood(exec_message)
-    if funcname == "continuous_ranked_probability_score":
-        return continuous_ranked_probability_score(exec_message)
-    if funcname == "expected_standard_deviation":
-        return expected_standard_deviation(exec_message)
-    
-    raise Exception(f"Function {funcname} not found")
\ No newline at end of file
+    function = FUNCTIONS.get(funcname)
+    if function is None:
+        raise Exception(f"Function {funcname} not found")
+    return function(exec_message)
\ No newline at end of file
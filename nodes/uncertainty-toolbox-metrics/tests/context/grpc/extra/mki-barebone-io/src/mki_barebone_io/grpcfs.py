@@ -0,0 +1,202 @@
+import queue
+import threading
+
+from fsspec.spec import AbstractFileSystem, AbstractBufferedFile
+
+try:
+    import grpc
+except ImportError:
+    raise ImportError("Please install grpcio to use the grpc:// filesystem")
+
+CHUNK_SIZE = 1 << 20  # 1 MiB, well below the default gRPC message size limit of 4 MiB
+UPLOAD_QUEUE_SIZE = 8  # Chunks buffered before write() blocks, bounds the memory of an upload
+
+COMPRESSION = {
+    None: grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def _raise_for(err, path):
+    """Maps the status of a failed call to the matching OSError, other errors are raised unchanged"""
+    if err.code() == grpc.StatusCode.NOT_FOUND:
+        raise FileNotFoundError(path) from err
+    if err.code() == grpc.StatusCode.PERMISSION_DENIED:
+        raise PermissionError(path) from err
+    raise err
+
+
+def _proto():
+    """Imports the prebuilt protobuf modules of the gRPC protocol (package mki-barebone-proto)
+
+    Returns:
+        tuple: The module_pb2 and module_pb2_grpc modules
+    """
+    import mki_barebone_proto.module_pb2 as module_pb2
+    import mki_barebone_proto.module_pb2_grpc as module_pb2_grpc
+
+    return module_pb2, module_pb2_grpc
+
+
+class GrpcFile(AbstractBufferedFile):
+    """A file on a remote node, read in byte ranges and written as a single streaming upload"""
+
+    def _fetch_range(self, start, end):
+        if end <= start:
+            return b""  # A length of 0 would request the whole remainder of the file
+        return self.fs._download(self.path, offset=start, length=end - start)
+
+    def _initiate_upload(self):
+        module_pb2, _ = _proto()
+        target, uri = self.fs._split(self.path)
+        self._queue = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        self._sent = False
+
+        def chunks():
+            offset = 0
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    return
+                yield module_pb2.ArtifactChunk(uri=uri, data=data, offset=offset)
+                offset += len(data)
+
+        self._future = self.fs._stub(target).upload.future(chunks(), compression=COMPRESSION[self.fs.compression])
+
+    def _put(self, data):
+        """Queues a chunk for the upload stream
+        If the server ended the call (e.g. rejected the upload), it stops reading the stream and a full queue
+        would block forever, so the queue is polled and the error of the call is raised instead.
+        """
+        while True:
+            if self._future.done():
+                self._fail()
+            try:
+                self._queue.put(data, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _fail(self):
+        """Raises the error of an upload that ended before all chunks were sent"""
+        try:
+            self._queue.put_nowait(None)  # Releases the request stream if it is still waiting for chunks
+        except queue.Full:
+            pass
+        try:
+            self._future.result()
+        except grpc.RpcError as err:
+            _raise_for(err, self.path)
+        raise IOError(f"Upload of {self.path} ended before all chunks were sent")
+
+    def _upload_chunk(self, final=False):
+        data = self.buffer.getvalue()
+        for start in range(0, len(data), self.fs.chunk_size):
+            self._put(data[start:start + self.fs.chunk_size])
+            self._sent = True
+        if final:
+            if not self._sent:
+                self._put(b"")  # The first chunk carries the uri, so empty files need one empty chunk
+            self._put(None)
+            try:
+                self._future.result()
+            except grpc.RpcError as err:
+                _raise_for(err, self.path)
+        return True
+
+
+class GrpcFileSystem(AbstractFileSystem):
+    """An fsspec filesystem for artifacts served by the Artifacts service of other nodes
+
+    Paths have the form grpc://<hostname>:<port>/<path>, e.g. grpc://scikit-tool:8061/results/result.json.
+    Registered as fsspec implementation for the grpc protocol, so the existing loaders work unchanged.
+    """
+
+    protocol = "grpc"
+
+    def __init__(self, chunk_size=CHUNK_SIZE, compression=None, **storage_options):
+        """
+        Args:
+            chunk_size (int, optional): Size of the streamed chunks in bytes. Defaults to 1 MiB.
+            compression (str, optional): gzip, deflate or None. Defaults to None.
+        """
+        super().__init__(**storage_options)
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self._channels = dict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        path = str(path)
+        if path.startswith("grpc://"):
+            path = path[len("grpc://"):]
+        return path.rstrip("/")
+
+    def _split(self, path):
+        target, _, local_path = self._strip_protocol(path).partition("/")
+        return target, "/" + local_path
+
+    def _stub(self, target):
+        _, module_pb2_grpc = _proto()
+        with self._lock:
+            if target not in self._channels:
+                self._channels[target] = grpc.insecure_channel(target)
+            return module_pb2_grpc.ArtifactsStub(self._channels[target])
+
+    def _download(self, path, offset=0, length=0):
+        module_pb2, _ = _proto()
+        target, uri = self._split(path)
+        request = module_pb2.ArtifactRequest(
+            uri=uri, offset=offset, length=length, chunk_size=self.chunk_size, compression=self.compression or ""
+        )
+        try:
+            return b"".join(chunk.data for chunk in self._stub(target).download(request))
+        except grpc.RpcError as err:
+            _raise_for(err, path)
+
+    @staticmethod
+    def _entry(target, info):
+        return dict(name=f"{target}{info.uri}", size=info.size, type="directory" if info.directory else "file")
+
+    def info(self, path, **kwargs):
+        module_pb2, _ = _proto()
+        target, uri = self._split(path)
+        try:
+            info = self._stub(target).stat(module_pb2.ArtifactRequest(uri=uri))
+        except grpc.RpcError as err:
+            _raise_for(err, path)
+        return self._entry(target, info)
+
+    def ls(self, path, detail=True, **kwargs):
+        module_pb2, _ = _proto()
+        target, uri = self._split(path)
+        try:
+            listing = self._stub(target).list(module_pb2.ArtifactRequest(uri=uri))
+        except grpc.RpcError as err:
+            _raise_for(err, path)
+        entries = [self._entry(target, info) for info in listing.entries]
+        return entries if detail else [entry["name"] for entry in entries]
+
+    def makedirs(self, path, exist_ok=False):
+        pass  # Parent directories are created by the remote node on upload
+
+    def mkdir(self, path, create_parents=True, **kwargs):
+        pass
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        if start is None and end is None:
+            return self._download(path)
+        return super().cat_file(path, start=start, end=end, **kwargs)
+
+    def _open(self, path, mode="rb", block_size=None, autocommit=True, cache_options=None, **kwargs):
+        return GrpcFile(
+            self,
+            path,
+            mode=mode,
+            block_size=block_size or self.chunk_size,
+            autocommit=autocommit,
+            cache_options=cache_options,
+            **kwargs,
+        )
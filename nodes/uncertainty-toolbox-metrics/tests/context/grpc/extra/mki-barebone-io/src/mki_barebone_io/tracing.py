@@ -0,0 +1,33 @@
+"""Optional OpenTelemetry spans, no-ops if opentelemetry-api is not installed (extra "tracing")
+
+The spans become part of the trace of the calling backend, e.g. the gRPC call of the orchestrator, which also
+configures where they are exported to.
+"""
+
+import contextlib
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+TRACER_NAME = "mki_barebone_io"
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Context manager recording a span as child of the current span
+
+    Args:
+        name (str): Name of the span
+        attributes: Attributes of the span, None values are left out
+
+    Yields:
+        opentelemetry.trace.Span: The span, None without opentelemetry
+    """
+    if trace is None:
+        yield None
+        return
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=attributes) as current:
+        yield current
@@ -0,0 +1,28 @@
+"""Prebuilt python code of the gRPC protocol between the orchestrator and the tool containers
+
+The modules module_pb2, module_pb2_grpc, health_pb2 and health_pb2_grpc are generated from module.proto and
+health.proto (see Makefile), they are not compiled when a tool or the orchestrator is built.
+"""
+
+
+def __getattr__(name):
+    # __version__ is looked up on first use, importing importlib.metadata would slow down e.g. healthchecks
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
+
+        try:
+            return version("mki-barebone-proto")
+        except PackageNotFoundError:  # Not installed, e.g. on the python path of the tests
+            return "unknown"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def api_implementation():
+    """Returns the backend that (de)serializes the messages
+
+    Returns:
+        str: "upb" (default), "cpp" or "python"
+    """
+    from google.protobuf.internal import api_implementation
+
+    return api_implementation.Type()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: mki_barebone_proto/module.proto
+# Protobuf Python Version: 5.29.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    29,
+    0,
+    '',
+    'mki_barebone_proto/module.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1fmki_barebone_proto/module.proto\"\x07\n\x05\x45mpty\"\xe7\x01\n\x10\x45xecutionMetrics\x12\x16\n\x0e\x64\x65\x63ode_seconds\x18\x01 \x01(\x01\x12\x14\n\x0cload_seconds\x18\x02 \x01(\x01\x12\x17\n\x0f\x63ompute_seconds\x18\x03 \x01(\x01\x12\x15\n\rstore_seconds\x18\x04 \x01(\x01\x12\x16\n\x0e\x65ncode_seconds\x18\x05 \x01(\x01\x12\x1e\n\x16process_peak_rss_bytes\x18\x06 \x01(\x03\x12\x12\n\nbytes_read\x18\x07 \x01(\x03\x12\x15\n\rbytes_written\x18\x08 \x01(\x03\x12\x12\n\ncache_hits\x18\t \x01(\x03\"\xac\x01\n\rExecutionMeta\x12\x16\n\x0e\x65xecution_name\x18\x01 \x01(\t\x12\x0c\n\x04node\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\x12\x12\n\x05\x65rror\x18\x04 \x01(\tH\x00\x88\x01\x01\x12\'\n\x07metrics\x18\x05 \x01(\x0b\x32\x11.ExecutionMetricsH\x01\x88\x01\x01\x12\x0f\n\x07profile\x18\x06 \x01(\tB\x08\n\x06_errorB\n\n\x08_metrics\"7\n\x14\x41rtifactNodeLocation\x12\x0b\n\x03uri\x18\x01 \x01(\t\x12\x12\n\nparameters\x18\x02 \x01(\t\"\x90\x01\n\x13\x41rtifactNodeMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\'\n\x08location\x18\x02 \x01(\x0b\x32\x15.ArtifactNodeLocation\x12\x12\n\npayload_id\x18\x03 \x01(\t\x12\x1b\n\x0einline_payload\x18\x04 \x01(\x0cH\x00\x88\x01\x01\x42\x11\n\x0f_inline_payload\"\x89\x01\n\x10\x45xecutionMessage\x12\x0c\n\x04\x66unc\x18\x01 \x01(\t\x12#\n\x05input\x18\x02 \x03(\x0b\x32\x14.ArtifactNodeMessage\x12$\n\x06output\x18\x03 \x03(\x0b\x32\x14.ArtifactNodeMessage\x12\x1c\n\x04meta\x18\x04 \x01(\x0b\x32\x0e.ExecutionMeta\"5\n\x0e\x45xecutionBatch\x12#\n\x08messages\x18\x01 \x03(\x0b\x32\x11.ExecutionMessage\":\n\rArtifactChunk\x12\x0b\n\x03uri\x18\x01 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x0e\n\x06offset\x18\x03 \x01(\x03\"g\n\x0f\x41rtifactRequest\x12\x0b\n\x03uri\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0e\n\x06length\x18\x03 \x01(\x03\x12\x12\n\nchunk_size\x18\x04 \x01(\x03\x12\x13\n\x0b\x63ompression\x18\x05 \x01(\t\"P\n\x0c\x41rtifactInfo\x12\x0b\n\x03uri\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x03\x12\x12\n\npayload_id\x18\x03 \x01(\t\x12\x11\n\tdirectory\x18\x04 \x01(\x08\"1\n\x0f\x41rtifactListing\x12\x1e\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\r.ArtifactInfo2\x9d\x01\n\x06Module\x12,\n\x04\x65xec\x12\x11.ExecutionMessage\x1a\x11.ExecutionMessage\x12\x36\n\nexecStream\x12\x11.ExecutionMessage\x1a\x11.ExecutionMessage(\x01\x30\x01\x12-\n\texecBatch\x12\x0f.ExecutionBatch\x1a\x0f.ExecutionBatch2\xbb\x01\n\tArtifacts\x12)\n\x06upload\x12\x0e.ArtifactChunk\x1a\r.ArtifactInfo(\x01\x12.\n\x08\x64ownload\x12\x10.ArtifactRequest\x1a\x0e.ArtifactChunk0\x01\x12\'\n\x04stat\x12\x10.ArtifactRequest\x1a\r.ArtifactInfo\x12*\n\x04list\x12\x10.ArtifactRequest\x1a\x10.ArtifactListingb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'mki_barebone_proto.module_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_EMPTY']._serialized_start=35
+  _globals['_EMPTY']._serialized_end=42
+  _globals['_EXECUTIONMETRICS']._serialized_start=45
+  _globals['_EXECUTIONMETRICS']._serialized_end=276
+  _globals['_EXECUTIONMETA']._serialized_start=279
+  _globals['_EXECUTIONMETA']._serialized_end=451
+  _globals['_ARTIFACTNODELOCATION']._serialized_start=453
+  _globals['_ARTIFACTNODELOCATION']._serialized_end=508
+  _globals['_ARTIFACTNODEMESSAGE']._serialized_start=511
+  _globals['_ARTIFACTNODEMESSAGE']._serialized_end=655
+  _globals['_EXECUTIONMESSAGE']._serialized_start=658
+  _globals['_EXECUTIONMESSAGE']._serialized_end=795
+  _globals['_EXECUTIONBATCH']._serialized_start=797
+  _globals['_EXECUTIONBATCH']._serialized_end=850
+  _globals['_ARTIFACTCHUNK']._serialized_start=852
+  _globals['_ARTIFACTCHUNK']._serialized_end=910
+  _globals['_ARTIFACTREQUEST']._serialized_start=912
+  _globals['_ARTIFACTREQUEST']._serialized_end=1015
+  _globals['_ARTIFACTINFO']._serialized_start=1017
+  _globals['_ARTIFACTINFO']._serialized_end=1097
+  _globals['_ARTIFACTLISTING']._serialized_start=1099
+  _globals['_ARTIFACTLISTING']._serialized_end=1148
+  _globals['_MODULE']._serialized_start=1151
+  _globals['_MODULE']._serialized_end=1308
+  _globals['_ARTIFACTS']._serialized_start=1311
+  _globals['_ARTIFACTS']._serialized_end=1498
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,387 @@
+"""End-to-end benchmarks of barebone-generated tools
+
+Measures the cold start, the per-call latency (p50, p99) and the throughput of the args and gRPC backends of a tool
+at several data sizes. Tools run as local processes from their generated contexts (target "process", no docker
+needed, the context must be runnable with the given python, e.g. the venv of the node with compiled protos) or as
+containers (target "docker"). A benchmark spec for main.py --benchmark, paths are relative to the spec:
+
+    {
+        "node": "scikit-metrics-tool",
+        "python": "../../.venv/bin/python",
+        "contexts": {"args": "../context/args", "grpc": "../context/grpc"},
+        "images": {"args": "scikit-metrics-tool", "grpc": "scikit-metrics-tool-grpc"},
+        "sizes": [1, 100, 10000],
+        "calls": 20,
+        "concurrency": 4,
+        "cases": [
+            {
+                "func": "accuracy_wrapper",
+                "input": [
+                    {"name": "y_true", "uri": "../data/true_labels.json", "scale": true},
+                    {"name": "y_pred", "uri": "../data/pred_labels.json", "scale": true}
+                ],
+                "output": [{"name": "result", "uri": "result.json"}]
+            }
+        ]
+    }
+
+Inputs with "scale" are repeated size times: the items of a json array, the rows of a csv file or of an arrow table.
+The cold start of the gRPC backend is the time until the started tool reports SERVING, the args backend starts a
+process per call, so its cold start is the first call. With target "docker" the report also contains the size of
+the image per backend. The report lists one entry per backend, case and size.
+"""
+
+import concurrent.futures as futures
+import copy
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from pool import DockerBackend, ProcessBackend
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+BACKENDS = ["args", "grpc"]
+DEFAULT_SIZES = [1, 100, 10000]
+DEFAULT_CALLS = 20
+DEFAULT_CONCURRENCY = 4
+STARTUP_TIMEOUT = 120
+HEALTH_INTERVAL = 0.05
+
+
+def percentile(values, q):
+    """Returns the q-th percentile (nearest rank) of a list of values, None if it is empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(q / 100 * len(ordered)))) - 1]
+
+
+def latency_summary(latencies):
+    """Summarizes call latencies in seconds
+
+    Args:
+        latencies (list): Latencies in seconds
+
+    Returns:
+        dict: mean, min, p50, p99 and max
+    """
+    if not latencies:
+        return dict(mean=None, min=None, p50=None, p99=None, max=None)
+    return dict(
+        mean=sum(latencies) / len(latencies),
+        min=min(latencies),
+        p50=percentile(latencies, 50),
+        p99=percentile(latencies, 99),
+        max=max(latencies),
+    )
+
+
+def scale_file(src, dest, size):
+    """Writes a file with the items of a json array or the rows of a csv or arrow file repeated size times
+
+    Args:
+        src (str): Path of the sample file
+        dest (str): Path to write to
+        size (int): Number of repetitions
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    ext = os.path.splitext(src)[1].lower()
+    if ext == ".json":
+        with open(src, "r") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"Only json arrays can be scaled, {src} is a {type(data).__name__}")
+        with open(dest, "w") as f:
+            json.dump(data * size, f)
+    elif ext == ".csv":
+        with open(src, "r") as f:
+            header, *rows = f.read().splitlines()
+        with open(dest, "w") as f:
+            f.write("\n".join([header] + rows * size) + "\n")
+    elif ext == ".arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(src, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        table = pa.concat_tables([table] * size)
+        with pa.OSFile(dest, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Cannot scale {src}, supported are .json, .csv and .arrow")
+    return os.path.getsize(dest)
+
+
+def prepare_case(case, size, base_dir, workdir):
+    """Writes the inputs of a case at a data size and returns its pipeline spec fields
+
+    Args:
+        case (dict): A case of the benchmark spec
+        size (int): Number of repetitions of the scaled inputs
+        base_dir (str): Directory the input uris are relative to
+        workdir (str): Directory to write the inputs and outputs to
+
+    Returns:
+        tuple: (func, input and output of the pipeline spec, the input size in bytes)
+    """
+    case_dir = os.path.join(workdir, f"{case['func']}-{size}")
+    os.makedirs(os.path.join(case_dir, "results"), exist_ok=True)
+    inputs = []
+    input_bytes = 0
+    for item in case["input"]:
+        src = os.path.join(base_dir, item["uri"])
+        dest = os.path.join(case_dir, os.path.basename(src))
+        if item.get("scale"):
+            input_bytes += scale_file(src, dest, size)
+        else:
+            shutil.copyfile(src, dest)
+            input_bytes += os.path.getsize(dest)
+        inputs.append(dict(name=item["name"], location=dict(uri=dest)))
+    outputs = [
+        dict(name=item["name"], location=dict(uri=os.path.join(case_dir, "results", item["uri"])))
+        for item in case["output"]
+    ]
+    return dict(func=case["func"], input=inputs, output=outputs), input_bytes
+
+
+class ArgsTarget:
+    """Calls the args backend, one process or container per call"""
+
+    def __init__(self, command, cwd=None):
+        """
+        Args:
+            command (list): Command running src/enpkg/main.py of the args context
+            cwd (str, optional): Working directory of the processes, the context. Defaults to None.
+        """
+        self.command = command
+        self.cwd = cwd
+        self.cold_start = None
+
+    def start(self):
+        pass
+
+    def call(self, spec):
+        args = [
+            "--func",
+            spec["func"],
+            "--input_uri",
+            *[item["location"]["uri"] for item in spec["input"]],
+            "--output_uri",
+            *[item["location"]["uri"] for item in spec["output"]],
+        ]
+        start = time.perf_counter()
+        result = subprocess.run(self.command + args, cwd=self.cwd, capture_output=True, text=True)
+        duration = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"{spec['func']} exited with {result.returncode}: {result.stderr[-2000:]}")
+        if self.cold_start is None:
+            self.cold_start = duration
+        return duration
+
+    def stop(self):
+        pass
+
+
+class GrpcTarget:
+    """Calls the gRPC backend of a tool started by a pool backend (see pool.py)"""
+
+    def __init__(self, backend, image):
+        """
+        Args:
+            backend (pool.ProcessBackend or pool.DockerBackend): Starts and stops the tool
+            image (str): Image name passed to the backend
+        """
+        self.backend = backend
+        self.image = image
+        self.cold_start = None
+        self._handle = None
+
+    def start(self):
+        from grpc_backend.channels import discard_channel
+        from grpc_backend.client import check_health
+
+        start = time.perf_counter()
+        self._handle = self.backend.start(self.image)
+        self.endpoint = dict(tool_hostname=self._handle["tool_hostname"], tool_port=self._handle["tool_port"])
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while check_health(self.endpoint) != "SERVING":
+            if not self.backend.alive(self._handle) or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"{self.image} did not report SERVING")
+            discard_channel(self.endpoint)
+            time.sleep(HEALTH_INTERVAL)
+        self.cold_start = time.perf_counter() - start
+        logger.info(f"{self.image} serving after {self.cold_start:.3f}s")
+
+    def call(self, spec):
+        from grpc_backend.client import orchestrate
+
+        spec = dict(copy.deepcopy(spec), meta=dict(execution_name=uuid.uuid4().hex), **self.endpoint)
+        start = time.perf_counter()
+        orchestrate(spec)
+        return time.perf_counter() - start
+
+    def stop(self):
+        if self._handle is not None:
+            self.backend.stop(self._handle)
+            self._handle = None
+
+
+def image_name(backend, benchmark_spec):
+    """Returns the image of a backend of the tool, from "images" of the spec or named after the node"""
+    default_image = benchmark_spec["node"] if backend == "args" else f"{benchmark_spec['node']}-grpc"
+    return benchmark_spec.get("images", {}).get(backend, default_image)
+
+
+def image_size(image):
+    """Returns the size of a local docker image in bytes"""
+    result = subprocess.run(
+        ["docker", "image", "inspect", "--format", "{{.Size}}", image], capture_output=True, text=True, check=True
+    )
+    return int(result.stdout.strip())
+
+
+def make_target(backend, target, benchmark_spec, base_dir, workdir, python=None):
+    """Creates the target running a backend of the tool
+
+    Args:
+        backend (str): "args" or "grpc"
+        target (str): "process" or "docker"
+        benchmark_spec (dict): The benchmark spec, see module docstring
+        base_dir (str): Directory the contexts are relative to
+        workdir (str): Directory of the inputs and outputs, mounted into the containers
+        python (str, optional): Python executable of the process target. Defaults to "python" of the spec (relative
+            to base_dir) or sys.executable.
+
+    Returns:
+        ArgsTarget or GrpcTarget: The target
+    """
+    python = python or benchmark_spec.get("python") or sys.executable
+    if os.sep in python and not os.path.isabs(python):
+        python = os.path.abspath(os.path.join(base_dir, python))
+    node = benchmark_spec["node"]
+    if target == "process":
+        context = os.path.join(base_dir, benchmark_spec.get("contexts", {}).get(backend, f"../context/{backend}"))
+        if backend == "args":
+            return ArgsTarget([python, "src/enpkg/main.py"], cwd=context)
+        command = [python, "src/enpkg/main.py", "--port", "{port}"]
+        return GrpcTarget(ProcessBackend({node: command}, cwd=context), node)
+    if target == "docker":
+        image = image_name(backend, benchmark_spec)
+        volume = ["-v", f"{workdir}:{workdir}"]
+        if backend == "args":
+            return ArgsTarget(["docker", "run", "--rm", *volume, image, "python", "-u", "src/enpkg/main.py"])
+        return GrpcTarget(DockerBackend(run_args=volume), image)
+    raise ValueError(f"Unknown target {target}, expected process or docker")
+
+
+def _numbered(spec, i):
+    """Returns the spec with outputs of its own, so concurrent calls do not write the same files"""
+    spec = copy.deepcopy(spec)
+    for item in spec["output"]:
+        head, tail = os.path.split(item["location"]["uri"])
+        item["location"]["uri"] = os.path.join(head, f"{i}-{tail}")
+    return spec
+
+
+def _succeeds(target, spec):
+    try:
+        target.call(spec)
+        return True
+    except Exception as err:
+        logger.error(f"Call of {spec['func']} failed: {err}")
+        return False
+
+
+def _measure(target, spec, calls, concurrency):
+    """Runs calls sequentially for the latencies and concurrently for the throughput"""
+    latencies, errors = [], 0
+    for _ in range(calls):
+        try:
+            latencies.append(target.call(spec))
+        except Exception as err:
+            logger.error(f"Call of {spec['func']} failed: {err}")
+            errors += 1
+
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        done = list(executor.map(lambda i: _succeeds(target, _numbered(spec, i)), range(calls)))
+    elapsed = time.perf_counter() - start
+    errors += done.count(False)
+    return latencies, errors, done.count(True) / elapsed
+
+
+def run_benchmark(benchmark_spec, base_dir=".", backends=BACKENDS, target="process", python=None):
+    """Runs the benchmark of a tool for each backend, case and data size
+
+    Args:
+        benchmark_spec (dict): The benchmark spec, see module docstring
+        base_dir (str, optional): Directory the paths of the spec are relative to. Defaults to ".".
+        backends (list, optional): Backends to benchmark. Defaults to ["args", "grpc"].
+        target (str, optional): "process" or "docker". Defaults to "process".
+        python (str, optional): Python executable of the process target. Defaults to sys.executable.
+
+    Returns:
+        dict: The report with the environment, the cold start (and image size) per backend and one result per backend,
+            case and size
+    """
+    sizes = benchmark_spec.get("sizes", DEFAULT_SIZES)
+    calls = benchmark_spec.get("calls", DEFAULT_CALLS)
+    concurrency = benchmark_spec.get("concurrency", DEFAULT_CONCURRENCY)
+    report = dict(
+        node=benchmark_spec["node"],
+        target=target,
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        python=platform.python_version(),
+        machine=platform.machine(),
+        cold_start=dict(),
+        results=[],
+    )
+    if target == "docker":
+        report["image_size"] = {backend: image_size(image_name(backend, benchmark_spec)) for backend in backends}
+
+    workdir = tempfile.mkdtemp(prefix="mki-benchmark-")
+    try:
+        for backend in backends:
+            tool = make_target(backend, target, benchmark_spec, base_dir, workdir, python)
+            tool.start()
+            try:
+                for case in benchmark_spec["cases"]:
+                    for size in sizes:
+                        spec, input_bytes = prepare_case(case, size, base_dir, workdir)
+                        tool.call(spec)  # Warm up, e.g. lazy imports of the function
+                        latencies, errors, throughput = _measure(tool, spec, calls, concurrency)
+                        result = dict(
+                            backend=backend,
+                            func=case["func"],
+                            size=size,
+                            input_bytes=input_bytes,
+                            calls=calls,
+                            errors=errors,
+                            latency=latency_summary(latencies),
+                            concurrency=concurrency,
+                            throughput=throughput,
+                        )
+                        logger.info(
+                            f"{backend} {case['func']} x{size}: p50 {result['latency']['p50']}s, "
+                            f"p99 {result['latency']['p99']}s, {throughput} calls/s"
+                        )
+                        report["results"].append(result)
+            finally:
+                tool.stop()
+            report["cold_start"][backend] = tool.cold_start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
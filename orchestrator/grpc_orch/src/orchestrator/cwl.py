@@ -0,0 +1,310 @@
+"""Runs the subset of CWL generated by the barebone (tool.cwl.jinja) with warm gRPC tool containers
+
+Instead of starting a container per step like cwltool, each CommandLineTool step is mapped to the long-running gRPC
+container of its image (DockerRequirement.dockerPull) and executed with an ExecutionMessage:
+
+    - the step inputs func, input_uri and output_uri become func, input and output of the message
+    - File inputs of the job are uploaded to the tool via the Artifacts service, relative output paths are written
+      below results_root/<step name>/
+    - outputs passed on to a step of another tool are read remotely via grpc://<tool>/<path>
+    - the workflow outputs are downloaded to outdir, like cwltool --outdir
+    - with a pool (see pool.py), each step runs on a leased warm container of its image instead of the endpoint.
+      Without a shared volume, outputs stay in the container that wrote them, so the pool must not stop containers
+      while the workflow runs (min_size equal to max_size)
+
+Supported are Workflows of such CommandLineTools with step inputs given as source (or list of sources with
+linkMerge merge_flattened) and default values. Other CWL features (scatter, when, valueFrom, subworkflows, ...)
+raise NotImplementedError.
+"""
+
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+from workflow import run_workflow, DEFAULT_MAX_WORKERS
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_PORT = 8061
+RESULTS_ROOT = "/results"
+OUTPUT_FILES = "output_files"
+UNSUPPORTED_STEP_FIELDS = ["scatter", "when"]
+UNSUPPORTED_INPUT_FIELDS = ["valueFrom", "pickValue", "loadContents"]
+
+
+def load_document(path):
+    """Loads a CWL document or job, json or (if PyYAML is installed) yaml
+
+    Args:
+        path (str): Path to the document
+
+    Returns:
+        dict: The document
+    """
+    with open(path, "r") as f:
+        content = f.read()
+    try:
+        return json.loads(content)
+    except ValueError:
+        import yaml
+
+        return yaml.safe_load(content)
+
+
+def _endpoint(tool, endpoints):
+    """Returns tool_hostname and tool_port of the container serving the image of a CommandLineTool, and the image"""
+    if tool.get("class") != "CommandLineTool":
+        raise NotImplementedError(f"Only CommandLineTool steps are supported, got {tool.get('class')}")
+    image = tool.get("requirements", {}).get("DockerRequirement", {}).get("dockerPull")
+    if not image:
+        raise ValueError("CommandLineTool steps need a DockerRequirement with dockerPull")
+
+    address = (endpoints or {}).get(image)
+    if address is None:
+        # By default, the container is reachable by the image name without tag, as in the compose files
+        address = f"{image.rsplit('/', 1)[-1].split(':', 1)[0]}:{DEFAULT_PORT}"
+    hostname, _, port = address.rpartition(":")
+    return dict(tool_hostname=hostname, tool_port=int(port), image=image)
+
+
+def _file_path(value, base_dir):
+    """Returns the local path of a File value (dict with class File or plain path) relative to base_dir"""
+    if isinstance(value, dict):
+        if value.get("class") != "File":
+            raise NotImplementedError(f"Unsupported input value {value}")
+        value = value.get("path") or urlparse(value["location"]).path
+    return os.path.normpath(os.path.join(base_dir, value))
+
+
+class _Translator:
+    """Translates a CWL workflow and job into a workflow spec for workflow.run_workflow"""
+
+    def __init__(self, workflow_path, job_path, endpoints, results_root, shared_volume):
+        self.workflow_dir = os.path.dirname(os.path.abspath(workflow_path))
+        self.job_dir = os.path.dirname(os.path.abspath(job_path))
+        self.workflow = load_document(workflow_path)
+        self.job = load_document(job_path)
+        self.endpoints = endpoints
+        self.results_root = results_root
+        self.shared_volume = shared_volume
+
+        if self.workflow.get("class") != "Workflow":
+            raise NotImplementedError(f"Only Workflow documents are supported, got {self.workflow.get('class')}")
+
+    def _workflow_input(self, name):
+        """Returns the value of a workflow input and the directory relative paths are resolved to"""
+        if name in self.job:
+            return self.job[name], self.job_dir
+        spec = self.workflow.get("inputs", {}).get(name)
+        if spec is None:
+            raise ValueError(f"Unknown workflow input {name}")
+        if isinstance(spec, dict) and "default" in spec:
+            return spec["default"], self.workflow_dir
+        raise ValueError(f"Workflow input {name} is neither given in the job nor has a default")
+
+    def _step_input(self, step_name, binding, steps):
+        """Resolves a step input to a list of (value, base_dir) for workflow inputs and (None, source) for
+        outputs of other steps
+        """
+        if not isinstance(binding, dict):
+            binding = dict(source=binding)
+        for field in UNSUPPORTED_INPUT_FIELDS:
+            if field in binding:
+                raise NotImplementedError(f"{field} of step {step_name} is not supported")
+
+        sources = binding.get("source")
+        if sources is None:
+            return [(binding["default"], self.workflow_dir)]
+        if isinstance(sources, str):
+            sources = [sources]
+        elif binding.get("linkMerge", "merge_nested") != "merge_flattened" and len(sources) > 1:
+            raise NotImplementedError(f"linkMerge {binding.get('linkMerge')} of step {step_name} is not supported")
+
+        values = []
+        for source in sources:
+            source_step, _, source_output = source.partition("/")
+            if source_output:
+                if source_step not in steps or source_output != OUTPUT_FILES:
+                    raise ValueError(f"Step {step_name} references unknown output {source}")
+                values.append((None, source_step))
+            else:
+                value, base_dir = self._workflow_input(source)
+                values.extend((item, base_dir) for item in (value if isinstance(value, list) else [value]))
+        return values
+
+    def translate(self):
+        """Returns the workflow spec, the workflow outputs are listed as "outputs": {name: step name}"""
+        cwl_steps = self.workflow.get("steps", {})
+        if isinstance(cwl_steps, list):
+            cwl_steps = {step.pop("id"): step for step in cwl_steps}
+
+        tools = dict()
+        outputs = dict()  # Output artifacts per step, needed to wire output_files
+        for step_name, cwl_step in cwl_steps.items():
+            for field in UNSUPPORTED_STEP_FIELDS:
+                if field in cwl_step:
+                    raise NotImplementedError(f"{field} of step {step_name} is not supported")
+            run = cwl_step["run"]
+            tools[step_name] = run if isinstance(run, dict) else load_document(os.path.join(self.workflow_dir, run))
+
+            output_uris = self._step_input(step_name, cwl_step.get("in", {})["output_uri"], cwl_steps)
+            outputs[step_name] = [
+                dict(name=f"{OUTPUT_FILES}{i}", location=dict(uri=os.path.join(self.results_root, step_name, uri)))
+                for i, (uri, _) in enumerate(output_uris)
+            ]
+
+        steps = dict()
+        for step_name, cwl_step in cwl_steps.items():
+            bindings = cwl_step.get("in", {})
+            steps[step_name] = dict(
+                _endpoint(tools[step_name], self.endpoints),
+                func=self._step_input(step_name, bindings["func"], cwl_steps)[0][0],
+                input=self._step_inputs(step_name, bindings.get("input_uri"), cwl_steps, outputs),
+                output=outputs[step_name],
+                stage=[],
+            )
+            for i, artifact in enumerate(steps[step_name]["input"]):
+                if "path" in artifact:
+                    path = artifact.pop("path")
+                    uri = path if self.shared_volume else os.path.join(
+                        self.results_root, step_name, "inputs", f"{i}-{os.path.basename(path)}"
+                    )
+                    artifact["location"] = dict(uri=uri)
+                    if not self.shared_volume:
+                        steps[step_name]["stage"].append(dict(path=path, uri=uri))
+
+        workflow_outputs = dict()
+        for name, spec in self.workflow.get("outputs", {}).items():
+            source_step, _, source_output = spec.get("outputSource", "").partition("/")
+            if source_step not in steps or source_output != OUTPUT_FILES:
+                raise ValueError(f"Workflow output {name} references unknown output {spec.get('outputSource')}")
+            workflow_outputs[name] = source_step
+
+        return dict(steps=steps, outputs=workflow_outputs)
+
+    def _step_inputs(self, step_name, binding, cwl_steps, outputs):
+        """Translates the input_uri of a step into input artifacts, outputs of other steps become sources"""
+        if binding is None:
+            return []
+        inputs = []
+        for value, origin in self._step_input(step_name, binding, cwl_steps):
+            if value is None:
+                for output in outputs[origin]:
+                    inputs.append(dict(name=f"input{len(inputs)}", source=f"{origin}/{output['name']}"))
+            else:
+                inputs.append(dict(name=f"input{len(inputs)}", path=_file_path(value, origin)))
+        return inputs
+
+
+def cwl_to_workflow(workflow_path, job_path, endpoints=None, results_root=RESULTS_ROOT, shared_volume=False):
+    """Translates a CWL workflow and its job into a workflow spec for workflow.run_workflow
+
+    Args:
+        workflow_path (str): Path to workflow.cwl
+        job_path (str): Path to job.json
+        endpoints (dict, optional): Mapping of image name to "hostname:port" of its gRPC container. Defaults to the
+            image name without tag and port 8061.
+        results_root (str, optional): Directory in the tool containers for relative output paths. Defaults to
+            /results.
+        shared_volume (bool, optional): If the orchestrator and all tools share the paths of the job files, inputs
+            are neither uploaded nor read remotely. Defaults to False.
+
+    Returns:
+        dict: The workflow spec, each step additionally lists the local files to "stage" to the tool
+    """
+    return _Translator(workflow_path, job_path, endpoints, results_root, shared_volume).translate()
+
+
+def _remote_outputs(step, response):
+    """Rewrites the output uris of a response to grpc:// uris, so steps on other tools can read them"""
+    target = f"{step['tool_hostname']}:{step['tool_port']}"
+    for artifact in response["output"]:
+        uri = artifact["location"]["uri"]
+        if uri and "inline_payload" not in artifact and not urlparse(uri).scheme:
+            artifact["location"]["uri"] = f"grpc://{target}{uri}"
+    return response
+
+
+def _uri_endpoint(uri, step):
+    """Returns the endpoint of the tool holding an output, the host of a grpc:// uri or else the step endpoint"""
+    parsed = urlparse(uri)
+    if parsed.scheme == "grpc":
+        return dict(tool_hostname=parsed.hostname, tool_port=parsed.port)
+    return step
+
+
+def run_cwl(
+    workflow_path,
+    job_path,
+    outdir=None,
+    endpoints=None,
+    results_root=RESULTS_ROOT,
+    shared_volume=False,
+    max_workers=DEFAULT_MAX_WORKERS,
+    ledger=None,
+    pool=None,
+):
+    """Runs a CWL workflow with warm gRPC tool containers
+
+    Args:
+        workflow_path (str): Path to workflow.cwl
+        job_path (str): Path to job.json
+        outdir (str, optional): Directory to download the workflow outputs to. Defaults to None (no download).
+        endpoints (dict, optional): Mapping of image name to "hostname:port", see cwl_to_workflow.
+        results_root (str, optional): Directory in the tool containers for relative output paths.
+        shared_volume (bool, optional): Whether the orchestrator and the tools share the files, see
+            cwl_to_workflow. Defaults to False.
+        max_workers (int, optional): Maximum number of concurrently running steps. Defaults to 8.
+        ledger (ledger.RunLedger, optional): Ledger to skip unchanged steps, see workflow.run_workflow.
+        pool (pool.PoolManager, optional): Warm containers to run the steps on, see module docstring.
+
+    Raises:
+        workflow.WorkflowError: If a step failed
+
+    Returns:
+        dict: The workflow report (see workflow.run_workflow) with the downloaded "outputs" per workflow output
+    """
+    from grpc_backend.client import download_artifact, orchestrate, upload_artifact
+
+    spec = cwl_to_workflow(workflow_path, job_path, endpoints, results_root, shared_volume)
+
+    staged = set()
+    lock = threading.Lock()
+
+    def execute(step):
+        for item in step["stage"]:
+            key = (step["tool_hostname"], step["tool_port"], item["uri"])
+            with lock:
+                if key in staged:
+                    continue
+                staged.add(key)
+            upload_artifact(step, item["path"], item["uri"])
+        response = orchestrate(step)
+        return response if shared_volume else _remote_outputs(step, response)
+
+    report = run_workflow(spec, max_workers=max_workers, execute=execute, ledger=ledger, pool=pool)
+
+    report["outputs"] = dict()
+    for name, step_name in spec["outputs"].items():
+        report["outputs"][name] = []
+        if outdir is None:
+            continue
+        os.makedirs(outdir, exist_ok=True)
+        step = spec["steps"][step_name]
+        for artifact in report["steps"][step_name]["response"]["output"]:
+            uri = artifact["location"]["uri"]
+            path = os.path.join(outdir, os.path.basename(urlparse(uri).path) or artifact["name"])
+            if "inline_payload" in artifact:
+                with open(path, "wb") as f:
+                    f.write(artifact["inline_payload"])
+            elif shared_volume:
+                continue
+            else:
+                download_artifact(_uri_endpoint(uri, step), urlparse(uri).path, path)
+            report["outputs"][name].append(path)
+
+    return report
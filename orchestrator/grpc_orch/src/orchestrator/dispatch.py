@@ -0,0 +1,258 @@
+"""A job queue that spreads execution messages over many replicas of the same tool
+
+Jobs are pipeline specs without tool_hostname and tool_port. Each job is sent to the replica with the least
+outstanding requests. Replicas that fail repeatedly with a transient status (see sweep.RETRYABLE_CODES) are
+ejected for a while and the job is retried on another replica. A dispatch spec for main.py --dispatch:
+
+    {
+        "replicas": [
+            {"tool_hostname": "scikit-metrics-tool-1", "tool_port": 8061},
+            {"tool_hostname": "scikit-metrics-tool-2", "tool_port": 8061}
+        ],
+        "concurrency": 4,
+        "retries": 2,
+        "jobs": [
+            {
+                "func": "accuracy_wrapper",
+                "input": [...],
+                "output": [{"name": "result", "location": {"uri": "/results/a.json"}}],
+                "meta": {"execution_name": "accuracy-a"}
+            }
+        ]
+    }
+
+Jobs are executed at least once: a job whose call timed out is retried although the tool may have executed it.
+Jobs are keyed by meta.execution_name, submitting a name again returns the job already queued or finished.
+"""
+
+import concurrent.futures as futures
+import copy
+import functools
+import queue
+import threading
+import time
+import uuid
+
+from sweep import RETRYABLE_CODES
+
+import grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_CONCURRENCY = 4  # Outstanding requests per replica
+DEFAULT_RETRIES = 2
+EJECT_AFTER = 3  # Consecutive transient failures until a replica is ejected
+EJECT_TIME = 30.0  # Seconds an ejected replica does not receive jobs
+
+
+class Replica:
+    """A tool replica with its load and failure state"""
+
+    def __init__(self, endpoint):
+        """
+        Args:
+            endpoint (dict): tool_hostname and tool_port of the replica
+        """
+        self.endpoint = dict(tool_hostname=endpoint["tool_hostname"], tool_port=endpoint["tool_port"])
+        self.name = f"{self.endpoint['tool_hostname']}:{self.endpoint['tool_port']}"
+        self.outstanding = 0
+        self.completed = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def available(self, now):
+        return self.ejected_until <= now
+
+
+class Dispatcher:
+    """Executes jobs on a set of tool replicas with least-outstanding-requests scheduling"""
+
+    def __init__(
+        self,
+        replicas,
+        concurrency=DEFAULT_CONCURRENCY,
+        retries=DEFAULT_RETRIES,
+        eject_after=EJECT_AFTER,
+        eject_time=EJECT_TIME,
+        execute=None,
+        timeout=None,
+    ):
+        """
+        Args:
+            replicas (list): Endpoints (tool_hostname, tool_port) of the replicas
+            concurrency (int, optional): Maximum outstanding requests per replica. Defaults to 4.
+            retries (int, optional): Retries of a job after transient failures. Defaults to 2.
+            eject_after (int, optional): Consecutive transient failures until a replica is ejected. Defaults to 3.
+            eject_time (float, optional): Seconds a replica stays ejected. Defaults to 30.
+            execute (callable, optional): Function executing a pipeline spec and returning the response execution
+                message. Defaults to grpc_backend.client.orchestrate.
+            timeout (float, optional): Deadline of a single call in seconds, passed to the default execute. Defaults
+                to grpc_backend.channels.DEFAULT_TIMEOUT.
+        """
+        if not replicas:
+            raise ValueError("At least one replica is required")
+        if execute is None:
+            from grpc_backend.client import orchestrate as execute
+
+            if timeout is not None:
+                execute = functools.partial(execute, timeout=timeout)
+
+        self.replicas = [Replica(endpoint) for endpoint in replicas]
+        self.concurrency = concurrency
+        self.retries = retries
+        self.eject_after = eject_after
+        self.eject_time = eject_time
+        self.execute = execute
+
+        self._jobs = dict()
+        self._queue = queue.Queue()
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(concurrency * len(self.replicas))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, pipeline_spec):
+        """Queues a job
+
+        Args:
+            pipeline_spec (dict): Pipeline spec without tool_hostname and tool_port, keyed by meta.execution_name
+
+        Returns:
+            concurrent.futures.Future: Resolves to the response execution message
+        """
+        pipeline_spec = copy.deepcopy(pipeline_spec)
+        meta = pipeline_spec.setdefault("meta", dict())
+        name = meta.setdefault("execution_name", uuid.uuid4().hex)
+        with self._condition:
+            future = self._jobs.get(name)
+            if future is not None and not (future.done() and future.exception() is not None):
+                logger.debug(f"Job {name} is already queued or finished")
+                return future
+            future = futures.Future()
+            self._jobs[name] = future
+        self._queue.put(dict(name=name, spec=pipeline_spec, future=future, attempt=1, tried=set()))
+        return future
+
+    def map(self, pipeline_specs):
+        """Submits many jobs and waits for all of them
+
+        Args:
+            pipeline_specs (list): Pipeline specs, see submit
+
+        Returns:
+            list: The futures of the jobs in order, all done
+        """
+        pending = [self.submit(spec) for spec in pipeline_specs]
+        futures.wait(pending)
+        return pending
+
+    def _acquire(self, job):
+        """Waits for the replica with the least outstanding requests that is not ejected and has a free slot
+        Replicas the job already failed on are only used if no other replica is available.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                candidates = [r for r in self.replicas if r.available(now) and r.outstanding < self.concurrency]
+                if candidates:
+                    replica = min(candidates, key=lambda r: (r.name in job["tried"], r.outstanding, r.completed))
+                    replica.outstanding += 1
+                    return replica
+                ejected = [r.ejected_until - now for r in self.replicas if not r.available(now)]
+                self._condition.wait(timeout=min(ejected) if ejected else None)
+
+    def _release(self, replica, transient_failure):
+        with self._condition:
+            replica.outstanding -= 1
+            if not transient_failure:
+                replica.failures = 0
+                replica.completed += 1
+            else:
+                replica.failures += 1
+                if replica.failures >= self.eject_after:
+                    logger.warning(f"Ejecting replica {replica.name} for {self.eject_time}s")
+                    replica.ejected_until = time.monotonic() + self.eject_time
+                    replica.failures = 0
+            self._condition.notify_all()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            replica = self._acquire(job)
+            try:
+                response = self.execute(dict(job["spec"], **replica.endpoint))
+            except Exception as err:
+                transient = isinstance(err, grpc.RpcError) and err.code() in RETRYABLE_CODES
+                self._release(replica, transient)
+                if transient and job["attempt"] <= self.retries:
+                    logger.warning(f"Job {job['name']} failed on {replica.name} (attempt {job['attempt']}): {err}")
+                    job["attempt"] += 1
+                    job["tried"].add(replica.name)
+                    self._queue.put(job)
+                else:
+                    logger.error(f"Job {job['name']} failed on {replica.name}: {err}")
+                    job["future"].set_exception(err)
+                continue
+            self._release(replica, False)
+            job["future"].set_result(response)
+
+    def close(self):
+        """Stops the workers after the queued jobs are finished"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_dispatch(dispatch_spec, execute=None):
+    """Runs all jobs of a dispatch spec on its replicas
+
+    Args:
+        dispatch_spec (dict): The dispatch spec, see module docstring
+        execute (callable, optional): Function executing a pipeline spec, see Dispatcher. Defaults to None.
+
+    Returns:
+        dict: The report with the total duration, a summary, the jobs per replica and one entry per job
+    """
+    jobs = copy.deepcopy(dispatch_spec["jobs"])
+    for i, job in enumerate(jobs):
+        job.setdefault("meta", dict()).setdefault("execution_name", f"job-{i}")
+
+    start = time.perf_counter()
+    with Dispatcher(
+        dispatch_spec["replicas"],
+        concurrency=dispatch_spec.get("concurrency", DEFAULT_CONCURRENCY),
+        retries=dispatch_spec.get("retries", DEFAULT_RETRIES),
+        execute=execute,
+    ) as dispatcher:
+        done = dispatcher.map(jobs)
+        replicas = {replica.name: replica.completed for replica in dispatcher.replicas}
+
+    entries = []
+    for job, future in zip(jobs, done):
+        entry = dict(name=job["meta"]["execution_name"], func=job["func"])
+        if future.exception() is None:
+            entry.update(status="succeeded", output=future.result()["output"])
+        else:
+            err = future.exception()
+            entry.update(status="failed", error=str(err.details() if isinstance(err, grpc.RpcError) else err))
+        entries.append(entry)
+
+    summary = dict(total=len(entries))
+    for status in ["succeeded", "failed"]:
+        summary[status] = sum(entry["status"] == status for entry in entries)
+    logger.info(f"Dispatch finished: {summary}, jobs per replica: {replicas}")
+    return dict(duration=time.perf_counter() - start, summary=summary, replicas=replicas, jobs=entries)
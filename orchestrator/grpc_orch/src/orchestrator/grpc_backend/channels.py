@@ -0,0 +1,136 @@
+"""Pool of persistent gRPC channels to the tool containers
+
+Creating a channel costs a TCP connection and an HTTP/2 handshake. The pool keeps one channel per tool address
+(tool_hostname:tool_port) alive across calls, with keepalive pings to detect dead connections and a service-config
+retry policy for calls that failed before reaching the tool.
+
+Calls do not wait for the channel to become ready: a call to a tool that is down fails with UNAVAILABLE after the
+retries (a few seconds) instead of waiting for its deadline. Callers that expect a tool to come up, e.g. right after
+starting its container, can pass wait_for_ready=True to the stub call.
+"""
+
+import json
+import os
+import threading
+
+import grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_TIMEOUT = float(os.environ.get("ORCH_RPC_TIMEOUT", 600))  # Deadline of a single call in seconds
+
+KEEPALIVE_TIME_MS = 30000
+KEEPALIVE_TIMEOUT_MS = 10000
+
+# Only UNAVAILABLE is retried, i.e. the call did not reach the tool, so the tool function is never executed twice
+SERVICE_CONFIG = {
+    "methodConfig": [
+        {
+            "name": [{"service": "Module"}, {"service": "Artifacts"}],
+            "retryPolicy": {
+                "maxAttempts": 5,
+                "initialBackoff": "0.1s",
+                "maxBackoff": "5s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": ["UNAVAILABLE"],
+            },
+        }
+    ]
+}
+
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.enable_retries", 1),
+    ("grpc.service_config", json.dumps(SERVICE_CONFIG)),
+]
+
+
+def target(pipeline_spec):
+    """Returns the gRPC target address of the tool addressed by a pipeline spec"""
+    return f"{pipeline_spec['tool_hostname']}:{pipeline_spec['tool_port']}"
+
+
+class ChannelPool:
+    """Thread-safe pool of insecure channels keyed by the target address"""
+
+    def __init__(self, options=CHANNEL_OPTIONS):
+        """
+        Args:
+            options (list, optional): Channel arguments. Defaults to CHANNEL_OPTIONS.
+        """
+        self.options = list(options)
+        self._channels = dict()
+        self._lock = threading.Lock()
+
+    def get(self, address):
+        """Returns the channel to an address, creating it on first use
+
+        Args:
+            address (str): Target address hostname:port
+
+        Returns:
+            grpc.Channel: The pooled channel
+        """
+        with self._lock:
+            channel = self._channels.get(address)
+            if channel is None:
+                logger.debug(f"Opening channel to {address}")
+                channel = grpc.insecure_channel(address, options=self.options)
+                self._channels[address] = channel
+            return channel
+
+    def discard(self, address):
+        """Closes and removes the channel to an address, the next get opens a new one
+
+        Args:
+            address (str): Target address hostname:port
+        """
+        with self._lock:
+            channel = self._channels.pop(address, None)
+        if channel is not None:
+            channel.close()
+
+    def close(self):
+        """Closes all channels of the pool"""
+        with self._lock:
+            channels, self._channels = list(self._channels.values()), dict()
+        for channel in channels:
+            channel.close()
+
+    def __len__(self):
+        return len(self._channels)
+
+
+_pool = ChannelPool()
+
+
+def get_channel(pipeline_spec):
+    """Returns the pooled channel to the tool addressed by a pipeline spec
+
+    Args:
+        pipeline_spec (dict): Needs to contain the fields tool_hostname and tool_port
+
+    Returns:
+        grpc.Channel: The pooled channel
+    """
+    return _pool.get(target(pipeline_spec))
+
+
+def discard_channel(pipeline_spec):
+    """Closes the pooled channel to a tool, e.g. after its container was stopped
+
+    Args:
+        pipeline_spec (dict): Needs to contain the fields tool_hostname and tool_port
+    """
+    _pool.discard(target(pipeline_spec))
+
+
+def close_channels():
+    """Closes all pooled channels, e.g. when the orchestrator shuts down"""
+    _pool.close()
@@ -1,9 +1,14 @@
 """gRPC client for tool orchestration"""
 
 import grpc
-import grpc_backend.module_pb2_grpc as module_pb2_grpc
+import mki_barebone_proto.module_pb2 as module_pb2
+import mki_barebone_proto.module_pb2_grpc as module_pb2_grpc
+import mki_barebone_proto.health_pb2 as health_pb2
+import mki_barebone_proto.health_pb2_grpc as health_pb2_grpc
 
-from grpc_backend.utils import execution_message_from_dict
+from grpc_backend.channels import DEFAULT_TIMEOUT, get_channel
+from grpc_backend.tracing import client_span
+from grpc_backend.utils import execution_message_from_dict, execution_message_to_dict
 
 import logging
 
@@ -11,23 +16,208 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
-def orchestrate(pipeline_spec):
+def orchestrate(pipeline_spec, timeout=DEFAULT_TIMEOUT):
     """Executes a simple orchestration given the pipeline_spec
     Currently, only a simple pipeline with a single tool is supported.
+    The channel to the tool is taken from the channel pool, so repeated calls reuse the connection.
+    The call is traced as client span, the tool continues the trace (see tracing.py).
 
     Args:
         pipeline_spec (dict): Specification of the pipeline to execute.
-        Needs to contain the fields tool_hostname, tool_port, input and output
+        Needs to contain the fields tool_hostname, tool_port, input and output, optionally meta
+        timeout (float, optional): Deadline of the call in seconds. Defaults to DEFAULT_TIMEOUT.
+
+    Returns:
+        dict: The execution message returned by the tool
+    """
+    stub = module_pb2_grpc.ModuleStub(get_channel(pipeline_spec))
+
+    exec_msg_dict = dict(
+        func=pipeline_spec["func"],
+        input=pipeline_spec["input"],
+        output=pipeline_spec["output"],
+        meta=pipeline_spec.get("meta"),
+    )
+    exec_msg = execution_message_from_dict(exec_msg_dict)
+
+    logger.info(f"Calling the tool with message {exec_msg_dict}")
+    with client_span(f"Module/exec {exec_msg.func}", tool=pipeline_spec["tool_hostname"]) as metadata:
+        response = stub.exec(exec_msg, timeout=timeout, metadata=metadata)
+    logger.info(response)
+
+    return execution_message_to_dict(response)
+
+
+def check_health(pipeline_spec, service="", timeout=1.0):
+    """Queries the standard gRPC health service (grpc.health.v1) of a tool
+
+    Args:
+        pipeline_spec (dict): Specification of the tool to check. Needs to contain the fields tool_hostname and
+        tool_port
+        service (str, optional): Name of the service to check, "" for the whole server. Defaults to "".
+        timeout (float, optional): Deadline of the check in seconds. Defaults to 1.0.
+
+    Returns:
+        str: The serving status, e.g. SERVING or NOT_SERVING. UNAVAILABLE if the tool cannot be reached and
+        UNIMPLEMENTED if the tool does not provide the health service
     """
-    with grpc.insecure_channel(f"{pipeline_spec['tool_hostname']}:{pipeline_spec['tool_port']}") as channel:
+    stub = health_pb2_grpc.HealthStub(get_channel(pipeline_spec))
+    try:
+        response = stub.Check(health_pb2.HealthCheckRequest(service=service), timeout=timeout)
+    except grpc.RpcError as err:
+        if err.code() in [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED]:
+            return "UNAVAILABLE"
+        if err.code() == grpc.StatusCode.UNIMPLEMENTED:
+            return "UNIMPLEMENTED"
+        raise
+    return health_pb2.HealthCheckResponse.ServingStatus.Name(response.status)
+
+
+def orchestrate_batch(pipeline_spec, exec_msg_dicts, timeout=DEFAULT_TIMEOUT):
+    """Sends many execution messages to a single tool within one execBatch call
+
+    Args:
+        pipeline_spec (dict): Specification of the tool to call. Needs to contain the fields tool_hostname and
+        tool_port
+        exec_msg_dicts (list): Execution messages as python dicts
+        timeout (float, optional): Deadline of the whole batch in seconds. Defaults to DEFAULT_TIMEOUT.
+
+    Returns:
+        list: The execution messages returned by the tool, in request order. Failed messages are returned
+        unchanged with the error in meta["error"]
+    """
+    stub = module_pb2_grpc.ModuleStub(get_channel(pipeline_spec))
+
+    batch = module_pb2.ExecutionBatch(messages=[execution_message_from_dict(d) for d in exec_msg_dicts])
+
+    logger.info(f"Calling the tool with a batch of {len(batch.messages)} messages")
+    with client_span("Module/execBatch", tool=pipeline_spec["tool_hostname"], messages=len(batch.messages)) as metadata:
+        response = stub.execBatch(batch, timeout=timeout, metadata=metadata)
+
+    return [execution_message_to_dict(msg) for msg in response.messages]
+
+
+def orchestrate_stream(pipeline_spec, exec_msg_dicts, timeout=None):
+    """Streams execution messages to a single tool via execStream
+    Messages are sent while earlier ones are still being computed, responses are yielded as they arrive.
+
+    Args:
+        pipeline_spec (dict): Specification of the tool to call. Needs to contain the fields tool_hostname and
+        tool_port
+        exec_msg_dicts (iterable): Execution messages as python dicts
+        timeout (float, optional): Deadline of the whole stream in seconds. Defaults to None (no deadline).
+
+    Yields:
+        dict: The execution messages returned by the tool, in request order. Failed messages are returned
+        unchanged with the error in meta["error"]
+    """
+    stub = module_pb2_grpc.ModuleStub(get_channel(pipeline_spec))
+
+    requests = (execution_message_from_dict(d) for d in exec_msg_dicts)
+    with client_span("Module/execStream", tool=pipeline_spec["tool_hostname"]) as metadata:
+        for response in stub.execStream(requests, timeout=timeout, metadata=metadata):
+            yield execution_message_to_dict(response)
+
 
-        stub = module_pb2_grpc.ModuleStub(channel)
+CHUNK_SIZE = 1 << 20  # 1 MiB, well below the default gRPC message size limit of 4 MiB
 
-        exec_msg_dict = dict(
-            func=pipeline_spec["func"], input=pipeline_spec["input"], output=pipeline_spec["output"]
+COMPRESSION = {
+    None: grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def _read_chunks(path, uri, chunk_size):
+    """Lazily reads a local file as a stream of ArtifactChunks, so only a few chunks are in flight at a time
+    At least one (possibly empty) chunk is sent, since the first chunk carries the destination uri.
+    """
+    offset = 0
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data and offset > 0:
+                return
+            yield module_pb2.ArtifactChunk(uri=uri, data=data, offset=offset)
+            offset += len(data)
+            if len(data) < chunk_size:
+                return
+
+
+def upload_artifact(pipeline_spec, path, uri, compression=None, chunk_size=CHUNK_SIZE, timeout=None):
+    """Uploads a local file to a tool that does not share a volume with the orchestrator
+
+    Args:
+        pipeline_spec (dict): Specification of the tool to upload to. Needs to contain the fields tool_hostname and
+        tool_port
+        path (str): Local path of the file to upload
+        uri (str): Destination uri inside the tool container
+        compression (str, optional): gzip, deflate or None. Defaults to None.
+        chunk_size (int, optional): Size of the streamed chunks in bytes. Defaults to 1 MiB.
+        timeout (float, optional): Deadline of the upload in seconds. Defaults to None (no deadline).
+
+    Returns:
+        dict: The artifact info with uri, size and payload_id
+    """
+    stub = module_pb2_grpc.ArtifactsStub(get_channel(pipeline_spec))
+
+    with client_span("Artifacts/upload", tool=pipeline_spec["tool_hostname"], uri=uri) as metadata:
+        info = stub.upload(
+            _read_chunks(path, uri, chunk_size),
+            compression=COMPRESSION[compression],
+            timeout=timeout,
+            metadata=metadata,
         )
-        exec_msg = execution_message_from_dict(exec_msg_dict)
+    logger.info(f"Uploaded {info.size} bytes to {uri}")
+
+    return dict(uri=info.uri, size=info.size, payload_id=info.payload_id)
+
+
+def download_artifact(pipeline_spec, uri, path, compression=None, chunk_size=CHUNK_SIZE, timeout=None):
+    """Downloads an artifact from a tool that does not share a volume with the orchestrator
+
+    Args:
+        pipeline_spec (dict): Specification of the tool to download from. Needs to contain the fields tool_hostname
+        and tool_port
+        uri (str): Uri of the artifact inside the tool container
+        path (str): Local path to write the artifact to
+        compression (str, optional): gzip, deflate or None. Defaults to None.
+        chunk_size (int, optional): Size of the streamed chunks in bytes. Defaults to 1 MiB.
+        timeout (float, optional): Deadline of the download in seconds. Defaults to None (no deadline).
+
+    Returns:
+        int: Number of bytes written
+    """
+    stub = module_pb2_grpc.ArtifactsStub(get_channel(pipeline_spec))
+
+    request = module_pb2.ArtifactRequest(uri=uri, chunk_size=chunk_size, compression=compression or "")
+    size = 0
+    with client_span("Artifacts/download", tool=pipeline_spec["tool_hostname"], uri=uri) as metadata:
+        with open(path, "wb") as f:
+            for chunk in stub.download(request, timeout=timeout, metadata=metadata):
+                f.write(chunk.data)
+                size += len(chunk.data)
+
+    logger.info(f"Downloaded {size} bytes from {uri}")
+    return size
+
+
+def stat_artifact(pipeline_spec, uri, timeout=10.0):
+    """Returns the size of an artifact of a tool that does not share a volume with the orchestrator
+
+    Args:
+        pipeline_spec (dict): Specification of the tool. Needs to contain the fields tool_hostname and tool_port
+        uri (str): Uri of the artifact inside the tool container
+        timeout (float, optional): Deadline of the call in seconds. Defaults to 10.0.
+
+    Raises:
+        grpc.RpcError: With status NOT_FOUND if the artifact does not exist
+
+    Returns:
+        dict: The artifact info with uri and size
+    """
+    stub = module_pb2_grpc.ArtifactsStub(get_channel(pipeline_spec))
 
-        logger.info(f"Calling the tool with message {exec_msg_dict}")
-        response = stub.exec(exec_msg)
-        logger.info(response)
+    with client_span("Artifacts/stat", tool=pipeline_spec["tool_hostname"], uri=uri) as metadata:
+        info = stub.stat(module_pb2.ArtifactRequest(uri=uri), timeout=timeout, metadata=metadata)
+    return dict(uri=info.uri, size=info.size)
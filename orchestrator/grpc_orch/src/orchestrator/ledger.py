@@ -0,0 +1,260 @@
+"""A persistent ledger of executed workflow steps for incremental re-execution
+
+Every successful step is recorded in a SQLite database under a key derived from
+
+    - the digest of the tool image: "image_digest" of the step, otherwise the id of its "image" in the local docker
+      daemon (docker image inspect), so a tool rebuilt under the same tag is executed again
+    - the function name
+    - the identity of each input: its payload_id, the digest of an inline payload or of a file readable by the
+      orchestrator (including files staged to the tool), otherwise its uri; plus its parameters
+    - the names and uris of the outputs
+
+When a workflow is run again with the same ledger, steps with an unchanged key are not executed, their recorded
+response is used instead. As outputs of the tools carry content digests as payload_id (see mki_barebone_io), a
+step whose upstream results did not change is skipped as well, like make.
+
+Steps whose image digest cannot be resolved are always executed and not recorded. Output uris are usually shared by
+all runs, so the size of each output is recorded with the step, and a recorded step is only reused while all of its
+outputs still exist with the recorded size (and, for files visible to the orchestrator, modification time).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from urllib.parse import urlparse
+
+import grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    key TEXT PRIMARY KEY,
+    step TEXT NOT NULL,
+    image TEXT NOT NULL,
+    func TEXT NOT NULL,
+    response TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _input_identity(artifact):
+    """Returns the identity of an input artifact, see module docstring"""
+    location = artifact.get("location", {})
+    if artifact.get("payload_id"):
+        identity = artifact["payload_id"]
+    elif "inline_payload" in artifact:
+        identity = f"sha256:{hashlib.sha256(artifact['inline_payload']).hexdigest()}"
+    elif os.path.isfile(location.get("uri", "")):
+        identity = _file_digest(location["uri"])
+    else:
+        identity = location.get("uri", "")
+    return [artifact.get("name"), identity, location.get("parameters", "")]
+
+
+def image_digest(image, docker="docker"):
+    """Returns the id of an image in the local docker daemon
+
+    Args:
+        image (str): Image name and tag, or a reference by digest (name@sha256:...)
+        docker (str, optional): The docker executable. Defaults to "docker".
+
+    Returns:
+        str: The image id (sha256:...) or the digest of the reference, None if it cannot be resolved
+    """
+    if "@sha256:" in image:
+        return image.rsplit("@", 1)[1]
+    try:
+        result = subprocess.run(
+            [docker, "image", "inspect", "--format", "{{.Id}}", image], check=True, capture_output=True, text=True
+        )
+    except (OSError, subprocess.CalledProcessError) as err:
+        logger.warning(f"Could not resolve the digest of image {image}: {err}")
+        return None
+    return result.stdout.strip() or None
+
+
+def step_image(step):
+    """Returns the digest of the tool image of a step, its "image_digest" or the resolved digest of its "image"
+
+    Args:
+        step (dict): A step of a workflow spec
+
+    Returns:
+        str: The image digest, None if the step names no image or its digest cannot be resolved
+    """
+    if step.get("image_digest"):
+        return step["image_digest"]
+    if step.get("image"):
+        return image_digest(step["image"])
+    return None
+
+
+def step_key(step):
+    """Computes the ledger key of a resolved step
+
+    Args:
+        step (dict): A step of a workflow spec whose sources are resolved (see workflow.run_workflow)
+
+    Returns:
+        str: Hex digest identifying the computation of the step, None if the image digest cannot be resolved
+    """
+    image = step_image(step)
+    if image is None:
+        return None
+    content = dict(
+        image=image,
+        func=step["func"],
+        input=[_input_identity(artifact) for artifact in step.get("input", [])],
+        stage=[[item["uri"], _file_digest(item["path"])] for item in step.get("stage", [])],
+        output=[[output["name"], output.get("location", {}).get("uri", "")] for output in step.get("output", [])],
+    )
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def stat_output(step, output):
+    """Returns the current state of an output of an executed step, see module docstring
+
+    Files visible to the orchestrator (shared volume) are checked locally, other uris with the Artifacts service
+    of the tool, the host of grpc:// uris or else the step endpoint (see grpc_backend/client.stat_artifact).
+
+    Args:
+        step (dict): The executed step, with tool_hostname and tool_port
+        output (dict): An output artifact of the response of the step
+
+    Returns:
+        dict: Size and, for local files, modification time of the output, {} for inline outputs, None if the
+        output does not exist or cannot be checked
+    """
+    uri = output.get("location", {}).get("uri", "")
+    if "inline_payload" in output or not uri:
+        return dict()
+    if os.path.isfile(uri):
+        stat = os.stat(uri)
+        return dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    from grpc_backend.client import stat_artifact
+
+    parsed = urlparse(uri)
+    if parsed.scheme == "grpc":
+        step, uri = dict(tool_hostname=parsed.hostname, tool_port=parsed.port), parsed.path
+    try:
+        return dict(size=stat_artifact(step, uri)["size"])
+    except (grpc.RpcError, KeyError) as err:
+        logger.debug(f"Could not stat output {uri}: {err}")
+        return None
+
+
+def _encode(obj):
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    if set(obj) == {"__bytes__"}:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class RunLedger:
+    """SQLite ledger of the responses of executed steps, safe to use from the threads of a workflow"""
+
+    def __init__(self, path, stat=stat_output):
+        """
+        Args:
+            path (str): Path of the SQLite database, created if it does not exist
+            stat (callable, optional): Function of step and output returning the state of the output, None if it
+                does not exist. Defaults to stat_output.
+        """
+        self.path = path
+        self.stat = stat
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(SCHEMA)
+
+    def _output_states(self, step, response):
+        """Returns the states of the outputs of a response, None if any of them cannot be checked"""
+        states = [self.stat(step, output) for output in response.get("output", [])]
+        return None if any(state is None for state in states) else states
+
+    def get(self, key, step):
+        """Returns the recorded response of a step key if its outputs are unchanged
+
+        Args:
+            key (str): Key computed by step_key
+            step (dict): The resolved step, used to check its outputs
+
+        Returns:
+            dict: The recorded response execution message, None if the key is not recorded or an output was
+            deleted or changed since
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT response, outputs FROM steps WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        response = json.loads(row[0], object_hook=_decode)
+        if self._output_states(step, response) != json.loads(row[1]):
+            logger.info(f"Outputs of recorded step {key} changed, it is executed again")
+            return None
+        return response
+
+    def put(self, key, name, step, response):
+        """Records the response of an executed step
+
+        Args:
+            key (str): Key computed by step_key
+            name (str): Name of the step
+            step (dict): The executed step
+            response (dict): The response execution message
+        """
+        states = self._output_states(step, response)
+        if states is None:
+            logger.warning(f"Outputs of step {name} cannot be checked, it is not recorded")
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO steps (key, step, image, func, response, outputs, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    name,
+                    step.get("image") or step.get("image_digest"),
+                    step["func"],
+                    json.dumps(response, default=_encode),
+                    json.dumps(states),
+                    time.time(),
+                ),
+            )
+
+    def close(self):
+        """Closes the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
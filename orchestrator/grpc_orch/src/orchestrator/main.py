@@ -3,7 +3,9 @@
 import logging
 from threading import Event
 import argparse
+import atexit
 import os
+import sys
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -35,6 +37,160 @@ def orchestrate_grpc(pipeline_spec):
     orchestrate(pipeline_spec)
 
 
+def _open_ledger(ledger_path: str):
+    """Opens the run ledger, a no-op context if no path is given"""
+    import contextlib
+    from ledger import RunLedger
+
+    return RunLedger(ledger_path) if ledger_path else contextlib.nullcontext()
+
+
+def _open_pool(pool: bool, network: str = None):
+    """Opens a manager of warm docker containers, a no-op context if pooling is off"""
+    import contextlib
+    from pool import DockerBackend, PoolManager
+
+    return PoolManager(DockerBackend(network=network)) if pool else contextlib.nullcontext()
+
+
+def run_grpc_workflow(
+    workflow_path: str, report_path: str = None, ledger_path: str = None, pool: bool = False, network: str = None
+) -> int:
+    """Executes a multi-step workflow with gRPC backends and reports the per-step timings
+
+    Args:
+        workflow_path (str): Path to the workflow json (see workflow.py)
+        report_path (str, optional): Path to write the json report to. Defaults to None.
+        ledger_path (str, optional): Path to the SQLite run ledger, unchanged steps are skipped. Defaults to None.
+        pool (bool, optional): Run steps with an image on warm containers started with docker. Defaults to False.
+        network (str, optional): Docker network of the pooled containers. Defaults to None.
+
+    Returns:
+        int: Exit code, 0 if all steps succeeded
+    """
+    from workflow import WorkflowError, format_report, load_workflow, run_workflow, write_report
+
+    try:
+        with _open_ledger(ledger_path) as ledger, _open_pool(pool, network) as manager:
+            report = run_workflow(load_workflow(workflow_path), ledger=ledger, pool=manager)
+        exit_code = 0
+    except WorkflowError as err:
+        logger.error(err)
+        report = err.report
+        exit_code = 1
+
+    logger.info(f"Workflow finished\n{format_report(report)}")
+    if report_path:
+        write_report(report, report_path)
+    return exit_code
+
+
+def run_cwl_workflow(
+    workflow_path: str,
+    job_path: str,
+    outdir: str = None,
+    endpoints: str = None,
+    ledger_path: str = None,
+    pool: bool = False,
+    network: str = None,
+) -> int:
+    """Executes a CWL workflow with warm gRPC tool containers instead of a container per step
+
+    Args:
+        workflow_path (str): Path to workflow.cwl
+        job_path (str): Path to job.json
+        outdir (str, optional): Directory to download the workflow outputs to. Defaults to None.
+        endpoints (str, optional): Comma separated image=hostname:port overrides. Defaults to None.
+        ledger_path (str, optional): Path to the SQLite run ledger, unchanged steps are skipped. Defaults to None.
+        pool (bool, optional): Run the steps on warm containers started with docker. Defaults to False.
+        network (str, optional): Docker network of the pooled containers. Defaults to None.
+
+    Returns:
+        int: Exit code, 0 if all steps succeeded
+    """
+    from cwl import run_cwl
+    from workflow import WorkflowError, format_report
+
+    endpoints = dict(item.split("=", 1) for item in endpoints.split(",") if item) if endpoints else None
+    try:
+        with _open_ledger(ledger_path) as ledger, _open_pool(pool, network) as manager:
+            report = run_cwl(
+                workflow_path, job_path, outdir=outdir, endpoints=endpoints, ledger=ledger, pool=manager
+            )
+        exit_code = 0
+    except WorkflowError as err:
+        logger.error(err)
+        report = err.report
+        exit_code = 1
+
+    logger.info(f"Workflow finished\n{format_report(report)}")
+    return exit_code
+
+
+def run_grpc_sweep(sweep_path: str, report_path: str = None) -> int:
+    """Executes a sweep of tool functions over input sets and writes a consolidated report
+
+    Args:
+        sweep_path (str): Path to the sweep json (see sweep.py)
+        report_path (str, optional): Path to write the json report to. Defaults to None.
+
+    Returns:
+        int: Exit code, 0 if all jobs succeeded
+    """
+    from sweep import run_sweep
+    from workflow import load_workflow, write_report
+
+    report = run_sweep(load_workflow(sweep_path))
+    if report_path:
+        write_report(report, report_path)
+    return 0 if report["summary"]["failed"] == 0 else 1
+
+
+def run_grpc_dispatch(dispatch_path: str, report_path: str = None) -> int:
+    """Executes jobs on many replicas of a tool and writes a consolidated report
+
+    Args:
+        dispatch_path (str): Path to the dispatch json (see dispatch.py)
+        report_path (str, optional): Path to write the json report to. Defaults to None.
+
+    Returns:
+        int: Exit code, 0 if all jobs succeeded
+    """
+    from dispatch import run_dispatch
+    from workflow import load_workflow, write_report
+
+    report = run_dispatch(load_workflow(dispatch_path))
+    if report_path:
+        write_report(report, report_path)
+    return 0 if report["summary"]["failed"] == 0 else 1
+
+
+def run_grpc_benchmark(benchmark_path: str, report_path: str = None, backends: str = None, target: str = None) -> int:
+    """Benchmarks the backends of a tool and writes the json report
+
+    Args:
+        benchmark_path (str): Path to the benchmark json (see benchmark.py)
+        report_path (str, optional): Path to write the json report to. Defaults to None.
+        backends (str, optional): Comma separated backends, args and/or grpc. Defaults to both.
+        target (str, optional): process (generated contexts) or docker (images). Defaults to process.
+
+    Returns:
+        int: Exit code, 0 if no call failed
+    """
+    from benchmark import BACKENDS, run_benchmark
+    from workflow import load_workflow, write_report
+
+    report = run_benchmark(
+        load_workflow(benchmark_path),
+        base_dir=os.path.dirname(os.path.abspath(benchmark_path)),
+        backends=backends.split(",") if backends else BACKENDS,
+        target=target or "process",
+    )
+    if report_path:
+        write_report(report, report_path)
+    return 0 if all(result["errors"] == 0 for result in report["results"]) else 1
+
+
 def main(tool_hostname: str, tool_port: int, tool_func: str, input_uri_list: list, output_uri_list: list):
     """Execute the orchestration
 
@@ -81,6 +237,41 @@ if __name__ == "__main__":
         "--tool_port", type=int, default=os.environ.get("TOOL_PORT", DEFAULT_PIPELINE_SPEC["tool_port"])
     )
     parser.add_argument("--tool_func", type=str, default=os.environ.get("TOOL_FUNC", DEFAULT_PIPELINE_SPEC["func"]))
+    parser.add_argument(
+        "--workflow", type=str, default=os.environ.get("WORKFLOW"), help="Workflow json, runs all steps and exits"
+    )
+    parser.add_argument("--report", type=str, default=os.environ.get("REPORT"), help="Json report of the workflow")
+    parser.add_argument(
+        "--ledger", type=str, default=os.environ.get("LEDGER"), help="SQLite run ledger to skip unchanged steps"
+    )
+    parser.add_argument(
+        "--pool",
+        action="store_true",
+        default=os.environ.get("POOL") == "1",
+        help="Run workflow steps with an image on warm containers started with docker",
+    )
+    parser.add_argument("--network", type=str, default=os.environ.get("NETWORK"), help="Network of pooled containers")
+    parser.add_argument(
+        "--sweep", type=str, default=os.environ.get("SWEEP"), help="Sweep json, runs all jobs and exits"
+    )
+    parser.add_argument(
+        "--dispatch", type=str, default=os.environ.get("DISPATCH"), help="Dispatch json, runs all jobs and exits"
+    )
+    parser.add_argument(
+        "--benchmark", type=str, default=os.environ.get("BENCHMARK"), help="Benchmark json, runs it and exits"
+    )
+    parser.add_argument(
+        "--backends", type=str, default=os.environ.get("BACKENDS"), help="Benchmarked backends, e.g. args,grpc"
+    )
+    parser.add_argument(
+        "--target", type=str, default=os.environ.get("TARGET"), help="Benchmark target, process or docker"
+    )
+    parser.add_argument("--cwl", type=str, default=os.environ.get("CWL"), help="CWL workflow, runs all steps and exits")
+    parser.add_argument("--job", type=str, default=os.environ.get("JOB"), help="Job of the CWL workflow")
+    parser.add_argument("--outdir", type=str, default=os.environ.get("OUTDIR"), help="Outputs of the CWL workflow")
+    parser.add_argument(
+        "--endpoints", type=str, default=os.environ.get("ENDPOINTS"), help="Comma separated image=hostname:port"
+    )
     parser.add_argument(
         "--input_uri_list",
         type=str,
@@ -97,6 +288,25 @@ if __name__ == "__main__":
         ),
     )
     args = parser.parse_args()
+
+    from grpc_backend.tracing import setup_tracing, shutdown_tracing
+
+    if setup_tracing("mki-orchestrator"):
+        atexit.register(shutdown_tracing)
+
+    if args.workflow:
+        sys.exit(run_grpc_workflow(args.workflow, args.report, args.ledger, args.pool, args.network))
+    if args.sweep:
+        sys.exit(run_grpc_sweep(args.sweep, args.report))
+    if args.dispatch:
+        sys.exit(run_grpc_dispatch(args.dispatch, args.report))
+    if args.benchmark:
+        sys.exit(run_grpc_benchmark(args.benchmark, args.report, args.backends, args.target))
+    if args.cwl:
+        sys.exit(
+            run_cwl_workflow(args.cwl, args.job, args.outdir, args.endpoints, args.ledger, args.pool, args.network)
+        )
+
     input_uri_list = args.input_uri_list.split(",")
     output_uri_list = args.output_uri_list.split(",")
 
@@ -0,0 +1,427 @@
+"""Pools of warm gRPC tool containers
+
+Starting a tool container and waiting for it dominates short runs. A WarmPool keeps containers of one image running,
+checks their readiness with the gRPC health protocol (grpc.health.v1) and leases them to jobs one at a time. If all
+containers are leased, the pool grows up to max_size with the number of waiting jobs and shrinks back to min_size
+when the queue is empty. If containers fail to start max_start_failures times in a row, the pool fails: waiting
+and later jobs get the error instead of waiting for containers that never come up.
+
+Containers are started by a backend: DockerBackend runs images with the local docker daemon, ProcessBackend runs
+local processes (e.g. the generated src/enpkg/main.py of a grpc context) as stand-in for containers.
+
+    manager = PoolManager(DockerBackend(network="mki-net"), min_size=2)
+    with manager.lease("scikit-metrics-tool") as endpoint:
+        orchestrate(dict(endpoint, func="accuracy_wrapper", input=..., output=...))
+
+A manager keeps its containers warm until it is closed, so workflows run one after another with the same manager
+(workflow.run_workflow and cwl.run_cwl with pool=manager) reuse them.
+"""
+
+import contextlib
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+TOOL_PORT = 8061
+DEFAULT_STARTUP_TIMEOUT = 120  # Seconds until a started container has to report SERVING
+DEFAULT_MAX_START_FAILURES = 3  # Consecutive failed starts until the pool fails
+HEALTH_INTERVAL = 0.2
+
+
+def _free_port():
+    """Returns a currently unused local port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ProcessBackend:
+    """Runs tools as local processes, a stand-in for containers in tests and on machines without docker"""
+
+    def __init__(self, commands, cwd=None, env=None):
+        """
+        Args:
+            commands (dict): Command per image name as argument list, "{port}" is replaced by the port to serve,
+                e.g. {"mocktool": ["python", "src/enpkg/main.py", "--port", "{port}"]}
+            cwd (str or dict, optional): Working directory, or working directory per image. Defaults to None.
+            env (dict, optional): Additional environment variables. Defaults to None.
+        """
+        self.commands = commands
+        self.cwd = cwd
+        self.env = env
+
+    def start(self, image):
+        """Starts a tool process
+
+        Args:
+            image (str): Image name, selects the command
+
+        Returns:
+            dict: Handle with tool_hostname, tool_port and the process
+        """
+        port = _free_port()
+        args = [arg.replace("{port}", str(port)) for arg in self.commands[image]]
+        cwd = self.cwd.get(image) if isinstance(self.cwd, dict) else self.cwd
+        process = subprocess.Popen(args, cwd=cwd, env=dict(os.environ, **(self.env or {})))
+        return dict(tool_hostname="localhost", tool_port=port, process=process)
+
+    def stop(self, handle):
+        """Stops a tool process started by this backend"""
+        handle["process"].terminate()
+        try:
+            handle["process"].wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            handle["process"].kill()
+
+    def alive(self, handle):
+        """Checks whether the process is still running"""
+        return handle["process"].poll() is None
+
+
+class DockerBackend:
+    """Runs tool images with the docker CLI of the local daemon
+
+    If a network is given, containers join it and are addressed by their container name (orchestrator running in
+    a container of the same network). Otherwise the tool port is published on a random local port.
+    """
+
+    def __init__(self, network=None, run_args=None, docker="docker"):
+        """
+        Args:
+            network (str, optional): Docker network for the containers. Defaults to None.
+            run_args (list, optional): Additional arguments for docker run, e.g. volumes. Defaults to None.
+            docker (str, optional): The docker executable. Defaults to "docker".
+        """
+        self.network = network
+        self.run_args = run_args or []
+        self.docker = docker
+
+    def _docker(self, *args):
+        return subprocess.run([self.docker, *args], check=True, capture_output=True, text=True).stdout.strip()
+
+    def start(self, image):
+        """Starts a container of an image
+
+        Args:
+            image (str): Image name
+
+        Returns:
+            dict: Handle with tool_hostname, tool_port and the container name
+        """
+        name = f"{image.rsplit('/', 1)[-1].split(':', 1)[0]}-{uuid.uuid4().hex[:8]}"
+        if self.network:
+            self._docker("run", "-d", "--rm", "--name", name, "--network", self.network, *self.run_args, image)
+            return dict(tool_hostname=name, tool_port=TOOL_PORT, container=name)
+
+        self._docker("run", "-d", "--rm", "--name", name, "-p", f"127.0.0.1::{TOOL_PORT}", *self.run_args, image)
+        host_port = self._docker("port", name, str(TOOL_PORT)).splitlines()[0].rsplit(":", 1)[1]
+        return dict(tool_hostname="localhost", tool_port=int(host_port), container=name)
+
+    def stop(self, handle):
+        """Stops (and thereby removes) a container started by this backend"""
+        try:
+            self._docker("stop", "--time", "5", handle["container"])
+        except subprocess.CalledProcessError as err:
+            logger.warning(f"Stopping container {handle['container']} failed: {err.stderr}")
+
+    def alive(self, handle):
+        """Checks whether the container is still running"""
+        try:
+            return self._docker("inspect", "-f", "{{.State.Running}}", handle["container"]) == "true"
+        except subprocess.CalledProcessError:
+            return False
+
+
+def _endpoint(handle):
+    return dict(tool_hostname=handle["tool_hostname"], tool_port=handle["tool_port"])
+
+
+class WarmPool:
+    """Warm containers of a single image that are leased to one job at a time"""
+
+    def __init__(
+        self,
+        backend,
+        image,
+        min_size=1,
+        max_size=4,
+        startup_timeout=DEFAULT_STARTUP_TIMEOUT,
+        health=None,
+        max_start_failures=DEFAULT_MAX_START_FAILURES,
+    ):
+        """
+        Args:
+            backend (ProcessBackend or DockerBackend): Starts and stops the containers
+            image (str): Image name
+            min_size (int, optional): Containers kept warm while idle. Defaults to 1.
+            max_size (int, optional): Maximum number of containers. Defaults to 4.
+            startup_timeout (float, optional): Seconds until a container has to report SERVING. Defaults to 120.
+            health (callable, optional): Health check returning the serving status of an endpoint. Defaults to
+                grpc_backend.client.check_health.
+            max_start_failures (int, optional): Consecutive failed starts until the pool fails. Defaults to 3.
+        """
+        if health is None:
+            from grpc_backend.client import check_health as health
+
+        self.backend = backend
+        self.image = image
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.startup_timeout = startup_timeout
+        self.health = health
+        self.max_start_failures = max_start_failures
+
+        self._idle = []
+        self._leased = []
+        self._starting = 0
+        self._waiting = 0
+        self._closed = False
+        self._start_failures = 0
+        self._error = None
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._idle) + len(self._leased) + self._starting
+
+    @property
+    def failed(self):
+        """Whether containers failed to start max_start_failures times in a row"""
+        return self._error is not None
+
+    @property
+    def queue_depth(self):
+        """Number of jobs waiting for a container"""
+        return self._waiting
+
+    def _wait_serving(self, handle):
+        """Polls the health service of a started container until it reports SERVING"""
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if not self.backend.alive(handle):
+                raise RuntimeError(f"Container of {self.image} exited during startup")
+            status = self.health(_endpoint(handle))
+            if status == "SERVING":
+                return
+            if status == "UNIMPLEMENTED":
+                logger.warning(f"{self.image} does not provide the gRPC health service, assuming it is ready")
+                return
+            if status == "UNAVAILABLE":
+                # A fresh channel connects immediately instead of waiting for the reconnect backoff
+                self._discard(handle)
+            time.sleep(HEALTH_INTERVAL)
+        raise TimeoutError(f"Container of {self.image} did not report SERVING within {self.startup_timeout}s")
+
+    def _start(self):
+        """Starts a container and adds it to the idle containers once it is serving"""
+        handle = None
+        try:
+            handle = self.backend.start(self.image)
+            self._wait_serving(handle)
+        except Exception as err:
+            logger.exception(f"Starting a container of {self.image} failed")
+            if handle is not None:
+                self.backend.stop(handle)
+            with self._condition:
+                self._starting -= 1
+                self._start_failures += 1
+                if self._start_failures >= self.max_start_failures and self._error is None:
+                    self._error = RuntimeError(
+                        f"Containers of {self.image} failed to start {self._start_failures} times in a row: {err}"
+                    )
+                self._condition.notify_all()
+            return
+        logger.debug(f"Container of {self.image} is serving on {handle['tool_hostname']}:{handle['tool_port']}")
+        with self._condition:
+            self._starting -= 1
+            self._start_failures = 0
+            self._idle.append(handle)
+            self._condition.notify_all()
+
+    def _scale_up(self):
+        """Starts as many containers as jobs are waiting, bounded by max_size. Requires the condition lock"""
+        if self._error is not None:
+            return
+        size = len(self._idle) + len(self._leased) + self._starting
+        target = min(self.max_size, max(self.min_size, len(self._leased) + self._waiting))
+        for _ in range(target - size):
+            self._starting += 1
+            threading.Thread(target=self._start, daemon=True).start()
+
+    def start(self):
+        """Starts min_size containers and waits until they are serving
+
+        Raises:
+            RuntimeError: If the pool failed
+        """
+        with self._condition:
+            self._scale_up()
+            self._condition.wait_for(lambda: self._starting == 0)
+            if self._error is not None:
+                raise self._error
+
+    def acquire(self, timeout=None):
+        """Leases a serving container, starting new ones if all containers are leased
+
+        Args:
+            timeout (float, optional): Seconds to wait for a container. Defaults to None (wait forever).
+
+        Raises:
+            TimeoutError: If no container became available in time
+            RuntimeError: If the pool is closed or failed
+
+        Returns:
+            dict: Handle of the leased container
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while not self._idle:
+                    if self._closed:
+                        raise RuntimeError(f"Pool of {self.image} is closed")
+                    if self._error is not None:
+                        raise self._error
+                    self._scale_up()
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No container of {self.image} available within {timeout}s")
+                    self._condition.wait(remaining)
+                handle = self._idle.pop()
+                self._leased.append(handle)
+                return handle
+            finally:
+                self._waiting -= 1
+
+    def release(self, handle, healthy=True):
+        """Returns a leased container to the pool
+        Containers beyond min_size are stopped if no job is waiting, unhealthy containers are replaced.
+
+        Args:
+            handle (dict): Handle returned by acquire
+            healthy (bool, optional): False if the job failed because of the container. Defaults to True.
+        """
+        # Checked before taking the lock, the docker backend inspects the container in a subprocess
+        healthy = healthy and self.backend.alive(handle)
+        with self._condition:
+            self._leased.remove(handle)
+            size = len(self._idle) + len(self._leased) + self._starting + 1
+            stop = self._closed or not healthy or (self._waiting == 0 and size > self.min_size)
+            if not stop:
+                self._idle.append(handle)
+            self._condition.notify_all()
+        if stop:
+            self._stop(handle)
+            with self._condition:
+                if not self._closed:
+                    self._scale_up()
+
+    @contextlib.contextmanager
+    def lease(self, timeout=None):
+        """Context manager leasing a container, yields its endpoint (tool_hostname, tool_port)"""
+        handle = self.acquire(timeout)
+        healthy = True
+        try:
+            yield _endpoint(handle)
+        except Exception:
+            healthy = self.health(_endpoint(handle)) in ["SERVING", "UNIMPLEMENTED"]
+            raise
+        finally:
+            self.release(handle, healthy)
+
+    def _discard(self, handle):
+        from grpc_backend.channels import discard_channel
+
+        discard_channel(_endpoint(handle))
+
+    def _stop(self, handle):
+        self._discard(handle)
+        self.backend.stop(handle)
+
+    def close(self):
+        """Stops all idle containers, leased containers are stopped when they are released"""
+        with self._condition:
+            self._closed = True
+            self._condition.wait_for(lambda: self._starting == 0)
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for handle in idle:
+            self._stop(handle)
+
+
+class PoolManager:
+    """Warm pools for many images, created on first use"""
+
+    def __init__(self, backend, **pool_args):
+        """
+        Args:
+            backend (ProcessBackend or DockerBackend): Starts and stops the containers
+            **pool_args: Arguments for every WarmPool, e.g. min_size and max_size
+        """
+        self.backend = backend
+        self.pool_args = pool_args
+        self._pools = dict()
+        self._lock = threading.Lock()
+
+    def pool(self, image):
+        """Returns the pool of an image, starting its warm containers on first use
+        A failed pool is replaced by a new one. Containers are started outside of the manager lock, so a slow image
+        does not delay the pools of other images, concurrent jobs of the starting image wait in acquire.
+
+        Raises:
+            RuntimeError: If the containers of a new pool fail to start
+        """
+        with self._lock:
+            failed = self._pools.get(image)
+            if failed is not None and not failed.failed:
+                return failed
+            pool = self._pools[image] = WarmPool(self.backend, image, **self.pool_args)
+        if failed is not None:
+            failed.close()
+        pool.start()
+        return pool
+
+    def lease(self, image, timeout=None):
+        """Context manager leasing a container of an image, see WarmPool.lease"""
+        return self.pool(image).lease(timeout)
+
+    def close(self):
+        """Stops the containers of all pools"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), dict()
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def pooled(execute, manager):
+    """Wraps the execute function of a workflow to run steps with an "image" on leased warm containers
+
+    Args:
+        execute (callable): Function executing a step at its tool_hostname and tool_port
+        manager (PoolManager): The pools to lease containers from
+
+    Returns:
+        callable: Function executing a step on a container of its image, steps without image at their endpoint
+    """
+
+    def run(step):
+        if not step.get("image"):
+            return execute(step)
+        with manager.lease(step["image"]) as endpoint:
+            return execute(dict(step, **endpoint))
+
+    return run
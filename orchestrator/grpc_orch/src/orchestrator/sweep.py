@@ -0,0 +1,167 @@
+"""Fan-out of many tool functions over many input sets with bounded parallelism per tool endpoint
+
+A sweep spec names the tool endpoints, the input sets and a matrix of (tool, funcs, input sets):
+
+    {
+        "endpoints": {
+            "scikit-metrics-tool": {"tool_hostname": "scikit-metrics-tool", "tool_port": 8061, "concurrency": 4}
+        },
+        "inputs": {
+            "logreg-a": [
+                {"name": "predictions", "location": {"uri": "/inputs/a/predictions.json"}},
+                {"name": "true_labels", "location": {"uri": "/inputs/a/true_labels.json"}}
+            ]
+        },
+        "matrix": [
+            {"tool": "scikit-metrics-tool", "func": ["accuracy_wrapper", "f1_wrapper"], "inputs": ["logreg-a"]}
+        ],
+        "output_root": "/results/sweep",
+        "retries": 2
+    }
+
+Every combination becomes one job writing its result to <output_root>/<tool>/<func>/<input set>.json. Jobs that
+fail with a transient status are retried with exponential backoff, the outcome of all jobs is collected in a
+single report. Results returned inline (see MKI_INLINE_PAYLOAD_THRESHOLD) are included in the report.
+"""
+
+import concurrent.futures as futures
+import json
+import time
+
+import grpc
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 2
+DEFAULT_OUTPUT_ROOT = "/results/sweep"
+BACKOFF = 0.5  # Seconds before the first retry, doubled for every further retry
+
+# Transient failures, errors raised by the tool function itself (UNKNOWN) are not retried
+RETRYABLE_CODES = [
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+]
+
+
+def sweep_jobs(sweep_spec):
+    """Expands the matrix of a sweep spec into jobs
+
+    Args:
+        sweep_spec (dict): The sweep spec, see module docstring
+
+    Raises:
+        ValueError: If the matrix references an unknown endpoint or input set
+
+    Returns:
+        list: Jobs with name, endpoint and the pipeline spec for grpc_backend.client.orchestrate
+    """
+    output_root = sweep_spec.get("output_root", DEFAULT_OUTPUT_ROOT)
+    jobs = []
+    for entry in sweep_spec["matrix"]:
+        tool = entry["tool"]
+        if tool not in sweep_spec["endpoints"]:
+            raise ValueError(f"Unknown endpoint {tool}")
+        endpoint = sweep_spec["endpoints"][tool]
+        funcs = entry["func"] if isinstance(entry["func"], list) else [entry["func"]]
+        input_sets = entry["inputs"] if isinstance(entry["inputs"], list) else [entry["inputs"]]
+        for input_set in input_sets:
+            if input_set not in sweep_spec["inputs"]:
+                raise ValueError(f"Unknown input set {input_set}")
+            for func in funcs:
+                name = f"{tool}/{func}/{input_set}"
+                pipeline_spec = dict(
+                    tool_hostname=endpoint["tool_hostname"],
+                    tool_port=endpoint["tool_port"],
+                    func=func,
+                    input=sweep_spec["inputs"][input_set],
+                    output=[dict(name="result", location=dict(uri=f"{output_root}/{name}.json"))],
+                    meta=dict(execution_name=name),
+                )
+                jobs.append(dict(name=name, tool=tool, func=func, inputs=input_set, pipeline_spec=pipeline_spec))
+    return jobs
+
+
+def _is_retryable(err):
+    return isinstance(err, grpc.RpcError) and err.code() in RETRYABLE_CODES
+
+
+def _inline_results(response):
+    """Decodes the json results returned inline, outputs written to their uri are referenced by uri"""
+    results = dict()
+    for artifact in response["output"]:
+        if "inline_payload" in artifact:
+            try:
+                results[artifact["name"]] = json.loads(artifact["inline_payload"])
+            except ValueError:
+                pass
+    return results
+
+
+def _run_job(job, execute, retries, backoff):
+    """Runs a job with retries of transient failures and returns its report entry"""
+    entry = dict(name=job["name"], tool=job["tool"], func=job["func"], inputs=job["inputs"])
+    start = time.perf_counter()
+    for attempt in range(1, retries + 2):
+        entry["attempts"] = attempt
+        try:
+            response = execute(job["pipeline_spec"])
+        except Exception as err:
+            if attempt <= retries and _is_retryable(err):
+                logger.warning(f"Job {job['name']} failed (attempt {attempt}), retrying: {err}")
+                time.sleep(backoff * 2 ** (attempt - 1))
+                continue
+            logger.error(f"Job {job['name']} failed: {err}")
+            entry.update(status="failed", error=str(err.details() if isinstance(err, grpc.RpcError) else err))
+            break
+        output = [
+            dict(name=artifact["name"], uri=artifact["location"]["uri"], payload_id=artifact["payload_id"])
+            for artifact in response["output"]
+        ]
+        entry.update(status="succeeded", output=output, results=_inline_results(response))
+        break
+    entry["duration"] = time.perf_counter() - start
+    return entry
+
+
+def run_sweep(sweep_spec, execute=None, backoff=BACKOFF):
+    """Runs all jobs of a sweep, with at most "concurrency" running jobs per endpoint
+
+    Args:
+        sweep_spec (dict): The sweep spec, see module docstring
+        execute (callable, optional): Function executing a pipeline spec and returning the response execution
+            message. Defaults to grpc_backend.client.orchestrate.
+        backoff (float, optional): Seconds before the first retry. Defaults to 0.5.
+
+    Returns:
+        dict: The report with the total duration, a summary and one entry per job in matrix order
+    """
+    if execute is None:
+        from grpc_backend.client import orchestrate as execute
+
+    jobs = sweep_jobs(sweep_spec)
+    retries = sweep_spec.get("retries", DEFAULT_RETRIES)
+    start = time.perf_counter()
+
+    # One pool per endpoint bounds its concurrency independently of the other endpoints
+    executors = {
+        tool: futures.ThreadPoolExecutor(max_workers=endpoint.get("concurrency", DEFAULT_CONCURRENCY))
+        for tool, endpoint in sweep_spec["endpoints"].items()
+    }
+    try:
+        pending = [executors[job["tool"]].submit(_run_job, job, execute, retries, backoff) for job in jobs]
+        entries = [future.result() for future in pending]
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+
+    summary = dict(total=len(entries))
+    for status in ["succeeded", "failed"]:
+        summary[status] = sum(entry["status"] == status for entry in entries)
+    logger.info(f"Sweep finished: {summary}")
+    return dict(duration=time.perf_counter() - start, summary=summary, jobs=entries)
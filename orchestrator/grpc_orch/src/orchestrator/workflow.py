@@ -0,0 +1,300 @@
+"""A DAG executor for multi-step workflows with gRPC tools
+
+A workflow spec contains named steps. Each step is a pipeline spec as used by grpc_backend.client.orchestrate
+(tool_hostname, tool_port, func, input, output). Inputs can be wired to outputs of other steps with
+"source": "<step name>/<output name>" instead of a location, e.g. the predictions of a model step:
+
+    {
+        "steps": {
+            "model_step": {
+                "tool_hostname": "scikit-logreg-model", "tool_port": 8061, "func": "predict_wrapper",
+                "input": [{"name": "features", "location": {"uri": "/inputs/features.json"}}],
+                "output": [{"name": "predictions", "location": {"uri": "/results/predictions.json"}}]
+            },
+            "tool_step": {
+                "tool_hostname": "scikit-metrics-tool", "tool_port": 8061, "func": "accuracy_wrapper",
+                "input": [
+                    {"name": "predictions", "source": "model_step/predictions"},
+                    {"name": "true_labels", "location": {"uri": "/inputs/true_labels.json"}}
+                ],
+                "output": [{"name": "result", "location": {"uri": "/results/result.json"}}]
+            }
+        }
+    }
+
+Steps whose inputs are available run concurrently, each against its own tool.
+"""
+
+import base64
+import concurrent.futures as futures
+import contextvars
+import copy
+import json
+import time
+
+from grpc_backend.tracing import span
+from ledger import step_key
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class WorkflowError(Exception):
+    """Raised if a step of a workflow failed, carries the report of the steps executed so far"""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+def load_workflow(path):
+    """Loads a workflow spec from a json file
+
+    Args:
+        path (str): Path to the workflow json
+
+    Returns:
+        dict: The workflow spec
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _split_source(source):
+    """Splits a source reference "<step name>/<output name>" into step and output name"""
+    step, _, output = source.partition("/")
+    if not step or not output:
+        raise ValueError(f"Invalid source {source}, expected <step name>/<output name>")
+    return step, output
+
+
+def step_dependencies(workflow_spec):
+    """Returns the steps each step depends on and checks that the steps form a DAG
+
+    Args:
+        workflow_spec (dict): The workflow spec
+
+    Raises:
+        ValueError: If a source references an unknown step or output, or if the steps contain a cycle
+
+    Returns:
+        dict: Mapping of step name to the set of step names it depends on
+    """
+    steps = workflow_spec["steps"]
+    dependencies = dict()
+    for name, step in steps.items():
+        dependencies[name] = set()
+        for artifact in step.get("input", []):
+            if "source" not in artifact:
+                continue
+            source_step, source_output = _split_source(artifact["source"])
+            if source_step not in steps:
+                raise ValueError(f"Step {name} references unknown step {source_step}")
+            if source_output not in [output["name"] for output in steps[source_step].get("output", [])]:
+                raise ValueError(f"Step {name} references unknown output {artifact['source']}")
+            dependencies[name].add(source_step)
+
+    # Kahn's algorithm, every step has to be reachable without cycles
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Workflow contains a cycle between the steps {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return dependencies
+
+
+def _resolve_step(step, responses):
+    """Replaces the sources of a step's inputs by the output artifacts returned by the source steps
+
+    The output artifact is taken as a whole, so a result returned inline is passed on inline.
+    """
+    step = copy.deepcopy(step)
+    inputs = []
+    for artifact in step.get("input", []):
+        if "source" in artifact:
+            source_step, source_output = _split_source(artifact["source"])
+            outputs = {output["name"]: output for output in responses[source_step]["output"]}
+            resolved = copy.deepcopy(outputs[source_output])
+            resolved["name"] = artifact.get("name", resolved["name"])
+            artifact = resolved
+        inputs.append(artifact)
+    step["input"] = inputs
+    return step
+
+
+def run_workflow(workflow_spec, max_workers=DEFAULT_MAX_WORKERS, execute=None, ledger=None, pool=None):
+    """Executes the steps of a workflow in dependency order, independent steps concurrently
+    After a failed step no further steps are started, running steps are awaited.
+    The workflow is traced as one trace with a span per step (see grpc_backend/tracing.py).
+
+    Args:
+        workflow_spec (dict): The workflow spec, see module docstring
+        max_workers (int, optional): Maximum number of concurrently running steps. Defaults to 8.
+        execute (callable, optional): Function executing a single resolved step spec and returning the response
+            execution message. Defaults to grpc_backend.client.orchestrate.
+        ledger (ledger.RunLedger, optional): Ledger of executed steps. Steps recorded with the same image digest,
+            function and inputs are not executed again but reported as "cached" while their outputs are unchanged
+            (see ledger.py). Defaults to None.
+        pool (pool.PoolManager, optional): Warm containers, steps with an "image" are executed on a container of
+            the image leased from the pool instead of at tool_hostname and tool_port. Defaults to None.
+
+    Raises:
+        WorkflowError: If a step failed
+
+    Returns:
+        dict: The report with the total duration in seconds, the aggregated tool metrics and per step the response
+        and start, end and duration in seconds relative to the start of the workflow
+    """
+    if execute is None:
+        from grpc_backend.client import orchestrate as execute
+    if pool is not None:
+        from pool import pooled
+
+        execute = pooled(execute, pool)
+
+    dependencies = step_dependencies(workflow_spec)
+    steps = workflow_spec["steps"]
+
+    responses = dict()
+    report = dict(steps=dict())
+    failed = []
+    started = time.perf_counter()
+
+    def run_step(name):
+        with span(f"step {name}"):
+            return _run_step(name)
+
+    def _run_step(name):
+        step = _resolve_step(steps[name], responses)
+        start = time.perf_counter() - started
+        key = None if ledger is None else step_key(step)
+        if key is not None:
+            response = ledger.get(key, step)
+            if response is not None:
+                logger.info(f"Step {name} is unchanged, reusing its recorded outputs")
+                return response, start, time.perf_counter() - started, "cached"
+        logger.info(f"Starting step {name}")
+        response = execute(step)
+        end = time.perf_counter() - started
+        logger.info(f"Finished step {name} in {end - start:.3f}s")
+        if key is not None:
+            ledger.put(key, name, step, response)
+        return response, start, end, "succeeded"
+
+    with span("workflow", steps=len(steps)):
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = dict()
+            pending = set(steps)
+            while pending or running:
+                if not failed:
+                    for name in sorted(pending):
+                        if dependencies[name].issubset(responses):
+                            running[executor.submit(contextvars.copy_context().run, run_step, name)] = name
+                            pending.discard(name)
+                if not running:
+                    break
+
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        response, start, end, status = future.result()
+                    except Exception as err:
+                        logger.error(f"Step {name} failed: {err}")
+                        failed.append(name)
+                        report["steps"][name] = dict(status="failed", error=str(err))
+                        continue
+                    responses[name] = response
+                    report["steps"][name] = dict(
+                        status=status, start=start, end=end, duration=end - start, response=response
+                    )
+
+    report["duration"] = time.perf_counter() - started
+    for name in pending:
+        report["steps"][name] = dict(status="skipped")
+    report["metrics"] = aggregate_metrics(report)
+
+    if failed:
+        raise WorkflowError(f"Steps {sorted(failed)} failed", report)
+    return report
+
+
+def aggregate_metrics(report):
+    """Sums the metrics the tools measured per step (see ExecutionMetrics in module.proto) over a workflow
+    Cached steps are not counted, the peak RSS is the maximum over all steps.
+
+    Args:
+        report (dict): The report returned by run_workflow
+
+    Returns:
+        dict: The aggregated metrics
+    """
+    total = dict()
+    for step in report["steps"].values():
+        if step["status"] != "succeeded":
+            continue
+        metrics = step["response"].get("meta", {}).get("metrics") or {}
+        for name, value in metrics.items():
+            if name == "process_peak_rss_bytes":
+                total[name] = max(total.get(name, 0), value)
+            else:
+                total[name] = total.get(name, 0) + value
+    return total
+
+
+def format_report(report):
+    """Formats the per step timings of a workflow report as a table
+
+    Args:
+        report (dict): The report returned by run_workflow
+
+    Returns:
+        str: One line per step, ordered by start time
+    """
+    phases = ["load", "compute", "store"]
+    lines = [f"{'step':<30} {'status':<10} {'start':>9} {'duration':>9}" + "".join(f" {p:>9}" for p in phases)]
+    steps = sorted(report["steps"].items(), key=lambda item: item[1].get("start", float("inf")))
+    for name, step in steps:
+        start = f"{step['start']:.3f}" if "start" in step else "-"
+        duration = f"{step['duration']:.3f}" if "duration" in step else "-"
+        metrics = step.get("response", {}).get("meta", {}).get("metrics") or {}
+        times = "".join(
+            f" {metrics[f'{p}_seconds']:>9.3f}" if f"{p}_seconds" in metrics else f" {'-':>9}" for p in phases
+        )
+        lines.append(f"{name:<30} {step['status']:<10} {start:>9} {duration:>9}{times}")
+    lines.append(f"total: {report['duration']:.3f}s")
+    metrics = report.get("metrics") or {}
+    if metrics:
+        lines.append(
+            f"load: {metrics['load_seconds']:.3f}s, compute: {metrics['compute_seconds']:.3f}s, "
+            f"store: {metrics['store_seconds']:.3f}s, read: {metrics['bytes_read']} bytes, "
+            f"written: {metrics['bytes_written']} bytes, process peak RSS: {metrics['process_peak_rss_bytes']} bytes"
+        )
+    return "\n".join(lines)
+
+
+def _json_default(obj):
+    """Encodes inline payloads of the responses for the json report"""
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def write_report(report, path):
+    """Writes a workflow report as json, inline payloads are base64 encoded
+
+    Args:
+        report (dict): The report returned by run_workflow
+        path (str): Path of the json file
+    """
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, default=_json_default)